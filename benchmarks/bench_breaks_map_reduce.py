@@ -0,0 +1,74 @@
+"""
+Benchmark: wall-clock time of the breaks explanation, single prompt vs map-reduce
+vs hybrid (hop sections rendered locally, LLM writes only the closing sections).
+
+The LLM is simulated: a call takes BASE_S plus PER_BREAK_S for every break in its
+prompt (output length grows with the number of hop sections); the reduce and
+highlights calls, whose output does not grow with the break count, take REDUCE_S.
+No network access is needed.
+
+Run from the repo root:
+    python benchmarks/bench_breaks_map_reduce.py [break_counts]     e.g. 10,50,200
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+os.environ.setdefault("VERTEX_ADAPTER", "stub")
+
+from mcp_server.agents import breaks_agent
+
+BASE_S = 0.4
+PER_BREAK_S = 0.08
+REDUCE_S = 0.8
+
+
+class _SimulatedVertex:
+    async def agenerate_from_config(self, agent_config_name, template_vars, json_mode=False):
+        if agent_config_name in ("breaks_agent_reduce", "breaks_agent_highlights"):
+            await asyncio.sleep(REDUCE_S)
+            return "Highlights:\n...\n\nSuggested Next Questions:\n...\n\nAgent Commentary:\n..."
+        hops = template_vars["breaks_json"].count("HOP_")
+        await asyncio.sleep(BASE_S + PER_BREAK_S * hops)
+        return "Explanation:\n" + "**hop**\n-----\n" * hops + "\nHighlights:\n..."
+
+
+def _breaks(n: int) -> list[dict]:
+    return [{"hierarchy_path": f"Loans/Region{i % 7}", "hop_id": f"HOP_{i}", "hop_description": f"hop {i}",
+             "exposure_amt": 1e6 * i, "break_anchor_pct": 0.1} for i in range(n)]
+
+
+async def _simulated_vertex():
+    return _SimulatedVertex()
+
+
+async def _time(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+def main(counts: list[int]) -> None:
+    breaks_agent.aget_vertex_object = _simulated_vertex
+    breaks_agent.step_log = lambda *args, **kwargs: None
+
+    print(f"call = {BASE_S}s + {PER_BREAK_S}s/break, reduce = {REDUCE_S}s, "
+          f"chunk size {breaks_agent.BREAKS_CHUNK_SIZE}, concurrency {breaks_agent.BREAKS_MAP_CONCURRENCY}\n")
+    print(f"{'breaks':>8}{'chunks':>8}{'single s':>10}{'map-reduce s':>14}{'hybrid s':>10}")
+    for n in counts:
+        breaks = _breaks(n)
+        single = asyncio.run(_time(_SimulatedVertex().agenerate_from_config(
+            "breaks_agent", breaks_agent._breaks_template_vars("q", breaks))))
+        mapped = asyncio.run(_time(breaks_agent.aexplain_breaks_map_reduce("q", breaks)))
+        hybrid = asyncio.run(_time(breaks_agent.aexplain_breaks_hybrid("q", breaks)))
+        print(f"{n:>8}{len(breaks_agent.chunk_breaks(breaks)):>8}{single:>10.2f}{mapped:>14.2f}{hybrid:>10.2f}")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "12,24,48,96"
+    main([int(s) for s in arg.split(",")])
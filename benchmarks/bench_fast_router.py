@@ -0,0 +1,63 @@
+"""
+Benchmark: how many turns the rule-based fast router decides without the LLM router,
+and what a rule-based decision costs.
+
+Uses the real configs/router_rules.yml over a sample of analyst questions.
+
+Run from the repo root:
+    python benchmarks/bench_fast_router.py
+"""
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents.fast_router import get_fast_router
+
+QUESTIONS = [
+    "Show me the top 2 hop-level breaks and explain what the stats are telling us.",
+    "Show me the top hop-level breaks and explain what they mean.",
+    "What are the biggest breaks for 2052a~Loans today?",
+    "top 5 breaks by financial impact",
+    "Which hop has the largest break this week?",
+    "Show lineage for HOP_16",
+    "What is upstream of HOP_3?",
+    "Show me the DAG paths for this feed",
+    "Where do the paths converge?",
+    "Which hops feed into the GL reconciliation?",
+    "hello",
+    "what is a hop?",
+    "what is a DAG?",
+    "Summarize break severities by owner and priority.",
+    "List the datasets impacted by the latest hop-level anomalies.",
+    "What are the most recent schema changes affecting the pipeline?",
+    "which breaks are upstream of the convergence hop?",
+    "why?",
+    "can you explain that again in simpler terms",
+    "thanks!",
+]
+
+
+def main(repeat: int = 2000) -> None:
+    router = get_fast_router()
+    routed = [(q, router.route(q)) for q in QUESTIONS]
+    confident = [r for _, r in routed if r is not None and r.confident]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for q in QUESTIONS:
+            router.route(q)
+    per_call_us = (time.perf_counter() - start) / (repeat * len(QUESTIONS)) * 1e6
+
+    for q, r in routed:
+        decision = f"{r.tool_name} ({r.confidence:.2f})" if r is not None and r.confident else "-> LLM router"
+        print(f"{decision:<28} {q}")
+    print(f"\nrouted by rules: {len(confident)}/{len(QUESTIONS)} ({len(confident) / len(QUESTIONS):.0%})")
+    print(f"rule-based decision: {per_call_us:.1f} us/question")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: per-turn LangGraph overhead with and without the shared compiled graph.
+
+per-turn build - build_breaks_poc_graph() + ainvoke on every turn (the old behaviour).
+shared         - get_compiled_graph() + ainvoke.
+
+Graph nodes are swapped for trivial coroutines so only the graph's own overhead
+is measured; no LLM, SQL or MCP calls are made.
+
+Run from the repo root:
+    python benchmarks/bench_graph_compile.py [turns]
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+os.environ.setdefault("VERTEX_ADAPTER", "stub")
+
+from mcp_server.agents import graph_breaks_poc as poc
+
+
+async def _router(state):
+    return {**state, "selected_tool": "general_qa"}
+
+
+async def _answer(state):
+    return {**state, "analysis": "ok"}
+
+
+async def _turns(get_graph, turns: int) -> float:
+    start = time.perf_counter()
+    for i in range(turns):
+        await get_graph().ainvoke({"user_question": f"q{i}", "trace": []})
+    return (time.perf_counter() - start) / turns * 1e3
+
+
+def main(turns: int) -> None:
+    poc.step_log = lambda *args, **kwargs: None
+    poc.router_node, poc.breaks_node, poc.general_qa_node = _router, _answer, _answer
+
+    asyncio.run(_turns(poc.get_compiled_graph, 5))  # warm imports and the shared graph
+    rebuild_ms = asyncio.run(_turns(poc.build_breaks_poc_graph, turns))
+    shared_ms = asyncio.run(_turns(poc.get_compiled_graph, turns))
+
+    print(f"{'mode':<16}{'ms/turn':>10}")
+    print(f"{'per-turn build':<16}{rebuild_ms:>10.2f}")
+    print(f"{'shared':<16}{shared_ms:>10.2f}")
+    print(f"saved per turn: {rebuild_ms - shared_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,55 @@
+"""
+Benchmark: cold-start cost of importing the app.main entry point.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters with the
+offline stub adapter (VERTEX_ADAPTER=stub, AGENT_WARMUP=0) and reports wall-clock
+time plus the most expensive imports. No network access is needed.
+
+Run from the repo root:
+    python benchmarks/bench_import_time.py [runs] [top_n]
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+MODULE = "app.main"
+
+
+def _run_once() -> tuple[float, list[tuple[int, str]]]:
+    env = {**os.environ, "VERTEX_ADAPTER": "stub", "AGENT_WARMUP": "0", "PYTHONPATH": str(SRC_PATH)}
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=SRC_PATH, env=env, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    cumulative: list[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cum_us, name = line[len("import time:"):].split("|")
+        if cum_us.strip().isdigit():
+            cumulative.append((int(cum_us), name.strip()))
+    return wall, cumulative
+
+
+def main(runs: int, top_n: int) -> None:
+    results = [_run_once() for _ in range(runs)]
+    walls = sorted(w for w, _ in results)
+    _, cumulative = results[-1]
+    total_us = next((us for us, name in cumulative if name == MODULE), 0)
+
+    print(f"{MODULE}: wall median {walls[len(walls) // 2] * 1e3:.0f} ms over {runs} runs, "
+          f"import {total_us / 1e3:.0f} ms (last run)")
+    print(f"\n{'cumulative ms':>14}  module")
+    for us, name in sorted(cumulative, reverse=True)[:top_n]:
+        print(f"{us / 1e3:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5, int(sys.argv[2]) if len(sys.argv) > 2 else 15)
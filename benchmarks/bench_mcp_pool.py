@@ -0,0 +1,85 @@
+"""
+Benchmark: per-call cost of an MCP tool call with a new connection per call (the old
+McpProcessor / fetch_transactions behaviour) vs the pooled sessions of mcp_pool.
+
+The server is simulated: opening a connection (SSE handshake + initialize) takes
+HANDSHAKE_S and a tool round trip takes CALL_S. No network access is needed.
+
+Run from the repo root:
+    python benchmarks/bench_mcp_pool.py [calls] [concurrency]
+"""
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.tools import mcp_pool
+
+HANDSHAKE_S = 0.08
+CALL_S = 0.02
+URL = "http://localhost:7000/query"
+
+
+class _Session:
+    async def send_ping(self):
+        return None
+
+    async def call_tool(self, name, arguments):
+        await asyncio.sleep(CALL_S)
+        return {"rows": []}
+
+
+@asynccontextmanager
+async def _connect(url):
+    await asyncio.sleep(HANDSHAKE_S)
+    yield _Session()
+
+
+async def _per_call(calls: int, concurrency: int) -> float:
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with limiter:
+            async with _connect(URL) as session:
+                await session.call_tool("run_query", {"query": i})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return time.perf_counter() - start
+
+
+async def _pooled(calls: int, concurrency: int) -> tuple[float, dict]:
+    pool = mcp_pool.McpConnectionPool(size=mcp_pool.MCP_POOL_SIZE, connect=_connect)
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with limiter:
+            await pool.call_tool(URL, "run_query", {"query": i})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    metrics = pool.metrics()[URL]
+    await pool.aclose()
+    return elapsed, metrics
+
+
+def main(calls: int, concurrency: int) -> None:
+    mcp_pool.step_log = lambda *args, **kwargs: None
+    print(f"handshake = {HANDSHAKE_S}s, tool call = {CALL_S}s, {calls} calls, concurrency {concurrency}, "
+          f"pool size {mcp_pool.MCP_POOL_SIZE}\n")
+    per_call = asyncio.run(_per_call(calls, concurrency))
+    pooled, metrics = asyncio.run(_pooled(calls, concurrency))
+    print(f"{'mode':>10}{'total s':>10}{'ms/call':>10}")
+    print(f"{'per-call':>10}{per_call:>10.2f}{1000 * per_call / calls * concurrency:>10.1f}")
+    print(f"{'pooled':>10}{pooled:>10.2f}{1000 * pooled / calls * concurrency:>10.1f}")
+    print(f"\npool: {metrics['connects']} connects, {metrics['calls']} calls, avg call {metrics['avg_call_ms']} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50, int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -0,0 +1,100 @@
+"""
+Benchmark: one MCP tool call over SSE (pooled session, real local server) vs the
+in-process transport that calls the server's call_tool directly (no SSE round trip).
+
+Starts a throwaway MCP server with a get_transactions tool returning ROWS rows on a
+free localhost port (uvicorn in a background thread). Needs the mcp and uvicorn packages.
+
+Run from the repo root:
+    python benchmarks/bench_mcp_transport.py [calls] [rows]
+"""
+import asyncio
+import logging
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+import uvicorn
+
+try:
+    from mcp.server.fastmcp import FastMCP as McpServer
+except ImportError:  # mcp >= 2 renamed FastMCP
+    from mcp.server.mcpserver import MCPServer as McpServer
+
+from mcp_server.tools import mcp_pool, mcp_transport
+
+
+def _build_server(rows: int):
+    server = McpServer("bench_txn")
+    payload = [
+        {"entity_name": "2052a~Loans", "hierarchy_path": "Loans/US", "recon_run_date": "2025-10-15", "hop_id": "HOP_16",
+         "hop_desc": "GL feed", "anchor_value": f"A{i}", "eval_asof_date": "2025-10-15", "notional": 1000.5 * i}
+        for i in range(rows)
+    ]
+
+    @server.tool()
+    async def get_transactions(hop_id: str, limit_return: int = 50) -> dict:
+        return {"rows": payload[:limit_return], "meta": {"hop_id": hop_id}, "isError": False}
+
+    return server
+
+
+def _serve(server) -> tuple[str, uvicorn.Server]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    uv = uvicorn.Server(uvicorn.Config(server.sse_app(), host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=uv.run, daemon=True).start()
+    while not uv.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/sse", uv
+
+
+async def _time_new_connection(url: str, calls: int, rows: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        async with mcp_pool.sse_session(url) as session:
+            await session.call_tool("get_transactions", {"hop_id": "HOP_16", "limit_return": rows})
+    return (time.perf_counter() - start) / calls
+
+
+async def _time_calls(url: str, calls: int, rows: int) -> float:
+    await mcp_transport.call_mcp_tool(url, "get_transactions", {"hop_id": "HOP_16", "limit_return": rows})  # connect / warm
+    start = time.perf_counter()
+    for _ in range(calls):
+        await mcp_transport.call_mcp_tool(url, "get_transactions", {"hop_id": "HOP_16", "limit_return": rows})
+    return (time.perf_counter() - start) / calls
+
+
+def main(calls: int, rows: int) -> None:
+    mcp_pool.step_log = lambda *args, **kwargs: None
+    for name in ("httpx", "httpx2"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    server = _build_server(rows)
+    url, uv = _serve(server)
+
+    async def run():
+        per_call = await _time_new_connection(url, max(1, calls // 10), rows)
+        sse = await _time_calls(url, calls, rows)
+        await mcp_pool.close_mcp_pool()
+        mcp_transport.register_inprocess_server(url, server)
+        inprocess = await _time_calls(url, calls, rows)
+        return per_call, sse, inprocess
+
+    per_call, sse, inprocess = asyncio.run(run())
+    uv.should_exit = True
+    print(f"{calls} calls, {rows} rows per result\n")
+    print(f"{'transport':>16}{'ms/call':>10}")
+    print(f"{'sse (new conn)':>16}{1000 * per_call:>10.3f}")
+    print(f"{'sse (pooled)':>16}{1000 * sse:>10.3f}")
+    print(f"{'in-process':>16}{1000 * inprocess:>10.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, int(sys.argv[2]) if len(sys.argv) > 2 else 20)
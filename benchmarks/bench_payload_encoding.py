@@ -0,0 +1,68 @@
+"""
+Benchmark: prompt payload size of the breaks and lineage data per encoding.
+
+Sizes are estimated tokens (~4 characters per token) against the previous
+json.dumps(indent=2) payload. Breaks are synthetic HopBreak rows; lineage rows
+come from the sample hops feed file.
+
+Run from the repo root:
+    python benchmarks/bench_payload_encoding.py [break_count]
+"""
+import json
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents.schemas import HopBreak
+from mcp_server.llm.payload_encoder import FORMATS, encode_rows, estimate_tokens
+from mcp_server.llm.prompt_registry import get_prompt_registry
+from utils.sqlprocessor import iter_hops_from_json_file
+
+FEED_FILE = SRC_PATH / "mcp_server" / "feeds" / "hops_2052a~Loans_20251015.json"
+
+
+def _breaks(n: int) -> list[HopBreak]:
+    return [
+        HopBreak(
+            entity_name="2052a~Loans", recon_run_date="2025-10-15", hierarchy_path=f"Loans/Region{i % 7}/Book{i % 3}",
+            hop_id=f"HOP_{i}", hop_description=f"Trade capture to ledger hop {i}", eval_asof_date="2025-10-15",
+            required_cde=4, total_anchor_count=125000 + i, break_anchor_count=1000 + 37 * i,
+            break_anchor_pct=(1000 + 37 * i) / (125000 + i) * 100, break_null_count=400 + i, break_empty_count=12 * i,
+            break_valid_count=124000 - 37 * i, break_valid_pct=99.123456 - i / 7, break_distinct_count=17 + i,
+            exposure_amt=1234567.891 * (i + 1),
+        )
+        for i in range(n)
+    ]
+
+
+def _lineage_rows() -> list[dict]:
+    return list(iter_hops_from_json_file(str(FEED_FILE)))
+
+
+def _report(label: str, rows: list, payload_cfg: dict) -> None:
+    dicts = [r if isinstance(r, dict) else vars(r) for r in rows]
+    baseline = estimate_tokens(json.dumps(dicts, indent=2, default=str))
+    drop = payload_cfg.get("drop_fields") or ()
+    digits = payload_cfg.get("round_digits")
+
+    print(f"\n{label}: {len(rows)} rows, indent=2 JSON = {baseline} tokens "
+          f"(configured: {payload_cfg.get('format', 'json')}, drop={list(drop)}, round={digits})")
+    print(f"{'format':>10}{'tokens':>9}{'saved':>8}{'+drop/round':>13}{'saved':>8}")
+    for fmt in FORMATS:
+        plain = estimate_tokens(encode_rows(dicts, fmt))
+        slim = estimate_tokens(encode_rows(dicts, fmt, drop, digits))
+        print(f"{fmt:>10}{plain:>9}{1 - plain / baseline:>8.0%}{slim:>13}{1 - slim / baseline:>8.0%}")
+
+
+def main(break_count: int) -> None:
+    registry = get_prompt_registry()
+    _report("breaks", _breaks(break_count), registry.get("breaks_agent").raw.get("payload") or {})
+    if FEED_FILE.exists():
+        _report("lineage", _lineage_rows(), registry.get("breaks_agent_lineage").raw.get("payload") or {})
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,65 @@
+"""
+Micro-benchmark: per-call prompt preparation for generate_from_config.
+
+legacy   - read + parse the agent YAML, json round-trip, new Jinja Environment,
+           compile system and task templates, render (the old adapter path).
+registry - AgentConfigRegistry lookup (mtime check) + render of precompiled templates.
+
+Run from the repo root:
+    python benchmarks/bench_prompt_registry.py [iterations]
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import yaml
+from jinja2 import Environment, StrictUndefined
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.prompt_registry import AgentConfigRegistry, CONFIGS_DIR
+
+CASES = {
+    "router_agent": {"user_question": "Show me the top hop-level breaks.", "recent_turns": ""},
+    "breaks_agent": {"user_question": "Explain the breaks.", "breaks_json": json.dumps([{"hop_id": "16"}] * 20)},
+}
+
+
+def legacy_render(agent_config_name: str, template_vars: dict) -> tuple[str, str]:
+    with open(CONFIGS_DIR / f"{agent_config_name}.yml", "r", encoding="utf-8") as f:
+        cfg = json.loads(json.dumps(yaml.safe_load(f)))
+
+    def _render(template: str) -> str:
+        env = Environment(undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+        safe_vars = dict(template_vars)
+        safe_vars.setdefault("recent_turns", "")
+        safe_vars.setdefault("last_answer", "")
+        return env.from_string(template).render(**safe_vars)
+
+    return _render(cfg.get("system_prompt", "")), _render(cfg.get("task_prompt", ""))
+
+
+def _time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    registry = AgentConfigRegistry()
+    registry.load_all()
+
+    print(f"{'agent':<16}{'legacy us':>12}{'registry us':>14}{'speedup':>10}")
+    for name, template_vars in CASES.items():
+        assert legacy_render(name, template_vars) == registry.render(name, template_vars)
+        legacy_us = _time_per_call(lambda: legacy_render(name, template_vars), iterations)
+        registry_us = _time_per_call(lambda: registry.render(name, template_vars), iterations)
+        print(f"{name:<16}{legacy_us:>12.1f}{registry_us:>14.1f}{legacy_us / registry_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
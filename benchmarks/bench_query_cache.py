@@ -0,0 +1,89 @@
+"""
+Benchmark: a simulated morning peak of run_query calls with and without the query
+result cache (singleflight + TTL/LRU).
+
+ANALYSTS requests arrive over PEAK_S seconds; most ask for the same top-breaks query
+(with formatting differences, as produced by different clients), the rest pick one of a
+few other closed-date queries. Upstream latency grows with the number of queries
+Starburst is running at once: UPSTREAM_S * (1 + LOAD_FACTOR * concurrent).
+
+Run from the repo root:
+    python benchmarks/bench_query_cache.py [analysts]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.query_cache import QueryResultCache
+
+PEAK_S = 2.0
+UPSTREAM_S = 0.3
+LOAD_FACTOR = 0.05
+TOP_BREAKS = [
+    "SELECT * FROM breaks WHERE recon_run_date = '2025-10-15' ORDER BY exposure_amt DESC LIMIT 10",
+    "select *\n  from breaks\n where recon_run_date = '2025-10-15'\n order by exposure_amt desc limit 10;",
+]
+OTHERS = [f"select * from breaks where recon_run_date = '2025-10-{d:02d}' and hop_id = 'HOP_{d}'" for d in range(1, 6)]
+
+
+class _Upstream:
+    def __init__(self):
+        self.calls = 0
+        self.running = 0
+
+    async def run(self, sql: str) -> dict:
+        self.calls += 1
+        self.running += 1
+        try:
+            await asyncio.sleep(UPSTREAM_S * (1 + LOAD_FACTOR * self.running))
+            return {"rows": [{"sql": sql[:20], "exposure_amt": 1000.5}]}
+        finally:
+            self.running -= 1
+
+
+async def _peak(analysts: int, use_cache: bool) -> tuple[list[float], _Upstream, QueryResultCache]:
+    rng = random.Random(7)
+    upstream = _Upstream()
+    cache = QueryResultCache()
+    latencies: list[float] = []
+
+    async def analyst(delay: float, sql: str) -> None:
+        await asyncio.sleep(delay)
+        start = time.perf_counter()
+        if use_cache:
+            await cache.get_or_fetch(sql, lambda: upstream.run(sql), "openpus", "managed")
+        else:
+            await upstream.run(sql)
+        latencies.append(time.perf_counter() - start)
+
+    jobs = [
+        analyst(rng.uniform(0, PEAK_S), rng.choice(TOP_BREAKS) if rng.random() < 0.7 else rng.choice(OTHERS))
+        for _ in range(analysts)
+    ]
+    await asyncio.gather(*jobs)
+    return latencies, upstream, cache
+
+
+def main(analysts: int) -> None:
+    print(f"{analysts} analysts over {PEAK_S}s, upstream {UPSTREAM_S}s (+{LOAD_FACTOR:.0%} per concurrent query)\n")
+    print(f"{'cache':>6}{'upstream calls':>16}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for use_cache in (False, True):
+        latencies, upstream, cache = asyncio.run(_peak(analysts, use_cache))
+        q = statistics.quantiles(latencies, n=20)
+        print(f"{'on' if use_cache else 'off':>6}{upstream.calls:>16}{1000 * statistics.median(latencies):>9.0f}"
+              f"{1000 * q[18]:>9.0f}{1000 * max(latencies):>9.0f}")
+        if use_cache:
+            stats = cache.stats()
+            print(f"\nhits {stats['hits']}, coalesced {stats['coalesced']}, misses {stats['misses']}, "
+                  f"hit rate {stats['hit_rate']:.0%}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,77 @@
+"""
+Benchmark: fetching one session's past queries as the log grows.
+
+scan  - stream the JSONL log and filter (what get_user_queries does without an index).
+index - QueryLogIndex.session_queries, an indexed range scan on (user_id, session_id, ts).
+
+Run from the repo root:
+    python benchmarks/bench_query_index.py [sizes]     e.g. 10000,100000,1000000
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.query_index import QueryLogIndex
+from mcp_server.llm.query_log import iter_log_entries
+
+USERS = 500
+SESSIONS_PER_USER = 20
+PROBE_ROWS = 20  # the looked-up session keeps a fixed size while the log grows
+
+
+def _entries(start: int, count: int):
+    rng = random.Random(start)
+    for i in range(start, start + count):
+        user = rng.randrange(USERS)
+        yield {
+            "ts": f"2026-01-01T00:00:{i + PROBE_ROWS:012d}",
+            "user_id": f"user{user}",
+            "session_id": f"s{rng.randrange(SESSIONS_PER_USER)}",
+            "kind": "config",
+            "user_query": f"Show me the top breaks for hop {i % 97}",
+            "generalized_response": "Explanation: ..." * 4,
+        }
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def main(sizes: list[int]) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = Path(tmp) / "query_logs.jsonl"
+        index = QueryLogIndex(str(Path(tmp) / "query_index.db"))
+
+        print(f"{'entries':>10}{'session rows':>14}{'scan ms':>12}{'index ms':>12}")
+        probe = [{**e, "user_id": "probe", "session_id": "s0"} for e in _entries(-PROBE_ROWS, PROBE_ROWS)]
+        total = 0
+        for size in sizes:
+            batch = list(_entries(total, size - total))
+            if total == 0:
+                batch = probe + batch[PROBE_ROWS:]
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(e) + "\n" for e in batch)
+            index.add_entries(batch)
+            total = size
+
+            rows = index.session_queries("probe", "s0")
+            scan_ms = _best_of(lambda: list(iter_log_entries(str(log_file), "probe", "s0")), repeat=1)
+            index_ms = _best_of(lambda: index.session_queries("probe", "s0"))
+            print(f"{total:>10}{len(rows):>14}{scan_ms:>12.2f}{index_ms:>12.3f}")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000"
+    main([int(s) for s in arg.split(",")])
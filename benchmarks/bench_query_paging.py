@@ -0,0 +1,86 @@
+"""
+Benchmark: server-side peak memory of delivering a large result with run_query (one
+buffered blob: pretty-printed logs, dumps/loads round trip, one MCP payload) vs
+run_query_paged (one bounded page per call), and time until an agent has its first
+FIRST_N rows.
+
+The upstream API is simulated by generating rows in memory. Peak memory is measured
+with tracemalloc (Python allocations), a proxy for the server's RSS growth.
+
+Run from the repo root:
+    python benchmarks/bench_query_paging.py [row_counts]     e.g. 10000,50000
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.query_paging import QUERY_PAGE_SIZE, build_page, decode_page_token
+
+QUERY = "select * from breaks where recon_run_date = '2025-10-15' order by exposure_amt desc"
+FIRST_N = 100
+
+
+def _upstream(offset: int, limit: int, total: int) -> dict:
+    return {"rows": [
+        {"entity_name": "2052a~Loans", "hierarchy_path": f"Loans/Region{i % 7}", "hop_id": f"HOP_{i}",
+         "recon_run_date": "2025-10-15", "exposure_amt": 1000.5 * i, "break_anchor_pct": 0.1 * (i % 100)}
+        for i in range(offset, min(offset + limit, total))
+    ]}
+
+
+def _full(total: int, stop_after: int | None = None) -> int:
+    data = _upstream(0, 50000, total)
+    json.dumps(data, indent=2)                        # "Response JSON" log
+    json.dumps(data, indent=4)                        # "Valid JSON" log
+    result = json.loads(json.dumps(data))             # round trip
+    payload = json.dumps(result)                      # MCP result content
+    return len(json.loads(payload)["rows"][:stop_after])
+
+
+def _paged(total: int, stop_after: int | None = None) -> int:
+    page_size = min(QUERY_PAGE_SIZE, stop_after) if stop_after else QUERY_PAGE_SIZE
+    token, seen = "", 0
+    while True:
+        offset, size = decode_page_token(QUERY, token) if token else (0, page_size)
+        page = build_page(QUERY, _upstream(offset, size + 1, total), offset, size)
+        rows = json.loads(json.dumps(page))["rows"]   # MCP result content, client decode
+        seen += len(rows)
+        token = page["next_page_token"]
+        if not token or (stop_after and seen >= stop_after):
+            return min(seen, stop_after or seen)
+
+
+def _measure(fn, *args) -> tuple[float, float]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, elapsed
+
+
+def main(counts: list[int]) -> None:
+    print(f"page size {QUERY_PAGE_SIZE}; 'first {FIRST_N}' = agent stops after {FIRST_N} rows\n")
+    print(f"{'rows':>8}{'full MB':>10}{'paged MB':>10}{'full first-N ms':>17}{'paged first-N ms':>18}")
+    for n in counts:
+        full_mb, _ = _measure(_full, n)
+        paged_mb, _ = _measure(_paged, n)
+        start = time.perf_counter()
+        _full(n, FIRST_N)
+        full_first = time.perf_counter() - start
+        start = time.perf_counter()
+        _paged(n, FIRST_N)
+        paged_first = time.perf_counter() - start
+        print(f"{n:>8}{full_mb:>10.1f}{paged_mb:>10.1f}{1000 * full_first:>17.1f}{1000 * paged_first:>18.1f}")
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "5000,20000,50000"
+    main([int(s) for s in arg.split(",")])
@@ -0,0 +1,69 @@
+"""
+Benchmark: per-turn session persistence cost as the conversation grows.
+
+json          - JsonFileSessionBackend, write-through (the old load/rewrite-whole-file behaviour).
+sqlite        - SqliteSessionBackend, write-through: each turn inserts its rows only.
+sqlite-behind - SqliteSessionBackend with write-behind: save() only touches memory.
+
+Each turn is load_session + append user/assistant turns + update a tool output + save_session.
+
+Run from the repo root:
+    python benchmarks/bench_session_store.py [history_sizes]     e.g. 10,100,1000
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from utils.session_store import JsonFileSessionBackend, SessionStore, SqliteSessionBackend
+
+TURNS_MEASURED = 50
+ANSWER = "Explanation: the hop shows a persistent mismatch between source and target balances. " * 4
+
+
+def _turn(store: SessionStore, i: int) -> None:
+    mem = store.load("user", "session")
+    mem["turns"] = mem["turns"] + [
+        {"role": "user", "content": f"question {i}", "meta": {}},
+        {"role": "assistant", "content": ANSWER, "meta": {"agent": "get_top_breaks"}},
+    ]
+    mem["last_tool_outputs"] = {**mem["last_tool_outputs"], "breaks": [{"hop_id": f"HOP_{i}", "breaks": i}]}
+    mem["last_answer"] = ANSWER
+    store.save(mem)
+
+
+def _per_turn_ms(make_store, history: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = make_store(Path(tmp))
+        for i in range(history // 2):
+            _turn(store, i)
+        store.flush()
+        start = time.perf_counter()
+        for i in range(TURNS_MEASURED):
+            _turn(store, i)
+        elapsed = time.perf_counter() - start
+        store.close()
+    return elapsed / TURNS_MEASURED * 1e3
+
+
+MODES = {
+    "json": lambda d: SessionStore(JsonFileSessionBackend(d / "sessions"), flush_interval=0),
+    "sqlite": lambda d: SessionStore(SqliteSessionBackend(str(d / "sessions.db")), flush_interval=0),
+    "sqlite-behind": lambda d: SessionStore(SqliteSessionBackend(str(d / "sessions.db")), flush_interval=0.5),
+}
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'history turns':>14}" + "".join(f"{name + ' ms':>18}" for name in MODES))
+    for size in sizes:
+        row = [_per_turn_ms(make_store, size) for make_store in MODES.values()]
+        print(f"{size:>14}" + "".join(f"{ms:>18.3f}" for ms in row))
+
+
+if __name__ == "__main__":
+    arg = sys.argv[1] if len(sys.argv) > 1 else "10,100,1000"
+    main([int(s) for s in arg.split(",")])
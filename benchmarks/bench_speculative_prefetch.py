@@ -0,0 +1,85 @@
+"""
+Benchmark: turn latency with and without speculative prefetch in router_node.
+
+The router LLM call, the Starburst breaks query and the explanation LLM call are
+replaced by sleeps of configurable length, so the numbers show how much of the
+data fetch is hidden behind routing, and what a wrong guess costs.
+
+Run from the repo root:
+    python benchmarks/bench_speculative_prefetch.py [router_s] [query_s] [explain_s]
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+os.environ.setdefault("VERTEX_ADAPTER", "stub")
+
+from mcp_server.agents import graph_breaks_poc as poc
+from mcp_server.agents import speculation
+
+# (question, previous turn's agent, what the LLM router answers)
+TURNS = [
+    ("Summarize break severities by owner and priority.", "", "get_top_breaks"),  # weak rule match
+    ("And which owners are behind them?", "get_top_breaks", "get_top_breaks"),    # follow-up
+    ("What are the most recent schema changes?", "", "general_qa"),               # nothing to guess
+    ("Summarize break severities by owner and priority.", "", "general_qa"),      # wrong guess
+]
+
+
+def _patch(router_s: float, query_s: float, explain_s: float) -> None:
+    answers = {}
+
+    async def route(question, recent_turns=""):
+        await asyncio.sleep(router_s)
+        return {"tool_name": answers[question], "reason": "bench"}
+
+    async def top_breaks():
+        await asyncio.sleep(query_s)
+        return [{"hop_id": "HOP_1", "breaks": 3}]
+
+    async def explain(question, breaks):
+        await asyncio.sleep(explain_s)
+        return "Explanation: bench"
+
+    async def general(**kwargs):
+        await asyncio.sleep(explain_s)
+        return "bench"
+
+    poc.step_log = lambda *args, **kwargs: None
+    poc.aroute_question, poc.get_top_breaks_sql = route, top_breaks
+    poc.aexplain_breaks, poc.aanswer_general_question = explain, general
+    return answers
+
+
+async def _run(enabled: bool, answers: dict) -> list[float]:
+    poc.SPECULATIVE_PREFETCH_ENABLED = enabled
+    graph = poc.get_compiled_graph()
+    timings = []
+    for question, last_agent, routed_to in TURNS:
+        answers[question] = routed_to
+        start = time.perf_counter()
+        await graph.ainvoke({"user_question": question, "trace": [], "session": {"last_agent": last_agent}})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(router_s: float, query_s: float, explain_s: float) -> None:
+    answers = _patch(router_s, query_s, explain_s)
+    off = asyncio.run(_run(False, answers))
+    on = asyncio.run(_run(True, answers))
+
+    print(f"router {router_s}s, breaks query {query_s}s, explanation {explain_s}s\n")
+    print(f"{'question':<60}{'routed to':>16}{'off s':>8}{'on s':>8}")
+    for (question, _, routed_to), a, b in zip(TURNS, off, on):
+        print(f"{question[:58]:<60}{routed_to:>16}{a:>8.2f}{b:>8.2f}")
+    print(f"\nspeculation stats: {speculation.get_speculation_stats()}")
+
+
+if __name__ == "__main__":
+    args = [float(a) for a in sys.argv[1:4]]
+    main(*(args + [0.8, 1.0, 0.3][len(args):]))
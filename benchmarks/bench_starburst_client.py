@@ -0,0 +1,94 @@
+"""
+Benchmark: bursts of Starburst queries with a new httpx.AsyncClient per query (the old
+invoke_api) vs the shared StarburstClient.
+
+A local stub HTTP server (uvicorn in a background thread) answers every POST after
+UPSTREAM_S with a small JSON body. It is plain HTTP, so TLS setup, the largest saving
+against the real HTTPS endpoint, is not part of these numbers.
+
+Run from the repo root:
+    python benchmarks/bench_starburst_client.py [burst_size] [bursts]
+"""
+import asyncio
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+import httpx
+import uvicorn
+
+from mcp_server import starburst_client
+
+UPSTREAM_S = 0.01
+BODY = json.dumps({"rows": [{"hop_id": f"HOP_{i}", "exposure_amt": 1000.5 * i} for i in range(50)]}).encode()
+
+
+async def _stub_app(scope, receive, send):
+    if scope["type"] != "http":
+        return
+    while (await receive()).get("more_body"):
+        pass
+    await asyncio.sleep(UPSTREAM_S)
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def _serve() -> tuple[str, uvicorn.Server]:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    uv = uvicorn.Server(uvicorn.Config(_stub_app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=uv.run, daemon=True).start()
+    while not uv.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/flow/api/starburst", uv
+
+
+async def _new_client_per_query(url: str, payload: dict) -> None:
+    async with httpx.AsyncClient(verify=False) as client:
+        response = await client.post(url, headers={"Content-Type": "application/json"}, json=payload, timeout=90.0)
+        response.raise_for_status()
+        response.json()
+
+
+async def _burst(call, url: str, size: int, bursts: int) -> float:
+    start = time.perf_counter()
+    for b in range(bursts):
+        await asyncio.gather(*(call(url, {"sqlQuery": f"select {b}, {i}"}) for i in range(size)))
+    return time.perf_counter() - start
+
+
+def main(size: int, bursts: int) -> None:
+    starburst_client.step_log = lambda *args, **kwargs: None
+    url, uv = _serve()
+    shared = starburst_client.StarburstClient()
+
+    async def shared_query(url: str, payload: dict) -> None:
+        (await shared.post_json(url, payload)).json()
+
+    async def run():
+        await _burst(_new_client_per_query, url, 2, 1)  # warm the server
+        old = await _burst(_new_client_per_query, url, size, bursts)
+        new = await _burst(shared_query, url, size, bursts)
+        await shared.aclose()
+        return old, new
+
+    old, new = asyncio.run(run())
+    uv.should_exit = True
+    queries = size * bursts
+    print(f"{bursts} bursts of {size} queries, upstream latency {UPSTREAM_S}s, "
+          f"shared client: max_concurrency {shared.max_concurrency}, http2={shared.http2}\n")
+    print(f"{'client':>18}{'total s':>10}{'queries/s':>11}")
+    print(f"{'new per query':>18}{old:>10.2f}{queries / old:>11.1f}")
+    print(f"{'shared':>18}{new:>10.2f}{queries / new:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8, int(sys.argv[2]) if len(sys.argv) > 2 else 25)
@@ -1,23 +1,121 @@
+import asyncio
+import os
 import traceback
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Literal
 from fastapi import FastAPI, HTTPException
-from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from mcp_server.agents.graph_breaks_poc import handle_user_turn
+from mcp_server.agents.graph_breaks_poc import get_compiled_graph, handle_user_turn, stream_user_turn
 
-app = FastAPI()
+WARMUP_ON_STARTUP = os.getenv("AGENT_WARMUP", "1") == "1"
+# "full" embeds the whole session (the /chat contract); clients opt in to "delta", only the current turn,
+# per request with response_mode
+CHAT_RESPONSE_MODE = os.getenv("CHAT_RESPONSE_MODE", "full")
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+class DefaultResponse(JSONResponse):
+    """ JSON response rendered with orjson when it is installed. """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def _warm_up() -> None:
+    """ Pay the one-off costs (token fetch, vertexai/langgraph imports, prompt compilation)
+        in the background instead of on the first /chat request. """
+    try:
+        from mcp_server.llm.adapter import get_vertex_object
+        from mcp_server.llm.prompt_registry import get_prompt_registry
+
+        get_prompt_registry()
+        get_compiled_graph()
+        get_vertex_object()
+    except Exception:
+        print("=== WARM-UP ERROR ===")
+        print(traceback.format_exc())
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_ON_STARTUP:
+        # Not awaited: the server binds immediately and warms up on a worker thread
+        asyncio.get_running_loop().run_in_executor(None, _warm_up)
+    yield
+    from mcp_server.tools.mcp_pool import close_mcp_pool
+
+    await close_mcp_pool()
+
+app = FastAPI(lifespan=lifespan, default_response_class=DefaultResponse)
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
 
 class AgentRequest(BaseModel):
     user_id: str
     session_id: str
     user_question: str
+    response_mode: Literal["full", "delta"] | None = None
 
 @app.post("/chat")
 async def chat(req: AgentRequest):
     try:
-        state = await handle_user_turn(req.user_id, req.session_id, req.user_question)
-        return jsonable_encoder(state)
+        # handle_user_turn already returns JSON-safe data, so it is serialised once, by the response class
+        state = await handle_user_turn(
+            req.user_id, req.session_id, req.user_question, response_mode=req.response_mode or CHAT_RESPONSE_MODE
+        )
+        return DefaultResponse(state)
     except Exception as e:
         tb = traceback.format_exc()
         print("=== SERVER ERROR ===")
         print(tb)
         raise HTTPException(status_code=500, detail=str(e))
+
+def _sse(event: str, data: Any) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+
+    return f"event: {event}\ndata: ".encode("utf-8") + DefaultResponse(jsonable_encoder(data)).body + b"\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(req: AgentRequest):
+    """ Server-sent events for one turn: trace events and LLM tokens as they happen, then the final result. """
+    async def events() -> AsyncIterator[bytes]:
+        async for item in stream_user_turn(
+            req.user_id, req.session_id, req.user_question, response_mode=req.response_mode or CHAT_RESPONSE_MODE
+        ):
+            yield _sse(item["event"], item["data"])
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/sessions/{user_id}/{session_id}")
+async def get_session(user_id: str, session_id: str, include_archive: bool = False):
+    """ Full session on demand: summary, recent turns and tool outputs; archived turns if asked. """
+    from fastapi.encoders import jsonable_encoder
+    from mcp_server.agents.memory_policy import read_archived_turns
+    from utils.session_store import load_session
+
+    mem = await asyncio.to_thread(load_session, user_id, session_id)
+    if include_archive:
+        archived = await asyncio.to_thread(read_archived_turns, user_id, session_id)
+        mem = {**mem, "archived_turns_history": archived}
+    return DefaultResponse(jsonable_encoder(mem))
+
+@app.get("/metrics")
+async def metrics():
+    from mcp_server.agents.speculation import get_speculation_stats
+    from mcp_server.llm.payload_encoder import get_payload_stats
+    from mcp_server.tools.mcp_pool import get_mcp_pool
+
+    return DefaultResponse({
+        "speculative_prefetch": get_speculation_stats(),
+        "prompt_payload": get_payload_stats(),
+        "mcp_pool": get_mcp_pool().metrics(),
+    })
@@ -2,7 +2,6 @@ import asyncio
 import traceback
 from typing import Any, Dict, List
 
-from mcp_server.tools.my_mcp import McpProcessor
 from utils.sqlprocessor import generate_sql
 from utils.yaml_loader import clean_sql, SqlCleanMode
 
@@ -13,6 +12,9 @@ async def get_top_breaks_sql() -> List[Dict[str, Any]]:
     print(query)
 
     try:
+        # Deferred so importing the graph does not load the MCP client stack
+        from mcp_server.tools.my_mcp import McpProcessor
+
         proc = McpProcessor()
 
         # ✅ If McpProcessor() returned a coroutine, await it
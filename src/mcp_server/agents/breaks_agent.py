@@ -1,22 +1,347 @@
-import json
-from typing import List
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
 from mcp_server.agents.schemas import HopBreak
-from mcp_server.llm.adapter import get_vertex_object
+from mcp_server.llm.adapter import aget_vertex_object, get_vertex_object
+from mcp_server.llm.payload_encoder import encode_for_prompt
+from utils.event_stream import emit, reset_event_sink, set_event_sink
+from utils.logconfig import step_log
 
-_vertex = get_vertex_object()
+# Break sets larger than this are explained map-reduce style instead of in one prompt
+BREAKS_MAP_REDUCE_THRESHOLD = int(os.getenv("BREAKS_MAP_REDUCE_THRESHOLD", "16"))
+BREAKS_CHUNK_SIZE = int(os.getenv("BREAKS_CHUNK_SIZE", "6"))
+BREAKS_CHUNK_BY = os.getenv("BREAKS_CHUNK_BY", "hierarchy_path")  # "hierarchy_path" or "count"
+BREAKS_MAP_CONCURRENCY = int(os.getenv("BREAKS_MAP_CONCURRENCY", "8"))
+# "llm": the whole answer comes from breaks_agent.yml (map-reduce for large sets)
+# "hybrid" (opt-in): per-hop sections are rendered locally and the LLM writes only the closing
+#           sections (per-chunk highlights + reduce for large sets); its wording and null-ratio
+#           denominator differ from breaks_agent.yml
+BREAKS_EXPLAIN_MODE = os.getenv("BREAKS_EXPLAIN_MODE", "llm")
 
-def explain_breaks(user_question: str, breaks: List[HopBreak]) -> str:
+def _as_dict(b: Any) -> Dict[str, Any]:
+    # Breaks arrive as HopBreak dataclasses or as plain dicts straight from SQL
+    return b if isinstance(b, dict) else vars(b)
+
+def _breaks_template_vars(user_question: str, breaks: List[HopBreak]) -> Dict[str, Any]:
+    # Encoding (CSV, dropped/rounded fields) comes from the payload section of breaks_agent.yml
+    breaks_json = encode_for_prompt("breaks_agent", breaks)
+    return {
+        "user_question": user_question,
+        "breaks_json": breaks_json
+    }
+
+def explain_breaks(user_question: str, breaks: List[HopBreak], mode: str | None = None) -> str:
     """
     Use the generic VertexGenAI adapter + breaks_agent.yml
     to generate an explanation of the hop-level breaks.
     """
-    breaks_json = json.dumps([vars(b) for b in breaks], indent=2, default=str)
+    if (mode or BREAKS_EXPLAIN_MODE) == "hybrid":
+        if len(breaks) > BREAKS_MAP_REDUCE_THRESHOLD:
+            # No concurrent chunk highlights here: the closing is written from the one-line digest
+            closing = get_vertex_object().generate_from_config(
+                agent_config_name="breaks_agent_reduce",
+                template_vars=_reduce_template_vars(user_question, breaks, []),
+                json_mode=False,
+            )
+        else:
+            closing = get_vertex_object().generate_from_config(
+                agent_config_name="breaks_agent_highlights",
+                template_vars=_highlights_template_vars(user_question, breaks),
+                json_mode=False,
+            )
+        return f"{render_break_sections(breaks)}\n\n{closing.strip()}"
+    return get_vertex_object().generate_from_config(
+        agent_config_name="breaks_agent",
+        template_vars=_breaks_template_vars(user_question, breaks),
+        json_mode=False,
+    )
 
-    return _vertex.generate_from_config(
+async def aexplain_breaks(user_question: str, breaks: List[HopBreak], mode: str | None = None) -> str:
+    """ Awaitable variant of explain_breaks. Break sets above BREAKS_MAP_REDUCE_THRESHOLD are chunked in both modes. """
+    if (mode or BREAKS_EXPLAIN_MODE) == "hybrid":
+        return await aexplain_breaks_hybrid(user_question, breaks)
+    if len(breaks) > BREAKS_MAP_REDUCE_THRESHOLD:
+        return await aexplain_breaks_map_reduce(user_question, breaks)
+    vertex = await aget_vertex_object()
+    return await vertex.agenerate_from_config(
         agent_config_name="breaks_agent",
-        template_vars={
-            "user_question": user_question,
-            "breaks_json": breaks_json
-        },
+        template_vars=_breaks_template_vars(user_question, breaks),
+        json_mode=False,
+    )
+
+# -----------------------------------------------------------
+# Hybrid explanation: numeric sections rendered locally
+# -----------------------------------------------------------
+def short_amount(amount: Any) -> str:
+    """ 1_530_000_000 -> "$1.53B" ($T / $B / $M / $K). """
+    try:
+        value = float(amount)
+    except (TypeError, ValueError):
+        return "n/a"
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for divisor, suffix in ((1e12, "T"), (1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= divisor:
+            return f"{sign}${value / divisor:,.2f}".rstrip("0").rstrip(".") + suffix
+    return f"{sign}${value:,.0f}"
+
+def _pct(part: Any, whole: Any) -> str:
+    try:
+        return f"{100 * float(part) / float(whole):.1f}%"
+    except (TypeError, ValueError, ZeroDivisionError):
+        return "n/a"
+
+def _count(value: Any) -> str:
+    try:
+        return f"{int(value):,}"
+    except (TypeError, ValueError):
+        return "n/a"
+
+def render_break_section(b: HopBreak) -> str:
+    """ One hop section of the breaks_agent "Explanation:" format, built from the break's fields. """
+    d = _as_dict(b)
+    anchors = d.get("break_anchor_count") or 0
+    missing = (d.get("break_null_count") or 0) + (d.get("break_empty_count") or 0)
+    pct = d.get("break_anchor_pct")
+    pct_text = f"{float(pct):.1f}%" if isinstance(pct, (int, float)) else _pct(anchors, d.get("total_anchor_count"))
+
+    lines = [
+        f"**{d.get('hierarchy_path', '')} - {d.get('hop_description', '')} ({d.get('hop_id', '')}) - {short_amount(d.get('exposure_amt'))}**",
+        f"- {pct_text} of anchor records are broken at this hop "
+        f"({_count(anchors)} of {_count(d.get('total_anchor_count'))} records).",
+        f"- {_count(d.get('break_valid_count'))} of {_count(anchors)} broken records "
+        f"({_pct(d.get('break_valid_count'), anchors)}) still carry all {_count(d.get('required_cde'))} required data elements, "
+        f"so their exposure can be calculated in full.",
+    ]
+    if missing > 0:
+        lines.append(
+            f"- {_count(missing)} of {_count(anchors)} broken records ({_pct(missing, anchors)}) are missing one or more "
+            f"data elements besides base_amt, so their time value cannot be calculated. This may warrant further investigation."
+        )
+    else:
+        lines.append("- None of the broken records are missing data elements, so the break lies in the values themselves.")
+    lines.append("-----")
+    return "\n".join(lines)
+
+def render_break_sections(breaks: List[HopBreak]) -> str:
+    return "Explanation:\n" + "\n".join(render_break_section(b) for b in breaks)
+
+def _highlights_template_vars(user_question: str, breaks: List[HopBreak]) -> Dict[str, Any]:
+    return {
+        "user_question": user_question,
+        "break_count": len(breaks),
+        "breaks_json": encode_for_prompt("breaks_agent_highlights", breaks),
+    }
+
+async def aexplain_breaks_hybrid(
+        user_question: str,
+        breaks: List[HopBreak],
+        chunk_size: int = BREAKS_CHUNK_SIZE,
+        chunk_by: str = BREAKS_CHUNK_BY,
+        concurrency: int = BREAKS_MAP_CONCURRENCY,
+) -> str:
+    """
+    Render the per-hop sections locally (streamed immediately) and ask the LLM for the
+    Highlights / Suggested Next Questions / Agent Commentary only. Up to
+    BREAKS_MAP_REDUCE_THRESHOLD breaks that is one breaks_agent_highlights call; larger sets
+    get highlights per chunk, concurrently, merged by breaks_agent_reduce, so no prompt
+    carries the full break set.
+    """
+    start_time = time.time()
+    explanation = render_break_sections(breaks)
+    emit("token", {"agent": "breaks_agent", "text": explanation + "\n\n"})
+
+    vertex = await aget_vertex_object()
+    if len(breaks) <= BREAKS_MAP_REDUCE_THRESHOLD:
+        closing = await vertex.agenerate_from_config(
+            agent_config_name="breaks_agent_highlights",
+            template_vars=_highlights_template_vars(user_question, breaks),
+            json_mode=False,
+        )
+        step_log(f"AgenticAI - breaks hybrid explanation: {len(breaks)} breaks", time.time() - start_time)
+        return f"{explanation}\n\n{closing.strip()}"
+
+    chunks = chunk_breaks(breaks, chunk_size, chunk_by)
+    step_log(f"AgenticAI - breaks hybrid: {len(breaks)} breaks in {len(chunks)} chunks", 0)
+    results = await _map_chunks(user_question, chunks, "breaks_agent_highlights", _highlights_template_vars, concurrency)
+
+    highlights: List[str] = []
+    for i, result in enumerate(results, start=1):
+        if isinstance(result, BaseException):
+            # The sections are already shown; the reduce step works from the digest alone if need be
+            step_log(f"AgenticAI - breaks hybrid: chunk {i} highlights failed: {result}", 0)
+            continue
+        chunk_highlights = _split_sections(result)[1]
+        if chunk_highlights:
+            highlights.append(f"Group {i}: {chunk_highlights}")
+
+    closing = await vertex.agenerate_from_config(
+        agent_config_name="breaks_agent_reduce",
+        template_vars=_reduce_template_vars(user_question, breaks, highlights),
+        json_mode=False,
+    )
+    step_log(f"AgenticAI - breaks hybrid explanation: {len(breaks)} breaks", time.time() - start_time)
+    return f"{explanation}\n\n{closing.strip()}"
+
+# -----------------------------------------------------------
+# Map-reduce explanation for large break sets
+# -----------------------------------------------------------
+@dataclass
+class MapReduceProgress:
+    total: int
+    completed: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.time)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "elapsed_s": round(time.time() - self.started_at, 3),
+        }
+
+def chunk_breaks(breaks: List[HopBreak], size: int = BREAKS_CHUNK_SIZE, by: str = BREAKS_CHUNK_BY) -> List[List[HopBreak]]:
+    """
+    Split breaks into chunks of at most `size`. With by="hierarchy_path", each path is cut
+    into full chunks and the leftovers of different paths are packed together; otherwise
+    chunks are consecutive runs in the original order.
+    """
+    size = max(1, size)
+    if by != "hierarchy_path":
+        return [breaks[i:i + size] for i in range(0, len(breaks), size)]
+
+    groups: Dict[str, List[HopBreak]] = {}
+    for b in breaks:
+        groups.setdefault(str(_as_dict(b).get("hierarchy_path", "")), []).append(b)
+
+    # Full chunks per path first, then pack the leftover tails of each path together
+    chunks: List[List[HopBreak]] = []
+    tails: List[List[HopBreak]] = []
+    for group in groups.values():
+        full = len(group) - len(group) % size
+        chunks += [group[i:i + size] for i in range(0, full, size)]
+        if group[full:]:
+            tails.append(group[full:])
+
+    current: List[HopBreak] = []
+    for tail in tails:
+        if current and len(current) + len(tail) > size:
+            chunks.append(current)
+            current = []
+        current = current + tail
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _split_sections(text: str) -> Tuple[str, str]:
+    """ (hop sections, highlights) from one chunk's answer in the breaks_agent format. """
+    body, _, rest = text.partition("Highlights:")
+    body = body.split("Explanation:", 1)[-1].strip()
+    highlights = rest.split("Suggested Next Questions:", 1)[0].strip()
+    return body, highlights
+
+def _break_digest(breaks: List[HopBreak]) -> str:
+    lines = []
+    for b in breaks:
+        d = _as_dict(b)
+        lines.append(
+            f"- {d.get('hierarchy_path', '')} | {d.get('hop_description', '')} ({d.get('hop_id', '')}) | "
+            f"exposure_amt={d.get('exposure_amt')} | break_anchor_pct={d.get('break_anchor_pct')} | "
+            f"break_valid_pct={d.get('break_valid_pct')}"
+        )
+    return "\n".join(lines)
+
+def _reduce_template_vars(user_question: str, breaks: List[HopBreak], highlights: List[str]) -> Dict[str, Any]:
+    return {
+        "user_question": user_question,
+        "break_count": len(breaks),
+        "break_digest": _break_digest(breaks),
+        "chunk_highlights": "\n".join(highlights) or "(none)",
+    }
+
+async def _map_chunks(
+        user_question: str,
+        chunks: List[List[HopBreak]],
+        agent_config_name: str,
+        template_vars: Callable[[str, List[HopBreak]], Dict[str, Any]],
+        concurrency: int,
+) -> List[Any]:
+    """ One agent_config_name call per chunk, at most `concurrency` at a time; failures are returned, not raised. """
+    start_time = time.time()
+    progress = MapReduceProgress(total=len(chunks))
+    limiter = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_chunk(chunk: List[HopBreak]) -> str:
+        async with limiter:
+            # Chunk answers are merged before anything is shown, so don't stream their tokens
+            token = set_event_sink(None)
+            try:
+                vertex = await aget_vertex_object()
+                return await vertex.agenerate_from_config(
+                    agent_config_name=agent_config_name,
+                    template_vars=template_vars(user_question, chunk),
+                    json_mode=False,
+                )
+            except Exception:
+                progress.failed += 1
+                raise
+            finally:
+                reset_event_sink(token)
+                progress.completed += 1
+                step_log(f"AgenticAI - {agent_config_name} map: {progress.completed}/{progress.total} chunks", time.time() - start_time)
+                emit("progress", {"stage": "breaks_map", **progress.as_dict()})
+
+    return await asyncio.gather(*(run_chunk(c) for c in chunks), return_exceptions=True)
+
+async def aexplain_breaks_map_reduce(
+        user_question: str,
+        breaks: List[HopBreak],
+        chunk_size: int = BREAKS_CHUNK_SIZE,
+        chunk_by: str = BREAKS_CHUNK_BY,
+        concurrency: int = BREAKS_MAP_CONCURRENCY,
+) -> str:
+    """
+    Explain each chunk of breaks concurrently with the breaks_agent prompt (map), then write the
+    closing Highlights / Suggested Next Questions / Agent Commentary across all chunks with
+    breaks_agent_reduce (reduce). Wall-clock time is roughly one chunk call plus the reduce call.
+    """
+    start_time = time.time()
+    chunks = chunk_breaks(breaks, chunk_size, chunk_by)
+    step_log(f"AgenticAI - breaks map-reduce: {len(breaks)} breaks in {len(chunks)} chunks", 0)
+    results = await _map_chunks(user_question, chunks, "breaks_agent", _breaks_template_vars, concurrency)
+    failed = sum(1 for r in results if isinstance(r, BaseException))
+
+    sections: List[str] = []
+    highlights: List[str] = []
+    for i, (chunk, result) in enumerate(zip(chunks, results), start=1):
+        if isinstance(result, BaseException):
+            step_log(f"AgenticAI - breaks map-reduce: chunk {i} failed: {result}", 0)
+            sections.append("\n".join(
+                f"**{_as_dict(b).get('hierarchy_path', '')} {_as_dict(b).get('hop_description', '')} "
+                f"({_as_dict(b).get('hop_id', '')})** - explanation unavailable.\n-----"
+                for b in chunk
+            ))
+            continue
+        body, chunk_highlights = _split_sections(result)
+        sections.append(body)
+        if chunk_highlights:
+            highlights.append(f"Group {i}: {chunk_highlights}")
+
+    if failed == len(chunks):
+        raise RuntimeError(f"All {len(chunks)} break explanation chunks failed: {results[0]}")
+
+    explanation = "Explanation:\n" + "\n".join(sections)
+    emit("token", {"agent": "breaks_agent", "text": explanation + "\n\n"})
+
+    vertex = await aget_vertex_object()
+
+    closing = await vertex.agenerate_from_config(
+        agent_config_name="breaks_agent_reduce",
+        template_vars=_reduce_template_vars(user_question, breaks, highlights),
         json_mode=False,
-    )
\ No newline at end of file
+    )
+    step_log(f"AgenticAI - breaks map-reduce: Completed ({failed} failed chunks)", time.time() - start_time)
+    return f"{explanation}\n\n{closing.strip()}"
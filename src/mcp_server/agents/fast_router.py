@@ -0,0 +1,84 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from mcp_server.llm.prompt_registry import get_prompt_registry
+
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "1") == "1"
+ROUTER_RULES_CONFIG = "router_rules"
+
+@dataclass
+class FastRoute:
+    tool_name: str
+    confidence: float
+    margin: float
+    confident: bool
+    reason: str
+    matched: List[str] = field(default_factory=list)
+    scores: Dict[str, float] = field(default_factory=dict)
+
+class FastRouter:
+    """
+    Linear scorer over regex features: every matching pattern adds its weight to a tool.
+    route() returns the best tool with a confidence in [0, 1); `confident` says whether
+    it clears the configured thresholds and the LLM router can be skipped.
+    """
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.min_confidence = float(rules.get("min_confidence", 0.75))
+        self.min_margin = float(rules.get("min_margin", 1.0))
+        self.smoothing = float(rules.get("smoothing", 0.5))
+        self.reasons: Dict[str, str] = {}
+        self._patterns: List[Tuple[str, re.Pattern, float, str]] = []
+        for tool_name, spec in (rules.get("tools") or {}).items():
+            self.reasons[tool_name] = (spec or {}).get("reason", "")
+            for p in (spec or {}).get("patterns") or []:
+                self._patterns.append((tool_name, re.compile(p["pattern"], re.IGNORECASE), float(p.get("weight", 1.0)), p["pattern"]))
+
+    def route(self, question: str) -> Optional[FastRoute]:
+        """ Score question against the rules; None when nothing matched at all. """
+        scores: Dict[str, float] = {}
+        matched: Dict[str, List[str]] = {}
+        for tool_name, regex, weight, source in self._patterns:
+            if regex.search(question or ""):
+                scores[tool_name] = scores.get(tool_name, 0.0) + weight
+                matched.setdefault(tool_name, []).append(source)
+        if not scores:
+            return None
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        best_tool, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        confidence = best / (best + runner_up + self.smoothing)
+        margin = best - runner_up
+        return FastRoute(
+            tool_name=best_tool,
+            confidence=round(confidence, 4),
+            margin=round(margin, 4),
+            confident=confidence >= self.min_confidence and margin >= self.min_margin,
+            reason=self.reasons.get(best_tool, ""),
+            matched=matched[best_tool],
+            scores=scores,
+        )
+
+_fast_router: Optional[FastRouter] = None
+_fast_router_mtime: Optional[int] = None
+_fast_router_lock = threading.Lock()
+
+def get_fast_router() -> Optional[FastRouter]:
+    """ Router built from configs/router_rules.yml, rebuilt when the file changes.
+        None when FAST_ROUTER_ENABLED is off or the rules file is missing. """
+    global _fast_router, _fast_router_mtime
+    if not FAST_ROUTER_ENABLED:
+        return None
+    try:
+        entry = get_prompt_registry().get(ROUTER_RULES_CONFIG)
+    except FileNotFoundError:
+        return None
+    if _fast_router is None or _fast_router_mtime != entry.mtime_ns:
+        with _fast_router_lock:
+            if _fast_router is None or _fast_router_mtime != entry.mtime_ns:
+                _fast_router = FastRouter(entry.raw)
+                _fast_router_mtime = entry.mtime_ns
+    return _fast_router
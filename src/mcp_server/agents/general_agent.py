@@ -1,6 +1,6 @@
-from mcp_server.llm.adapter import get_vertex_object
+from mcp_server.llm.adapter import aget_vertex_object, get_vertex_object
 
-_vertex = get_vertex_object()
+NO_QUESTION_REPLY = "I didn't receive a question.  Please type a question and try again."
 
 def answer_general_question(
         user_question: str,
@@ -10,9 +10,9 @@ def answer_general_question(
     user_question = (user_question or "").strip()
 
     if not user_question:
-        return "I didn't receive a question.  Please type a question and try again."
+        return NO_QUESTION_REPLY
 
-    return _vertex.generate_from_config(
+    return get_vertex_object().generate_from_config(
         agent_config_name="general_agent",
         template_vars={
             "user_question": user_question,
@@ -20,4 +20,27 @@ def answer_general_question(
             "last_answer": last_answer,
         },
         json_mode=False
-    )
\ No newline at end of file
+    )
+
+async def aanswer_general_question(
+        user_question: str,
+        recent_turns: str = "",
+        last_answer: str = ""
+) -> str:
+    """ Awaitable variant of answer_general_question. """
+    user_question = (user_question or "").strip()
+
+    if not user_question:
+        return NO_QUESTION_REPLY
+
+    vertex = await aget_vertex_object()
+
+    return await vertex.agenerate_from_config(
+        agent_config_name="general_agent",
+        template_vars={
+            "user_question": user_question,
+            "recent_turns": recent_turns,
+            "last_answer": last_answer,
+        },
+        json_mode=False
+    )
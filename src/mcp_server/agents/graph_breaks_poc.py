@@ -1,22 +1,25 @@
 import time
 print("\n*** INITIALIZING ***")
 start_time = time.time()
-import json, re
+import asyncio, json, re, threading, traceback
 from pathlib import Path
-from typing import TypedDict, List, Any, Tuple
-from langgraph.graph import StateGraph, END
+from typing import TypedDict, AsyncIterator, Dict, List, Any, Tuple
 from mcp_server.agents.schemas import HopBreak, TraceEvent
-from mcp_server.agents.breaks_agent import explain_breaks
-from mcp_server.agents.lineage_agent import explain_lineage
-from mcp_server.agents.router_agent import route_question
-from mcp_server.agents.general_agent import answer_general_question
+from mcp_server.agents.breaks_agent import aexplain_breaks
+from mcp_server.agents.lineage_agent import aexplain_lineage
+from mcp_server.agents.router_agent import aroute_question
+from mcp_server.agents.fast_router import get_fast_router
+from mcp_server.agents.speculation import SPECULATIVE_PREFETCH_ENABLED, Prefetch, predict_tool
+from mcp_server.agents.general_agent import aanswer_general_question
+from mcp_server.agents.investigator_agent import INVESTIGATOR_NARRATIVE_ENABLED, anarrate_transactions, render_transactions_table
 from mcp_server.agents.session_types import SessionMemory
-from mcp_server.tools.txn_mcp_client import fetch_transactions
+from mcp_server.agents.memory_policy import apply_memory_policy, recent_context, schedule_summary
 from app.sql_client_async import get_top_breaks_sql
 from utils.sqlprocessor import build_paths_from_rows, iter_hops_from_json_file
-from utils.session_store import load_session, save_session
-from fastapi.encoders import jsonable_encoder
+from utils.session_store import load_session, save_session, session_lock
+from mcp_server.llm.query_log import set_log_context, reset_log_context
 from utils.logconfig import step_log
+from utils.event_stream import emit, reset_event_sink, set_event_sink
 
 FEEDS_DIR = Path(__file__).resolve().parents[2] / "mcp_server" / "feeds"
 DEFAULT_FEED_NAME = "2052a~Loans"
@@ -31,11 +34,20 @@ class BreaksGraphState(TypedDict, total=False):
     breaks: List[HopBreak]
     lineage_paths: List[str]
     lineage_summary: str
+    transactions: List[Dict[str, str]]   # investigator table rows, display-formatted
+    feed_name: str               # named in this turn's question, else the session's / default feed
+    recon_run_date: str          # YYYYMMDD, same resolution as feed_name
     trace: List[TraceEvent]
     session: SessionMemory
+    prefetched: Dict[str, Any]   # {"tool": ..., "data": ...} fetched speculatively by router_node
+
+def _add_trace(trace: List[TraceEvent], event: TraceEvent) -> None:
+    """ Record a trace event and push it to a streaming client, if one is listening. """
+    trace.append(event)
+    emit("trace", event)
 
 # --------------- Nodes ---------------
-def router_node(state: BreaksGraphState) -> BreaksGraphState:
+async def router_node(state: BreaksGraphState) -> BreaksGraphState:
     """ First agent: decide which tool/flow to use. """
     start_time = time.time()
     step_log( "AgenticAI - router_node: Start", 0)
@@ -43,36 +55,83 @@ def router_node(state: BreaksGraphState) -> BreaksGraphState:
     user_q = (state.get("user_question") or "").strip()
     trace = state.get("trace", [])
 
-    turns = (state.get("session", {}).get("turns", []))
-    recent = turns[-6:]
-    recent_text = "\n".join([f"{t.get('role','')}: {t.get('content','')}" for t in recent])
+    session = state.get("session", {}) or {}
+
+    # Obvious questions are routed by local rules; only ambiguous ones pay for the LLM router
+    fast_router = get_fast_router()
+    fast = fast_router.route(user_q) if fast_router is not None else None
+    prefetch: Prefetch | None = None
+    if fast is not None and fast.confident:
+        routed_by = "rules"
+        routing = {"tool_name": fast.tool_name, "reason": fast.reason}
+    else:
+        routed_by = "llm"
+        # Start the likely data fetch now so it overlaps the router's LLM round trip
+        predicted = predict_tool(fast, session.get("last_agent", "")) if SPECULATIVE_PREFETCH_ENABLED else None
+        if predicted:
+            prefetch = Prefetch(predicted, _tool_fetcher(predicted, state, session))
+        recent_text = recent_context(session)
+        try:
+            routing = await aroute_question(user_q, recent_turns=recent_text)
+        except BaseException:
+            if prefetch is not None:
+                prefetch.discard()
+            raise
 
-    routing = route_question(user_q, recent_turns=recent_text)
     tool_name = routing.get("tool_name", "general_qa")
-    if tool_name not in {"get_top_breaks", "general_qa", "get_lineage"}:
+    if tool_name not in {"get_top_breaks", "general_qa", "get_lineage", "get_transactions"}:
         tool_name = "general_qa"
 
     reason = routing.get("reason", "")
 
-    trace.append(
+    _add_trace(trace,
         {
             "node": "Router Agent",
             "stage": "routing",
             "message": reason,
-            "extra": {"selected_tool": tool_name, "message": str(routing)},
+            "extra": {
+                "selected_tool": tool_name,
+                "message": str(routing),
+                "routed_by": routed_by,
+                # Rule-based confidence, reported even when it was too low and the LLM decided
+                "confidence": fast.confidence if fast is not None else 0.0,
+                "fast_path_tool": fast.tool_name if fast is not None else None,
+                "matched_rules": fast.matched if fast is not None else [],
+                "speculative_tool": prefetch.tool_name if prefetch is not None else None,
+                "speculation": (None if prefetch is None else "hit" if prefetch.tool_name == tool_name else "miss"),
+            },
         }
     )
 
+    prefetched = None
+    if prefetch is not None:
+        if prefetch.tool_name == tool_name:
+            try:
+                prefetched = {"tool": tool_name, "data": await prefetch.resolve()}
+            except Exception as exc:  # noqa: BLE001
+                # breaks_node fetches again on its own
+                step_log(f"AgenticAI - speculative {tool_name} failed: {exc}", 0)
+        else:
+            prefetch.discard()
+
     elapsed = time.time() - start_time
-    step_log(f"AgenticAI - router node: Completed", elapsed)
+    step_log(f"AgenticAI - router node ({routed_by}): Completed", elapsed)
 
     return {
         **state,
         "selected_tool": tool_name,
         "routing_reason": reason,
         "trace": trace,
+        "prefetched": prefetched,
     }
 
+def _tool_fetcher(tool_name: str, state: BreaksGraphState, session: SessionMemory):
+    """ Zero-arg coroutine factory that fetches the data breaks_node needs for tool_name. """
+    if tool_name == "get_lineage":
+        feed_name, as_of_date = _resolve_lineage_source(state, session)
+        return lambda: asyncio.to_thread(_load_lineage_rows, feed_name, as_of_date)
+    return get_top_breaks_sql
+
 async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
     """ Second agent: if tool is get_top_breaks, run the breaks analysis. """
     start_time = time.time()
@@ -87,13 +146,17 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
 
     lineage_paths: List[str] = []
     lineage_summary: str | None = None
+    prefetched = state.get("prefetched") or {}
 
     if selected_tool == "get_lineage":
         feed_name, as_of_date = _resolve_lineage_source(state, session)
-        lineage_rows = _load_lineage_rows(feed_name, as_of_date)
+        if prefetched.get("tool") == "get_lineage":
+            lineage_rows = prefetched["data"]
+        else:
+            lineage_rows = _load_lineage_rows(feed_name, as_of_date)
         lineage_paths = [" >>> ".join(p) for p in build_paths_from_rows(lineage_rows)] if lineage_rows else []
 
-        trace.append(
+        _add_trace(trace,
             {
                 "node": "Breaks Analysis Agent",
                 "stage": "tool_call",
@@ -108,8 +171,8 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
         )
 
         if lineage_rows:
-            lineage_summary = explain_lineage(user_q, lineage_rows)
-            trace.append(
+            lineage_summary = await aexplain_lineage(user_q, lineage_rows)
+            _add_trace(trace,
                 {
                     "node": "Breaks analysis agent",
                     "stage": "llm_analysis",
@@ -138,9 +201,13 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
             "lineage_summary": lineage_summary or "",
             "trace": trace,
             "session": session,
+            "prefetched": None,
         }
 
-    breaks: List[HopBreak] = await get_top_breaks_sql() or []  # ✅ await the async function
+    if prefetched.get("tool") == "get_top_breaks":
+        breaks: List[HopBreak] = prefetched["data"] or []
+    else:
+        breaks = await get_top_breaks_sql() or []  # ✅ await the async function
 
     hop_ids = [
         b.get("hop_id")
@@ -148,7 +215,7 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
         if isinstance(b, dict) and b.get("hop_id")
     ]
 
-    trace.append({
+    _add_trace(trace, {
         "node": "breaks_node",
         "event": "fetched_breaks",
         "extra": {"hop_ids": hop_ids, "row_count": len(breaks or [])},
@@ -158,7 +225,7 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
     session["last_tool_outputs"]["breaks"] = breaks
 
     # Debug trace entry so you can see what tool we think we have
-    trace.append(
+    _add_trace(trace,
         {
             "node": "Breaks Analysis Agent",
             "stage": "tool_call",
@@ -174,13 +241,14 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
             "breaks": [],
             "analysis": analysis,
             "trace": trace,
-            "session": session
+            "session": session,
+            "prefetched": None,
         }
 
     # LLM explanation
-    full_text = explain_breaks(user_q, breaks)
+    full_text = await aexplain_breaks(user_q, breaks)
     explanation, commentary = _split_explanation_and_commentary(full_text)
-    trace.append(
+    _add_trace(trace,
         {
             "node": "Breaks analysis agent",
             "stage": "llm_analysis",
@@ -198,49 +266,74 @@ async def breaks_node(state: BreaksGraphState) -> BreaksGraphState:
         **state,
         "breaks": breaks,
         "analysis": explanation,
-        "trace": trace
+        "trace": trace,
+        "prefetched": None,
     }
 
 async def investigator_node(state: BreaksGraphState) -> BreaksGraphState:
+    """ Transactions behind one hop: the hop named in the question, else the previous turn's top break. """
+    start_time = time.time()
     user_q = state.get("user_question", "")
-    hop_id = extract_hop_id(user_q) or "16"  # fallback for test
+    trace: List[TraceEvent] = state.get("trace", [])
+    session = state.get("session", {}) or {}
+
+    last_breaks = (session.get("last_tool_outputs") or {}).get("breaks") or []
+    hop_id = extract_hop_id(user_q) or (str(last_breaks[0].get("hop_id") or "") if last_breaks else "") or None
+    if hop_id is None:
+        return {
+            **state,
+            "analysis": "Which hop should I pull transactions for? Mention its hop id (e.g. HOP_16) or ask for the top breaks first.",
+            "trace": trace,
+        }
+
+    from mcp_server.tools.txn_mcp_client import fetch_transactions
 
     resp = await fetch_transactions(hop_id=hop_id, limit_return=20)
     rows = resp.get("rows", []) if isinstance(resp, dict) else []
 
-    state["analysis"] = (
-        f"MCP test OK\n"
-        f"hop_id={hop_id}\n"
-        f"rows_returned={len(rows)}"
+    # Table is formatted locally; the LLM only adds an optional narrative
+    table = render_transactions_table(hop_id, rows)
+    analysis = table["markdown"]
+    if INVESTIGATOR_NARRATIVE_ENABLED and table["rows_shown"]:
+        narrative = await anarrate_transactions(user_q, hop_id, table)
+        analysis = f"{analysis}\n\n{narrative}".strip()
+
+    _add_trace(trace,
+        {
+            "node": "Investigator Agent",
+            "stage": "data_fetch",
+            "message": f"I pulled {table['rows_shown']} transactions for {hop_id}.",
+            "extra": {"hop_id": hop_id, "rows_returned": len(rows)},
+        }
     )
 
-    session = state.get("session", {}) or {}
     session.setdefault("last_tool_outputs", {})
     session["last_tool_outputs"]["txn_details_test"] = resp
-    state["session"] = session
 
-    return state
+    step_log("AgenticAI - investigator_node: Completed", time.time() - start_time)
+    return {
+        **state,
+        "analysis": analysis,
+        "transactions": table["rows"],
+        "trace": trace,
+        "session": session,
+    }
 
-def general_qa_node(state: BreaksGraphState) -> BreaksGraphState:
+async def general_qa_node(state: BreaksGraphState) -> BreaksGraphState:
     user_q = state["user_question"]
     trace: List[TraceEvent] = state.get("trace", [])
     session = state.get("session", {}) or {}
 
-    turns = session.get("turns", [])
-    recent = turns[-6:]
-    recent_text = "\n".join(
-        [f"{t.get('role','')}: {t.get('content','')}"
-         for t in recent if isinstance(t, dict)]
-    ).strip()
+    recent_text = recent_context(session)
 
     last_answer = session.get("last_answer", "")
-    answer = answer_general_question(
+    answer = await aanswer_general_question(
         user_question=user_q,
         recent_turns=recent_text,
         last_answer=last_answer,
     )
 
-    trace.append(
+    _add_trace(trace,
         {
             "node": "General Question Agent",
             "stage": "llm_analysis",
@@ -262,25 +355,135 @@ def general_qa_node(state: BreaksGraphState) -> BreaksGraphState:
 
 # ------------- Graph Wiring --------------
 def build_breaks_poc_graph():
+    # Deferred: langgraph is the single most expensive import on the app.main startup path
+    from langgraph.graph import StateGraph, END
+
     graph = StateGraph(BreaksGraphState)
 
     graph.add_node("router", router_node)
     graph.add_node("breaks_analysis", breaks_node)
+    graph.add_node("investigator", investigator_node)
     graph.add_node("general_qa", general_qa_node)
 
     graph.set_entry_point("router")
     graph.add_conditional_edges("router", _route_next, {
         "breaks_analysis": "breaks_analysis",
+        "investigator": "investigator",
         "general_qa": "general_qa",
     })
 
     graph.add_edge("breaks_analysis", END)
+    graph.add_edge("investigator", END)
     graph.add_edge("general_qa", END)
 
     return graph.compile()
 
+_compiled_graph = None
+_compiled_graph_key: Tuple | None = None
+_compiled_graph_lock = threading.Lock()
+
+def _graph_config_key() -> Tuple:
+    # The graph captures these callables at compile time; swapping any of them (tests, hot patches) forces a rebuild
+    return (BreaksGraphState, router_node, breaks_node, investigator_node, general_qa_node, _route_next)
+
+def get_compiled_graph():
+    """ Return the process-wide compiled graph, building it on first use or after the node wiring changes. """
+    global _compiled_graph, _compiled_graph_key
+    key = _graph_config_key()
+    if _compiled_graph is not None and _compiled_graph_key == key:
+        return _compiled_graph
+    with _compiled_graph_lock:
+        if _compiled_graph is None or _compiled_graph_key != key:
+            start = time.perf_counter()
+            _compiled_graph = build_breaks_poc_graph()
+            _compiled_graph_key = key
+            step_log("AgenticAI - graph compiled", time.perf_counter() - start)
+        return _compiled_graph
+
+def reset_compiled_graph() -> None:
+    """ Drop the cached graph so the next turn compiles a fresh one. """
+    global _compiled_graph, _compiled_graph_key
+    with _compiled_graph_lock:
+        _compiled_graph = None
+        _compiled_graph_key = None
+
 # ---------------- Helper -----------------
-async def handle_user_turn(user_id: str, session_id: str, user_question: str) -> BreaksGraphState:
+async def handle_user_turn(
+        user_id: str,
+        session_id: str,
+        user_question: str,
+        response_mode: str = "full",
+) -> Dict[str, Any]:
+    """
+    Run one chat turn. response_mode="full" returns the final graph state with the whole
+    session embedded; "delta" returns only this turn (see _turn_delta).
+    """
+    # Stamp user/session onto every LLM call logged during this turn
+    token = set_log_context(user_id=user_id, session_id=session_id)
+    try:
+        # Turns on the same session run one at a time so neither overwrites the other's memory
+        async with session_lock(user_id, session_id):
+            state = await _run_user_turn(user_id, session_id, user_question)
+    finally:
+        reset_log_context(token)
+
+    if response_mode == "delta":
+        return _to_jsonable(_turn_delta(state))
+    # If your FastAPI endpoint returns state directly, this prevents serialization issues:
+    return _to_jsonable(state)
+
+async def stream_user_turn(
+        user_id: str,
+        session_id: str,
+        user_question: str,
+        response_mode: str = "delta",
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run one chat turn and yield events as they happen: "trace" for each TraceEvent,
+    "token" for each chunk of LLM text, then "final" with the handle_user_turn result
+    (or "error"). Cancelling the consumer cancels the turn.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run() -> None:
+        token = set_event_sink(queue.put_nowait)
+        try:
+            result = await handle_user_turn(user_id, session_id, user_question, response_mode=response_mode)
+            queue.put_nowait({"event": "final", "data": result})
+        except Exception as e:  # noqa: BLE001
+            print("=== SERVER ERROR (stream) ===")
+            print(traceback.format_exc())
+            queue.put_nowait({"event": "error", "data": {"detail": str(e)}})
+        finally:
+            reset_event_sink(token)
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while (item := await queue.get()) is not None:
+            yield item
+    finally:
+        if not task.done():
+            task.cancel()
+
+_TURN_TOOL_OUTPUT_KEYS = ("breaks", "lineage_paths", "lineage_summary", "transactions")
+
+def _turn_delta(state: BreaksGraphState) -> Dict[str, Any]:
+    """ This turn's answer, trace and tool outputs plus the session version, without the session itself. """
+    session = state.get("session") or {}
+    return {
+        "user_id": session.get("user_id"),
+        "session_id": session.get("session_id"),
+        "session_version": session.get("version", 0),
+        "user_question": state.get("user_question", ""),
+        "analysis": state.get("analysis", ""),
+        "selected_tool": state.get("selected_tool", ""),
+        "routing_reason": state.get("routing_reason", ""),
+        "trace": state.get("trace", []),
+        "tool_outputs": {k: state[k] for k in _TURN_TOOL_OUTPUT_KEYS if state.get(k)},
+    }
+
+async def _run_user_turn(user_id: str, session_id: str, user_question: str) -> BreaksGraphState:
     mem = load_session(user_id, session_id)
 
     # Safeguards for brand-new / older sessions missing keys
@@ -293,9 +496,22 @@ async def handle_user_turn(user_id: str, session_id: str, user_question: str) ->
     # Add new user turn
     mem["turns"].append({"role": "user", "content": user_question, "meta": {}})
 
-    # Run graph with session injected
-    app = build_breaks_poc_graph()
-    state: BreaksGraphState = await app.ainvoke({"user_question": user_question, "trace": [], "session": mem})
+    # A feed/date named in the question applies to this turn and sticks for the follow-ups
+    source = extract_source(user_question)
+    mem.update(source)
+
+    # A near-duplicate question over the same feed/date skips the router, tools and LLM entirely
+    partition = _resolve_lineage_source(source, mem)
+    state = _semantic_cache_lookup(user_question, partition, mem)
+    if state is not None:
+        for event in state["trace"]:
+            emit("trace", event)
+        emit("token", {"agent": "semantic_cache", "text": state["analysis"]})
+    else:
+        # Run graph with session injected
+        app = get_compiled_graph()
+        state: BreaksGraphState = await app.ainvoke({"user_question": user_question, "trace": [], "session": mem, **source})
+        _semantic_cache_store(user_question, partition, state)
 
     # Persist assistant answer to memory
     assistant_answer = (state.get("analysis") or "").strip()
@@ -322,21 +538,101 @@ async def handle_user_turn(user_id: str, session_id: str, user_question: str) ->
     if "lineage_summary" in state and state["lineage_summary"]:
         mem["last_tool_outputs"]["lineage_summary"] = state["lineage_summary"]
 
+    # Bumped once per turn so clients holding a delta stream can tell when they missed one
+    mem["version"] = int(mem.get("version", 0)) + 1
+
+    # Keep the raw transcript bounded; older turns go to the cold archive and the rolling summary
+    archived = apply_memory_policy(mem)
+
     # If you store anything else later (lineage diagrams, exposures, etc...), run it through _to_jsonable as well.
     # Save session (must be JSON serializable)
     save_session(_to_jsonable(mem))
+    if archived:
+        schedule_summary(user_id, session_id)
 
     # Return updated state - keep session json-safe too
     state["session"] = mem
+    state.pop("prefetched", None)
+    return state
 
-    # If your FastAPI endpoint returns state directly, this prevents serialization issues:
-    return _to_jsonable(state)
+def _get_semantic_cache():
+    # Deferred: the semantic cache pulls in numpy
+    from mcp_server.llm.semantic_cache import get_semantic_cache
+    return get_semantic_cache()
+
+def _semantic_cache_lookup(user_question: str, partition: Tuple[str, str], mem: SessionMemory) -> BreaksGraphState | None:
+    cache = _get_semantic_cache()
+    if cache is None:
+        return None
+
+    hit = cache.lookup(user_question, partition)
+    if hit is None:
+        return None
+
+    step_log(f"AgenticAI - semantic cache hit (similarity={hit.similarity:.3f})", 0)
+    return {
+        **hit.extra,
+        "user_question": user_question,
+        "analysis": hit.answer,
+        "selected_tool": hit.selected_tool,
+        "routing_reason": f'Answered from a recent near-identical question: "{hit.question}"',
+        "trace": [
+            {
+                "node": "Semantic Cache",
+                "stage": "cache_hit",
+                "message": "Reused a recent answer to a near-identical question over the same data.",
+                "extra": {
+                    "matched_question": hit.question,
+                    "similarity": round(hit.similarity, 4),
+                    "age_seconds": round(hit.age_seconds, 1),
+                    "selected_tool": hit.selected_tool,
+                    "feed_name": partition[0],
+                    "as_of_date": partition[1],
+                },
+            }
+        ],
+        "session": mem,
+    }
+
+def _semantic_cache_store(user_question: str, partition: Tuple[str, str], state: BreaksGraphState) -> None:
+    cache = _get_semantic_cache()
+    if cache is None:
+        return
+
+    # Tool outputs go with the answer so a hit leaves follow-ups (e.g. transactions) something to use
+    extra = {}
+    if state.get("breaks"):
+        extra["breaks"] = _to_jsonable(state["breaks"])
+    if state.get("lineage_paths"):
+        extra["lineage_paths"] = list(state["lineage_paths"])
+        extra["lineage_summary"] = state.get("lineage_summary", "")
+    cache.store(
+        user_question,
+        (state.get("analysis") or "").strip(),
+        state.get("selected_tool", ""),
+        partition,
+        extra=extra,
+    )
 
 def extract_hop_id(text: str) -> str | None:
     # very simple heuristic; adjust as needed
     m = re.search(r"\bHOP[_-]?\w+\b", text.upper())
     return m.group(0) if m else None
 
+_FEED_NAME_RE = re.compile(r"\b\w+~\w+\b")
+_RECON_DATE_RE = re.compile(r"\b(20\d{2})-?(\d{2})-?(\d{2})\b")
+
+def extract_source(text: str) -> Dict[str, str]:
+    """ feed_name / recon_run_date named in the question, e.g. "2052a~Loans" and "2025-10-15". """
+    source: Dict[str, str] = {}
+    feed = _FEED_NAME_RE.search(text or "")
+    if feed:
+        source["feed_name"] = feed.group(0)
+    date = _RECON_DATE_RE.search(text or "")
+    if date:
+        source["recon_run_date"] = "".join(date.groups())
+    return source
+
 def _split_explanation_and_commentary(text: str) -> tuple[str, str]:
     explanation = text
     commentary = ""
@@ -347,9 +643,16 @@ def _split_explanation_and_commentary(text: str) -> tuple[str, str]:
     return explanation, commentary
 
 def _route_next(state: BreaksGraphState) -> str:
-    return "breaks_analysis" if state.get("selected_tool") in {"get_top_breaks", "get_lineage"} else "general_qa"
+    selected_tool = state.get("selected_tool")
+    if selected_tool in {"get_top_breaks", "get_lineage"}:
+        return "breaks_analysis"
+    if selected_tool == "get_transactions":
+        return "investigator"
+    return "general_qa"
 
 def _to_jsonable(obj: Any) -> Any:
+    from fastapi.encoders import jsonable_encoder
+
     return jsonable_encoder(obj)
 
 def _resolve_lineage_source(state: BreaksGraphState, session: SessionMemory) -> Tuple[str, str]:
@@ -374,12 +677,11 @@ def _load_lineage_rows(feed_name: str, as_of_date: str) -> List[dict]:
 
 # ----------- Non-streaming runner (optional) ----------
 def run_breaks_poc(user_question: str) -> BreaksGraphState:
-    app = build_breaks_poc_graph()
-    final_state = app.invoke({"user_question": user_question, "trace": []})
-    return final_state
+    # All LLM-backed nodes are async, so drive the graph on a private event loop.
+    return asyncio.run(run_breaks_poc_async(user_question))
 
 async def run_breaks_poc_async(user_question: str) -> BreaksGraphState:
-    app = build_breaks_poc_graph()
+    app = get_compiled_graph()
     final_state = await app.ainvoke({"user_question": user_question, "trace": []})
     return final_state
 
@@ -390,7 +692,6 @@ if __name__ == "__main__":
     step_log("AgenticAI INIT: Start", 0)
     step_log("AgenticAI - INIT: Completed", elapsed)
 
-    import asyncio
     result = asyncio.run(run_breaks_poc_async(q))
 
     print("\n=== ANALYSIS (FINAL) ===")
@@ -1,9 +1,82 @@
-import json
-from typing import Any, Dict, List
+import os
+from typing import Any, Dict, List, Mapping, Optional
 
-from mcp_server.llm.adapter import get_vertex_object
+from mcp_server.llm.adapter import aget_vertex_object
+from mcp_server.llm.prompt_registry import get_prompt_registry
 
-_vertex = get_vertex_object()
+# The table is rendered locally; the LLM is only asked for a short narrative when this is on
+INVESTIGATOR_NARRATIVE_ENABLED = os.getenv("INVESTIGATOR_NARRATIVE_ENABLED", "0") == "1"
+
+def _table_config() -> Dict[str, Any]:
+    return get_prompt_registry().get("investigator_agent").raw.get("table") or {}
+
+def _truncate(text: str, max_chars: int, ellipsis: str) -> str:
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars - len(ellipsis)] + ellipsis
+    return text
+
+def _with_commas(value: Any) -> str:
+    """ 1234567.5 -> "1,234,567.50"; values that are not numbers are returned unchanged. """
+    if isinstance(value, bool):
+        return str(value)
+    try:
+        number = float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return "" if value is None else str(value)
+    return f"{int(number):,}" if number.is_integer() else f"{number:,.2f}"
+
+def _md_row(cells: List[str]) -> str:
+    return "| " + " | ".join(c.replace("|", "\\|").replace("\n", " ") for c in cells) + " |"
+
+def render_transactions_table(
+    hop_id: str,
+    rows: List[Mapping[str, Any]],
+    max_rows: Optional[int] = None,
+    table_cfg: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Format fetch_transactions rows with the rules in the `table:` section of investigator_agent.yml.
+    Returns {"title", "columns", "rows", "rows_returned", "rows_shown", "markdown"}, where rows are
+    dicts of display strings (ready for a DataFrame) and markdown is the same table for chat.
+    """
+    cfg = _table_config() if table_cfg is None else table_cfg
+    columns: List[str] = list(cfg.get("columns") or [])
+    max_rows = int(cfg.get("max_rows", 5)) if max_rows is None else max_rows
+    max_chars = int(cfg.get("max_cell_chars", 40))
+    ellipsis = cfg.get("ellipsis", "…")
+    comma_columns = set(cfg.get("comma_columns") or [])
+
+    hop_id = (hop_id or "").strip()
+    shown = list(rows[:max_rows])
+    if not columns and shown:
+        columns = list(shown[0].keys())
+
+    display_rows: List[Dict[str, str]] = []
+    for row in shown:
+        display: Dict[str, str] = {}
+        for col in columns:
+            value = row.get(col)
+            cell = _with_commas(value) if col in comma_columns else ("" if value is None else str(value))
+            display[col] = _truncate(cell, max_chars, ellipsis)
+        display_rows.append(display)
+
+    title = cfg.get("title", "Transaction details for {hop_id}").format(hop_id=hop_id)
+    lines = [f"### {title}", ""]
+    if display_rows:
+        lines.append(_md_row(columns))
+        lines.append("|" + "---|" * len(columns))
+        lines += [_md_row([r[c] for c in columns]) for r in display_rows]
+    else:
+        lines.append("No transactions were returned.")
+
+    return {
+        "title": title,
+        "columns": columns,
+        "rows": display_rows,
+        "rows_returned": len(rows),
+        "rows_shown": len(display_rows),
+        "markdown": "\n".join(lines),
+    }
 
 def format_transactions_markdown_table(
     user_question: str,
@@ -12,23 +85,21 @@ def format_transactions_markdown_table(
     max_rows: int = 5,
 ) -> str:
     """
-    Use investigator_agent.yml to convert transaction rows into a Markdown table for Streamlit.
+    Convert transaction rows into a Markdown table for Streamlit (rendered locally, no LLM call).
     """
-    user_question = (user_question or "").strip()
-    hop_id = (hop_id or "").strip()
-
-    # Keep payload small for context limits
-    slim_rows = rows[:max_rows]
-    rows_json = json.dumps(slim_rows, indent=2, default=str)
+    return render_transactions_table(hop_id, rows, max_rows=max_rows)["markdown"]
 
-    return _vertex.generate_from_config(
+async def anarrate_transactions(user_question: str, hop_id: str, table: Mapping[str, Any]) -> str:
+    """ Optional short commentary on a rendered transactions table (LLM call). """
+    vertex = await aget_vertex_object()
+    return await vertex.agenerate_from_config(
         agent_config_name="investigator_agent",
         template_vars={
-            "user_question": user_question,
-            "hop_id": hop_id,
-            "rows_json": rows_json,
-            "rows_returned": str(len(rows)),
-            "rows_shown": str(len(slim_rows)),
+            "user_question": (user_question or "").strip(),
+            "hop_id": (hop_id or "").strip(),
+            "table_markdown": table["markdown"],
+            "rows_returned": str(table["rows_returned"]),
+            "rows_shown": str(table["rows_shown"]),
         },
         json_mode=False,
     )
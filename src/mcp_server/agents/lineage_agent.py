@@ -1,9 +1,7 @@
-import json
 from typing import Iterable, Mapping
 
-from mcp_server.llm.adapter import get_vertex_object
-
-_vertex = get_vertex_object()
+from mcp_server.llm.adapter import aget_vertex_object, get_vertex_object
+from mcp_server.llm.payload_encoder import encode_for_prompt
 
 
 def explain_lineage(user_question: str, lineage_rows: Iterable[Mapping[str, str]]) -> str:
@@ -11,9 +9,25 @@ def explain_lineage(user_question: str, lineage_rows: Iterable[Mapping[str, str]
     Generate a lineage diagram and commentary from hop-level lineage rows.
     lineage_rows should be an iterable of dicts containing prev_hop_id, hop_id, and next_hop_id.
     """
-    lineage_json = json.dumps(list(lineage_rows), indent=2, default=str)
+    lineage_json = encode_for_prompt("breaks_agent_lineage", lineage_rows)
+
+    return get_vertex_object().generate_from_config(
+        agent_config_name="breaks_agent_lineage",
+        template_vars={
+            "user_question": user_question,
+            "lineage_json": lineage_json,
+        },
+        json_mode=False,
+    )
+
+
+async def aexplain_lineage(user_question: str, lineage_rows: Iterable[Mapping[str, str]]) -> str:
+    """ Awaitable variant of explain_lineage. """
+    lineage_json = encode_for_prompt("breaks_agent_lineage", lineage_rows)
+
+    vertex = await aget_vertex_object()
 
-    return _vertex.generate_from_config(
+    return await vertex.agenerate_from_config(
         agent_config_name="breaks_agent_lineage",
         template_vars={
             "user_question": user_question,
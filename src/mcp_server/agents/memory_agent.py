@@ -0,0 +1,13 @@
+from mcp_server.llm.adapter import aget_vertex_object
+
+async def asummarize_turns(previous_summary: str, turns: str) -> str:
+    """ Fold older conversation turns into the rolling session summary. """
+    vertex = await aget_vertex_object()
+    return await vertex.agenerate_from_config(
+        agent_config_name="memory_summarizer",
+        template_vars={
+            "previous_summary": (previous_summary or "").strip(),
+            "turns": turns,
+        },
+        json_mode=False
+    )
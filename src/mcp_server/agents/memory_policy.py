@@ -0,0 +1,133 @@
+import asyncio
+import json
+import os
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+from mcp_server.agents.session_types import SessionMemory, Turn
+from utils.logconfig import step_log
+from utils.event_stream import set_event_sink
+from utils.session_store import load_session, save_session, session_lock
+
+# Raw turns kept in the session; older ones are archived and folded into session["summary"]
+MEMORY_WINDOW_TURNS = int(os.getenv("MEMORY_WINDOW_TURNS", "12"))
+# Trim only once this many turns have piled up past the window, so archiving/summarising is batched
+MEMORY_FOLD_BATCH_TURNS = int(os.getenv("MEMORY_FOLD_BATCH_TURNS", "8"))
+# Turns shown to the router / general agents
+RECENT_TURNS_IN_PROMPT = int(os.getenv("RECENT_TURNS_IN_PROMPT", "6"))
+MEMORY_ARCHIVE_DIR = Path(os.getenv("MEMORY_ARCHIVE_DIR", "logs/session_archive"))
+MEMORY_SUMMARY_ENABLED = os.getenv("MEMORY_SUMMARY_ENABLED", "1") == "1"
+
+def recent_context(session: SessionMemory, max_turns: int = RECENT_TURNS_IN_PROMPT) -> str:
+    """ Rolling summary (if any) followed by the last few raw turns, for prompts. """
+    lines: List[str] = []
+    summary = (session.get("summary") or "").strip()
+    if summary:
+        lines.append(f"summary of earlier conversation: {summary}")
+    turns = session.get("turns", [])
+    lines += [f"{t.get('role','')}: {t.get('content','')}" for t in turns[-max_turns:] if isinstance(t, dict)]
+    return "\n".join(lines).strip()
+
+def _archive_path(user_id: str, session_id: str, archive_dir: Path = MEMORY_ARCHIVE_DIR) -> Path:
+    return archive_dir / f"{user_id}__{session_id}.jsonl"
+
+def archive_turns(user_id: str, session_id: str, turns: Iterable[Turn], archive_dir: Path = MEMORY_ARCHIVE_DIR) -> None:
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    with open(_archive_path(user_id, session_id, archive_dir), "a", encoding="utf-8") as f:
+        f.writelines(json.dumps(t, ensure_ascii=False) + "\n" for t in turns)
+
+def read_archived_turns(
+        user_id: str,
+        session_id: str,
+        start: int = 0,
+        stop: int | None = None,
+        archive_dir: Path = MEMORY_ARCHIVE_DIR,
+) -> List[Turn]:
+    path = _archive_path(user_id, session_id, archive_dir)
+    if not path.exists():
+        return []
+    turns: List[Turn] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for i, line in enumerate(f):
+            if stop is not None and i >= stop:
+                break
+            if i >= start and line.strip():
+                turns.append(json.loads(line))
+    return turns
+
+def apply_memory_policy(
+        mem: SessionMemory,
+        window: int = MEMORY_WINDOW_TURNS,
+        batch: int = MEMORY_FOLD_BATCH_TURNS,
+        archive_dir: Path = MEMORY_ARCHIVE_DIR,
+) -> int:
+    """
+    Keep at most window + batch raw turns in mem. When that is exceeded, everything
+    before the last `window` turns is appended to the cold archive and removed.
+    Returns the number of turns archived.
+    """
+    turns = mem.get("turns", [])
+    if len(turns) <= window + batch:
+        return 0
+
+    overflow = turns[:len(turns) - window]
+    archive_turns(mem["user_id"], mem["session_id"], overflow, archive_dir)
+    mem["turns"] = turns[len(turns) - window:]
+    mem["archived_turns"] = int(mem.get("archived_turns", 0)) + len(overflow)
+    return len(overflow)
+
+# -----------------------------------------------------------
+# Background summarisation
+# -----------------------------------------------------------
+_summary_tasks: Dict[tuple, "asyncio.Task[Any]"] = {}
+
+def _format_turns(turns: Iterable[Turn]) -> str:
+    return "\n".join(f"{t.get('role','')}: {t.get('content','')}" for t in turns)
+
+async def _summarize_session(user_id: str, session_id: str, archive_dir: Path) -> None:
+    from mcp_server.agents.memory_agent import asummarize_turns
+
+    # Spawned inside a turn: don't stream summary tokens to that turn's client
+    set_event_sink(None)
+    while True:
+        mem = load_session(user_id, session_id)
+        upto = int(mem.get("summary_upto", 0))
+        archived = int(mem.get("archived_turns", 0))
+        if archived <= upto:
+            return
+
+        start_time = time.time()
+        turns = read_archived_turns(user_id, session_id, upto, archived, archive_dir)
+        summary = await asummarize_turns(mem.get("summary", ""), _format_turns(turns))
+
+        async with session_lock(user_id, session_id):
+            mem = load_session(user_id, session_id)
+            if int(mem.get("summary_upto", 0)) != upto:
+                return
+            mem["summary"] = (summary or "").strip()
+            mem["summary_upto"] = archived
+            save_session(mem)
+        step_log(f"AgenticAI - session summary folded {archived - upto} turns", time.time() - start_time)
+
+async def _run_summary_task(key: tuple, archive_dir: Path) -> None:
+    try:
+        await _summarize_session(*key, archive_dir)
+    except Exception:
+        # The archived turns stay pending and are picked up by the next fold
+        print("=== SESSION SUMMARY ERROR ===")
+        print(traceback.format_exc())
+    finally:
+        _summary_tasks.pop(key, None)
+
+def schedule_summary(user_id: str, session_id: str, archive_dir: Path = MEMORY_ARCHIVE_DIR) -> "asyncio.Task[Any] | None":
+    """ Fold newly archived turns into the session summary off the request path.
+        At most one summariser runs per session; it loops until it has caught up. """
+    if not MEMORY_SUMMARY_ENABLED:
+        return None
+    key = (user_id, session_id)
+    task = _summary_tasks.get(key)
+    if task is None or task.done():
+        task = asyncio.get_running_loop().create_task(_run_summary_task(key, archive_dir))
+        _summary_tasks[key] = task
+    return task
@@ -1,11 +1,9 @@
-from mcp_server.llm.adapter import get_vertex_object
-
-_vertex = get_vertex_object()
+from mcp_server.llm.adapter import aget_vertex_object, get_vertex_object
 
 def route_question(user_question: str, recent_turns: str = "") -> dict:
     """Use router_agent.yml to decide which tool to use.
        Return a dict like ("tool_name", "get_top_breaks", "reason", "..."}"""
-    resp = _vertex.generate_from_config(
+    resp = get_vertex_object().generate_from_config(
         agent_config_name="router_agent",
         template_vars={
             "user_question": user_question,
@@ -14,4 +12,16 @@ def route_question(user_question: str, recent_turns: str = "") -> dict:
         json_mode=True,
     )
 
-    return resp
\ No newline at end of file
+    return resp
+
+async def aroute_question(user_question: str, recent_turns: str = "") -> dict:
+    """ Awaitable variant of route_question. """
+    vertex = await aget_vertex_object()
+    return await vertex.agenerate_from_config(
+        agent_config_name="router_agent",
+        template_vars={
+            "user_question": user_question,
+            "recent_turns": recent_turns,
+        },
+        json_mode=True,
+    )
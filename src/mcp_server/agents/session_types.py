@@ -11,4 +11,8 @@ class SessionMemory(TypedDict, total=False):
     turns: List[Turn]   # Rolling conversation transcript
     last_answer: str    # Last assistant answer shown to the user
     last_agent: str     # Which agent answered last
-    last_tool_outputs: Dict[str, Any]   # e.g. (breaks": [••]) from prior turns
\ No newline at end of file
+    last_tool_outputs: Dict[str, Any]   # e.g. (breaks": [••]) from prior turns
+    summary: str        # Rolling summary of turns that left the window
+    archived_turns: int # Turns moved to the cold archive so far
+    summary_upto: int   # How many archived turns the summary covers
+    version: int        # Incremented once per completed turn
\ No newline at end of file
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from mcp_server.agents.fast_router import FastRoute
+
+SPECULATIVE_PREFETCH_ENABLED = os.getenv("SPECULATIVE_PREFETCH_ENABLED", "1") == "1"
+# Lowest fast-router confidence at which a data fetch is started before the LLM router answers
+SPECULATIVE_MIN_CONFIDENCE = float(os.getenv("SPECULATIVE_MIN_CONFIDENCE", "0.4"))
+
+PREFETCHABLE_TOOLS = {"get_top_breaks", "get_lineage"}
+
+def predict_tool(fast: Optional[FastRoute], last_agent: str = "") -> Optional[str]:
+    """
+    Guess which data tool the router will pick. Uses the fast router's best guess even
+    when it was not confident enough to route; with no rule match at all, assumes a
+    follow-up on whatever data the previous turn used.
+    """
+    if fast is not None:
+        if fast.tool_name in PREFETCHABLE_TOOLS and fast.confidence >= SPECULATIVE_MIN_CONFIDENCE:
+            return fast.tool_name
+        return None
+    return last_agent if last_agent in PREFETCHABLE_TOOLS else None
+
+class SpeculationStats:
+    """ Counters for speculative prefetches. wasted_work_ratio is the share of prefetch
+        time spent on fetches that routing then discarded. """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+        self.failed = 0
+        self.useful_seconds = 0.0
+        self.wasted_seconds = 0.0
+
+    def record(self, outcome: str, seconds: float) -> None:
+        with self._lock:
+            if outcome == "used":
+                self.used += 1
+                self.useful_seconds += seconds
+            else:
+                if outcome == "failed":
+                    self.failed += 1
+                else:
+                    self.discarded += 1
+                self.wasted_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.useful_seconds + self.wasted_seconds
+            return {
+                "started": self.started,
+                "used": self.used,
+                "discarded": self.discarded,
+                "failed": self.failed,
+                "hit_rate": (self.used / self.started) if self.started else None,
+                "useful_seconds": round(self.useful_seconds, 3),
+                "wasted_seconds": round(self.wasted_seconds, 3),
+                "wasted_work_ratio": (self.wasted_seconds / total) if total else None,
+            }
+
+_stats = SpeculationStats()
+
+def get_speculation_stats() -> Dict[str, Any]:
+    return _stats.snapshot()
+
+class Prefetch:
+    """ A data fetch started before routing finished. Either resolve() it once the router
+        agrees, or discard() it (the task is cancelled if still running). """
+
+    def __init__(self, tool_name: str, fetch: Callable[[], Awaitable[Any]]):
+        self.tool_name = tool_name
+        self._started_at = time.perf_counter()
+        self._finished_at: Optional[float] = None
+        self._task = asyncio.get_running_loop().create_task(self._run(fetch))
+        with _stats._lock:
+            _stats.started += 1
+
+    async def _run(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fetch()
+        finally:
+            self._finished_at = time.perf_counter()
+
+    def _elapsed(self) -> float:
+        return (self._finished_at or time.perf_counter()) - self._started_at
+
+    async def resolve(self) -> Any:
+        try:
+            result = await self._task
+        except Exception:
+            _stats.record("failed", self._elapsed())
+            raise
+        _stats.record("used", self._elapsed())
+        return result
+
+    def discard(self) -> None:
+        if not self._task.done():
+            self._task.cancel()
+        elif not self._task.cancelled():
+            self._task.exception()  # mark retrieved so a failed, unused fetch is not reported
+        _stats.record("discarded", self._elapsed())
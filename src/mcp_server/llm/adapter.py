@@ -1,17 +1,25 @@
-import os, json, requests, traceback, asyncio, datetime, ast, time, yaml, vertexai
-from typing import Any, Dict, List, Optional
-from jinja2 import Environment, StrictUndefined
-from pathlib import Path
-from vertexai_generative_models import (GenerativeModel, GenerationConfig)
-from google.oauth2.credentials import Credentials
+import os, json, traceback, asyncio, ast, time, threading, weakref
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from dotenv import load_dotenv
 from utils.logconfig import step_log
+from utils.event_stream import emit, streaming_enabled
+from mcp_server.llm.prompt_registry import get_jinja_env, get_prompt_registry
+from mcp_server.llm.model_pool import get_model_pool
+from mcp_server.llm.response_cache import ResponseCache, get_response_cache
+from mcp_server.llm.query_log import QUERY_LOG_FILE, get_query_log, iter_log_entries
+from mcp_server.llm.query_index import attach_query_index, ensure_backfilled, get_query_index
+from mcp_server.llm.token_manager import TokenManager
+
+# vertexai, google-auth and requests are imported where used, so importing the agents
+# (and starting app.main) does not pay for them until the first LLM call.
+if TYPE_CHECKING:
+    from vertexai_generative_models import GenerativeModel
 
 load_dotenv()
 
 # Set the certificate bundle path
 os.environ["REQUESTS_CA_BUNDLE"] = "./.certs/sertprod-pem"
-LOG_FILE = "logs/query_logs.json"
+LOG_FILE = QUERY_LOG_FILE
 
 def get_access_token():
     url = "https://aaabbb.com/token/v2/d8ba..."
@@ -25,6 +33,8 @@ def get_access_token():
         "clientScopes": ["abcdef12-6e52-..."] # read/ write scope
     }
 
+    import requests
+
     response = requests.post(url, headers=headers, json=data)
     # Check for successful response
     if response.status_code == 200:
@@ -41,26 +51,27 @@ class VertexGenAI:
         self.default_seed = int(os.getenv("VERTEX_SEED", "42"))
         self.metadata = [("gw-user", os.getenv("USERNAME"))]
 
-        credentials = Credentials(get_access_token())
+    def apply_access_token(self, token: str) -> None:
+        """ Point vertexai at fresh credentials. The adapter itself is kept; only
+            pooled models (bound to the old credentials) are dropped. """
+        import vertexai
+        from google.oauth2.credentials import Credentials
+
+        credentials = Credentials(token)
         vertexai.init(
             project="pr123434",
             api_transport="rest",
             api_endpoint="https://abcde.com.....",
             credentials=credentials,
         )
+        get_model_pool().invalidate()
 
     def _load_agent_config(self, agent_config_name: str) -> Dict[str, Any]:
-        cfg_dir = Path(__file__).resolve().parents[1] / "agents" / "configs"
-        cfg_path = cfg_dir / f"{agent_config_name}.yml"
-        if not cfg_path.exists():
-            raise FileNotFoundError(f"Agent config not found: (cfg_path)")
-
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
-            return cfg
+        return self._load_agent_yaml(agent_config_name)
 
     def _render(self, template: str, template_vars: dict) -> str:
-        env = Environment(undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+        """ Render an ad-hoc template string. Agent configs use the compiled registry instead. """
+        env = get_jinja_env()
         safe_vars = dict(template_vars or {})
         safe_vars.setdefault("recent_turns", "")
         safe_vars.setdefault("last_answer", "")
@@ -132,7 +143,7 @@ class VertexGenAI:
         model = self._build_model(
             system_prompt = system_prompt,
             gemini_model = gemini_model,
-            esponse_mime_type = "application/json",
+            response_mime_type = "application/json",
             temperature = temperature,
             seed = seed,
         )
@@ -174,17 +185,8 @@ class VertexGenAI:
             self,
             agent_config_name: str
     ) -> Dict[str, Any]:
-        """ Load an agent config YAML from agents/configs/<name>.yml """
-        base_dir = os.path.dirname(os.path.dirname(__file__))  # mcp_server/
-        yaml_path = os.path.join(
-            base_dir, "agents", "configs", f"{agent_config_name}.yml"
-        )
-
-        if not os.path.exists(yaml_path):
-            raise FileNotFoundError(f"Agent config not found: {yaml_path}")
-
-        with open(yaml_path, "r", encoding="utf-8") as f:
-            return json.loads(json.dumps(__import__("yaml").safe_load(f)))
+        """ Return the parsed agent config YAML from agents/configs/<name>.yml (cached). """
+        return get_prompt_registry().get(agent_config_name).raw
 
     @staticmethod
     def _clean_unicode(text: str) -> str:
@@ -193,72 +195,71 @@ class VertexGenAI:
 
     @staticmethod
     def _log_entry(entry: Dict[str, Any]) -> None:
-        """ Append a JSON entry to the LOG_FILE. (simple list). """
+        """ Append a JSON entry to the query log (queued; written by a background thread). """
         try:
-            if os.path.exists(LOG_FILE):
-                with open(LOG_FILE, 'r', encoding="utf-8") as f:
-                    try:
-                        logs = json.load(f)
-                    except json.JSONDecodeError:
-                        logs = []
-            else:
-                logs = []
-
-            # if logs is not a list (because you are using dict structure elsewhere)
-            # skip this logging to avoid clobbering.
-            if not isinstance(logs, list):
-                return
-
-            logs.append(entry)
-            with open(LOG_FILE, 'w', encoding="utf-8") as f:
-                json.dump(logs, f, indent=2, ensure_ascii=False)
-
+            writer = get_query_log()
+            # The index (and its SQLite file) is opened with the first entry, not at import
+            attach_query_index(writer)
+            writer.write(entry)
         except Exception:
             pass
 
-    def _build_mode(
+    def _build_model(
             self,
             system_prompt: Optional[str] = None,
             gemini_model: Optional[str] = None,
             response_mime_type: Optional[str] = None,
             temperature: Optional[float] = None,
             seed: Optional[int] = None,
-    ) -> GenerativeModel:
-        """ Build and return a GenerativeModel instance """
+            tools: Optional[List] = None,
+    ) -> "GenerativeModel":
+        """ Return a GenerativeModel instance, reusing a pooled one when the
+            (model, system prompt, mime type, temperature, seed) key matches. """
         model_name = gemini_model or self.default_model
         temp = self.default_temperature if temperature is None else temperature
         seed_val = self.default_seed if seed is None else seed
 
-        gen_cfg = GenerationConfig(
-            respones_mime_type = response_mime_type,
-            temperature = temp,
-            seed = seed_val
-        )
+        def _factory() -> "GenerativeModel":
+            from vertexai_generative_models import GenerativeModel, GenerationConfig
 
-        kwargs: Dict[str, Any] = { "generation_config": gen_cfg }
-        if system_prompt:
-            kwargs["system_instruction"] = [system_prompt]
+            gen_cfg = GenerationConfig(
+                response_mime_type = response_mime_type,
+                temperature = temp,
+                seed = seed_val
+            )
 
-        model = GenerativeModel(model_name, **kwargs)
-        return model
+            kwargs: Dict[str, Any] = { "generation_config": gen_cfg }
+            if system_prompt and system_prompt.strip():
+                kwargs["system_instruction"] = [system_prompt]
+            if tools:
+                kwargs["tools"] = tools
 
-    def generate_from_config(
+            return GenerativeModel(model_name, **kwargs)
+
+        # Tool declarations are not part of the key, so tool-enabled models are never pooled.
+        if tools:
+            return _factory()
+
+        key = get_model_pool().make_key(model_name, system_prompt, response_mime_type, temp, seed_val)
+        return get_model_pool().get_or_create(key, _factory)
+
+    def _prepare_from_config(
             self,
             agent_config_name: str,
             template_vars: Dict[str, Any],
             json_mode: bool = False,
             tools: Optional[List] = None,
-    ) -> Any:
-        cfg_yaml = self._load_agent_yaml(agent_config_name)
+    ) -> Dict[str, Any]:
+        """ Load the agent config and render its prompts for one call.
+            Returns the call settings, including the response cache key (None if uncached). """
+        agent_cfg = get_prompt_registry().get(agent_config_name)
 
-        system_prompt_template = cfg_yaml.get("system_prompt", "")
-        task_prompt_template = cfg_yaml.get("task_prompt", "")
-        model_name = cfg_yaml.get("model_name") or self.default_model
-        temperature = float(cfg_yaml.get("temperature", self.default_temperature))
+        model_name = agent_cfg.model_name or self.default_model
+        temperature = agent_cfg.temperature if agent_cfg.temperature is not None else self.default_temperature
 
         # Render prompts (StrictUndefined will throw if user_question is missing)
-        system_prompt = self._render(system_prompt_template, template_vars or {}) if system_prompt_template.strip() else ""
-        input_prompt = self._render(task_prompt_template, template_vars or {}) if task_prompt_template.strip() else ""
+        system_prompt = agent_cfg.render_system(template_vars)
+        input_prompt = agent_cfg.render_task(template_vars)
 
         if not input_prompt or not str(input_prompt).strip():
             raise ValueError(
@@ -266,22 +267,89 @@ class VertexGenAI:
                 f"template_vars={template_vars}"
             )
 
-        gen_config_kwargs = dict(temperature=temperature)
-        if json_mode:
-            gen_config_kwargs["response_mime_type"] = "application/json"
-            gen_config_kwargs["seed"] = 42
-
-        model = GenerativeModel(
-            model_name = model_name,
-            system_instruction = [system_prompt] if system_prompt.strip() else None,
-            generation_config = GenerationConfig(**gen_config_kwargs),
-            tools = tools,
+        cache_key = None
+        if tools is None and get_response_cache() is not None:
+            cache_key = ResponseCache.make_key(
+                agent_config_name, model_name, temperature, self.default_seed,
+                system_prompt, input_prompt, json_mode,
+            )
+
+        return {
+            "agent_config_name": agent_config_name,
+            "model_name": model_name,
+            "temperature": temperature,
+            "system_prompt": system_prompt,
+            "input_prompt": input_prompt,
+            "json_mode": json_mode,
+            "tools": tools,
+            "cache_key": cache_key,
+            "cache_ttl": agent_cfg.raw.get("cache_ttl_seconds"),
+            "user_query": (template_vars or {}).get("user_question", ""),
+        }
+
+    def _model_for_call(self, call: Dict[str, Any]) -> "GenerativeModel":
+        return self._build_model(
+            system_prompt = call["system_prompt"],
+            gemini_model = call["model_name"],
+            response_mime_type = "application/json" if call["json_mode"] else None,
+            temperature = call["temperature"],
+            seed = self.default_seed,
+            tools = call["tools"],
         )
 
-        resp = model.generate_content(input_prompt)
+    @staticmethod
+    def _cached_text(call: Dict[str, Any]) -> Optional[str]:
+        cache = get_response_cache()
+        if cache is None or call["cache_key"] is None:
+            return None
+        return cache.get(call["cache_key"], call["agent_config_name"])
+
+    @staticmethod
+    def _store_text(call: Dict[str, Any], text: str) -> None:
+        cache = get_response_cache()
+        if cache is None or call["cache_key"] is None:
+            return
+        ttl = call["cache_ttl"]
+        cache.set(call["cache_key"], text, call["agent_config_name"], ttl=float(ttl) if ttl is not None else None)
+
+    def _log_config_call(self, call: Dict[str, Any], text: str, cached: bool, elapsed_time: float) -> None:
+        self._log_entry(
+            {
+                "kind": "config",
+                "agent_config_name": call["agent_config_name"],
+                "model_name": call["model_name"],
+                "temperature": call["temperature"],
+                "json_mode": call["json_mode"],
+                "cached": cached,
+                "elapsed_s": round(elapsed_time, 3),
+                "user_query": call["user_query"],
+                "generalized_response": text,
+            }
+        )
 
+    @staticmethod
+    def _response_text(resp) -> str:
+        text = getattr(resp, "text", None)
+        return text if text is not None else str(resp)
+
+    async def _astream_text(self, model: "GenerativeModel", prompt: str, agent_config_name: str) -> str:
+        """ Stream a generation, emitting each chunk as a "token" event; returns the full text. """
+        parts: List[str] = []
+        async for chunk in await model.generate_content_async(prompt, stream=True):
+            try:
+                piece = self._response_text(chunk)
+            except ValueError:
+                # Chunks without text (e.g. a safety/finish-only chunk) raise on .text
+                continue
+            if piece:
+                parts.append(piece)
+                emit("token", {"agent": agent_config_name, "text": piece})
+        return "".join(parts)
+
+    @staticmethod
+    def _parse_from_config(text: str, agent_config_name: str, json_mode: bool) -> Any:
+        """ Return the response text, or a dict when json_mode is set. """
         if json_mode:
-            text = getattr(resp, "text", None) or ""
             text = text.strip()
             if not text:
                 raise ValueError(f"[VertexGenAI] JSON mode response empty for {agent_config_name}")
@@ -291,7 +359,152 @@ class VertexGenAI:
             except json.JSONDecodeError as e:
                 raise ValueError(f"[VertexGenAI] JSON parse failed: {e}. Raw: {text[:500]}")
 
-        return getattr(resp, "text", str(resp))
+        return text
+
+    def generate_from_config(
+            self,
+            agent_config_name: str,
+            template_vars: Dict[str, Any],
+            json_mode: bool = False,
+            tools: Optional[List] = None,
+    ) -> Any:
+        start_time = time.time()
+        call = self._prepare_from_config(agent_config_name, template_vars, json_mode, tools)
+
+        cached = self._cached_text(call)
+        if cached is not None:
+            step_log(f"AgenticAI - generate_from_config({agent_config_name}): Cache hit", 0)
+            self._log_config_call(call, cached, True, time.time() - start_time)
+            return self._parse_from_config(cached, agent_config_name, json_mode)
+
+        resp = self._model_for_call(call).generate_content(call["input_prompt"])
+        text = self._response_text(resp)
+        result = self._parse_from_config(text, agent_config_name, json_mode)
+        self._store_text(call, text)
+        self._log_config_call(call, text, False, time.time() - start_time)
+        return result
+
+    async def agenerate_from_config(
+            self,
+            agent_config_name: str,
+            template_vars: Dict[str, Any],
+            json_mode: bool = False,
+            tools: Optional[List] = None,
+    ) -> Any:
+        """ Async variant of generate_from_config. The Gemini round trip is awaited
+            (never run on the event loop thread) and bounded by the LLM semaphore. """
+        start_time = time.time()
+        step_log(f"AgenticAI - agenerate_from_config({agent_config_name}): Start", 0)
+
+        call = self._prepare_from_config(agent_config_name, template_vars, json_mode, tools)
+
+        # Free-text answers are streamed to the client when a /chat/stream request is listening
+        stream = streaming_enabled() and not json_mode
+
+        cached = self._cached_text(call)
+        if cached is not None:
+            step_log(f"AgenticAI - agenerate_from_config({agent_config_name}): Cache hit", time.time() - start_time)
+            if stream:
+                emit("token", {"agent": agent_config_name, "text": cached})
+            self._log_config_call(call, cached, True, time.time() - start_time)
+            return self._parse_from_config(cached, agent_config_name, json_mode)
+
+        model = self._model_for_call(call)
+        async with get_llm_semaphore():
+            if stream:
+                text = await self._astream_text(model, call["input_prompt"], agent_config_name)
+            else:
+                text = self._response_text(await model.generate_content_async(call["input_prompt"]))
+
+        elapsed_time = time.time() - start_time
+        step_log(f"AgenticAI - agenerate_from_config({agent_config_name}): Completed", elapsed_time)
+
+        result = self._parse_from_config(text, agent_config_name, json_mode)
+        self._store_text(call, text)
+        self._log_config_call(call, text, False, elapsed_time)
+        return result
+
+    async def agenerate_content_json(
+            self,
+            input_prompt,
+            system_prompt: Optional[str] = None,
+            gemini_model: Optional[str] = None,
+            temperature: Optional[float] = None,
+            seed: Optional[int] = None,
+            metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """ Async variant of generate_content_json.
+            Returns a python dict. If parsing fails, returns {"error", "..."} """
+        start_time = time.time()
+        step_log("AgenticAI - agenerate_content_json: Start", 0)
+
+        model = self._build_model(
+            system_prompt = system_prompt,
+            gemini_model = gemini_model,
+            response_mime_type = "application/json",
+            temperature = temperature,
+            seed = seed,
+        )
+
+        try:
+            async with get_llm_semaphore():
+                resp = await model.generate_content_async(input_prompt)
+        except Exception as e:
+            elapsed_time = time.time() - start_time
+            step_log(f"AgenticAI - agenerate_content_json: Error {e}, traceback: {traceback.format_exc()}", elapsed_time)
+            return {"error": str(e)}
+
+        elapsed_time = time.time() - start_time
+        step_log("AgenticAI - agenerate_content_json: Completed", elapsed_time)
+
+        self._log_entry(
+            {
+                "kind": "text",
+                "input_prompt": input_prompt,
+                "system_prompt": system_prompt,
+                "model_name": gemini_model or self.default_model,
+                "temperature": temperature if temperature is not None else self.default_temperature,
+                "metadata": metadata or {},
+                "raw_response": str(resp),
+            }
+        )
+
+        try:
+            raw = "".join([p.text for p in resp.candidates[0].content.parts])
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON response: {e}")
+            return {"Error": "Invalid JSON response"}
+        except Exception as e:
+            print(f"Error generating content: {e}, traceback: {traceback.format_exc()}")
+            return {"Error": str(e)}
+
+# -----------------------------------------------------------
+# Process-wide cap on in-flight async LLM calls
+# -----------------------------------------------------------
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("VERTEX_MAX_CONCURRENT_CALLS", "8"))
+# One semaphore per event loop: a semaphore binds to the loop that first waits on it,
+# and run_breaks_poc / CLIs start a fresh loop with asyncio.run on every call
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_llm_semaphores_lock = threading.Lock()
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """ Return the running loop's semaphore that bounds concurrent async Gemini calls. """
+    loop = asyncio.get_running_loop()
+    with _llm_semaphores_lock:
+        semaphore = _llm_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = _llm_semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+    return semaphore
+
+def set_llm_concurrency(limit: int) -> None:
+    """ Resize the in-flight LLM call limit. Calls already holding a slot are unaffected. """
+    global MAX_CONCURRENT_LLM_CALLS
+    if limit < 1:
+        raise ValueError(f"LLM concurrency limit must be >= 1, got {limit}")
+    MAX_CONCURRENT_LLM_CALLS = limit
+    with _llm_semaphores_lock:
+        _llm_semaphores.clear()
 
 # -------------------------------------------------------------------
 completed_tasks = 0
@@ -306,11 +519,12 @@ async def generalize_result(llm_response,
 
     input_prompt = f"data_set {llm_response} and user_query {user_query}"
     try:
+        vertex = await aget_vertex_object()
         loop = asyncio.get_event_loop()
         print("Reading and Processing")
         response = await loop.run_in_executor(
             None,
-            get_vertex_object().generate_content_json,
+            vertex.generate_content_json,
             input_prompt,
             system_prompt,
             gemini_model
@@ -334,27 +548,49 @@ async def generalize_result(llm_response,
             end_time = time.time()
 
 # -----------------------------------------------------------
-# Singleton-style accessor with 28-minute refresh
+# Singleton-style accessor; credentials are refreshed in the background
 # -----------------------------------------------------------
+VERTEX_ADAPTER = os.getenv("VERTEX_ADAPTER", "vertex")  # "stub" runs offline with canned responses
+
 _vertex_object: Optional[VertexGenAI] = None
-_vertex_object_init_time: Optional[datetime.datetime] = None
+_token_manager: Optional[TokenManager] = None
+_vertex_object_lock = threading.Lock()
 
 def get_vertex_object() -> VertexGenAI:
-    """ Return a shared VertexGenAI instance, refreshing it every 28 minutes. """
-    global _vertex_object, _vertex_object_init_time
-
-    now = datetime.datetime.now()
-    if (
-        _vertex_object is None
-        or _vertex_object_init_time is None
-        or (now - _vertex_object_init_time).total_seconds() > 28 * 60
-    ):
-        _vertex_object = VertexGenAI()
-        _vertex_object_init_time = now
-        print("Refreshing VertexGenAI object/token")
+    """ Return the shared VertexGenAI instance.
+        The first call acquires a token; after that a background TokenManager swaps
+        credentials before expiry, so callers never wait on token acquisition. """
+    global _vertex_object, _token_manager
 
+    if _vertex_object is not None:
         return _vertex_object
 
+    with _vertex_object_lock:
+        if _vertex_object is None and VERTEX_ADAPTER == "stub":
+            from mcp_server.llm.stub_adapter import StubVertexGenAI
+            _vertex_object = StubVertexGenAI()
+        elif _vertex_object is None:
+            vertex_object = VertexGenAI()
+            manager = TokenManager(fetch_token=get_access_token, on_refresh=vertex_object.apply_access_token)
+            manager.ensure_token()
+            manager.start()
+            _token_manager = manager
+            _vertex_object = vertex_object
+    return _vertex_object
+
+async def aget_vertex_object() -> VertexGenAI:
+    """ get_vertex_object for coroutines: a cold start (the blocking token request) runs in a
+        worker thread, so the event loop keeps serving other requests meanwhile. """
+    if _vertex_object is not None:
+        return _vertex_object
+    return await asyncio.to_thread(get_vertex_object)
+
+def get_token_metrics() -> Dict[str, Any]:
+    """ Refresh count/latency/failure metrics of the background token manager. """
+    if _token_manager is None:
+        return {}
+    return _token_manager.metrics()
+
 # -----------------------------------------------------------
 # Helper: read past user queries from the log file
 # -----------------------------------------------------------
@@ -363,19 +599,15 @@ def get_user_queries(
         session_id: str,
         log_file: str = LOG_FILE,
 ) -> List[tuple[str, str]]:
-    if not os.path.exists(log_file):
-        return []
-
-    try:
-        with open(log_file, "r", encoding="utf-8") as f:
-            logs = json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        return []
+    """ Return (user_query, generalized_response) pairs logged for one user session, oldest first. """
+    index = get_query_index()
+    if index is not None and log_file == LOG_FILE and ensure_backfilled(index):
+        return index.session_queries(user_id, session_id)
 
-    user_sessions = logs.get(user_id, {}).get(session_id, {})
+    # No index, or it has not caught up with the log files yet: stream them
     results: List[tuple[str, str]] = []
 
-    for req in user_sessions.values():
+    for req in iter_log_entries(log_file, user_id=user_id, session_id=session_id):
         uq = req.get("user_query", "")
         gr = req.get("generalized_response", "")
         if uq or gr:
@@ -0,0 +1,77 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+MODEL_POOL_SIZE = int(os.getenv("VERTEX_MODEL_POOL_SIZE", "32"))
+
+ModelKey = Tuple[str, str, Optional[str], float, Optional[int]]
+
+class GenerativeModelPool:
+    """ LRU pool of ready-to-use GenerativeModel objects.
+        Keyed by (model_name, system prompt hash, mime type, temperature, seed). """
+
+    def __init__(self, max_size: int = MODEL_POOL_SIZE):
+        self.max_size = max(1, max_size)
+        self._models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(
+            model_name: str,
+            system_prompt: Optional[str],
+            response_mime_type: Optional[str],
+            temperature: float,
+            seed: Optional[int],
+    ) -> ModelKey:
+        prompt_hash = hashlib.sha256((system_prompt or "").encode("utf-8")).hexdigest()
+        return model_name, prompt_hash, response_mime_type, float(temperature), seed
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+
+        # Build outside the lock; a concurrent miss on the same key just builds twice.
+        model = factory()
+
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_size:
+                self._models.popitem(last=False)
+                self.evictions += 1
+        return model
+
+    def invalidate(self) -> None:
+        """ Drop every pooled model, e.g. after credentials were refreshed. """
+        with self._lock:
+            self._models.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._models),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+_model_pool = GenerativeModelPool()
+
+def get_model_pool() -> GenerativeModelPool:
+    return _model_pool
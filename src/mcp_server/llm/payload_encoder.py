@@ -0,0 +1,139 @@
+import csv
+import io
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+# Record original vs encoded payload sizes per agent. Off by default: it costs one extra
+# indent=2 json.dumps of the rows per prompt, which is what the encoding is meant to avoid
+PROMPT_PAYLOAD_STATS = os.getenv("PROMPT_PAYLOAD_STATS", "0") == "1"
+
+FORMATS = ("json", "columnar", "csv", "tsv", "markdown")
+
+def estimate_tokens(text: str) -> int:
+    """ Rough Gemini token count (~4 characters per token for English/JSON); good for comparisons. """
+    return (len(text) + 3) // 4
+
+def _as_dict(row: Any) -> Dict[str, Any]:
+    if isinstance(row, Mapping):
+        return dict(row)
+    return dict(vars(row))
+
+def _round(value: Any, digits: Optional[int]) -> Any:
+    if digits is None or isinstance(value, bool):
+        return value
+    if isinstance(value, float):
+        rounded = round(value, digits)
+        return int(rounded) if rounded.is_integer() else rounded
+    return value
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), default=str)
+    return str(value)
+
+def normalize_rows(
+        rows: Iterable[Any],
+        drop_fields: Sequence[str] = (),
+        round_digits: Optional[int] = None,
+) -> tuple[List[str], List[List[Any]]]:
+    """ (columns, values) with dropped fields removed and floats rounded. Column order follows first appearance. """
+    dicts = [_as_dict(r) for r in rows]
+    drop = set(drop_fields)
+    columns: List[str] = []
+    seen = set()
+    for d in dicts:
+        for key in d:
+            if key not in seen and key not in drop:
+                seen.add(key)
+                columns.append(key)
+    values = [[_round(d.get(c), round_digits) for c in columns] for d in dicts]
+    return columns, values
+
+def encode_rows(
+        rows: Iterable[Any],
+        fmt: str = "csv",
+        drop_fields: Sequence[str] = (),
+        round_digits: Optional[int] = None,
+) -> str:
+    """
+    Encode a list of records for a prompt.
+      json      - compact list of objects (keys repeated per row)
+      columnar  - {"columns": [...], "rows": [[...], ...]}
+      csv / tsv - header line plus one line per row
+      markdown  - pipe table
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown payload format {fmt!r}; expected one of {FORMATS}")
+    columns, values = normalize_rows(rows, drop_fields, round_digits)
+
+    if fmt == "json":
+        return json.dumps([dict(zip(columns, v)) for v in values], separators=(",", ":"), default=str)
+    if fmt == "columnar":
+        return json.dumps({"columns": columns, "rows": values}, separators=(",", ":"), default=str)
+    if fmt in ("csv", "tsv"):
+        buf = io.StringIO()
+        writer = csv.writer(buf, delimiter="," if fmt == "csv" else "\t", lineterminator="\n")
+        writer.writerow(columns)
+        writer.writerows([[_cell(x) for x in v] for v in values])
+        return buf.getvalue().rstrip("\n")
+
+    def md(cells: Iterable[Any]) -> str:
+        return "| " + " | ".join(_cell(c).replace("|", "\\|").replace("\n", " ") for c in cells) + " |"
+    lines = [md(columns), "|" + "---|" * len(columns)]
+    lines += [md(v) for v in values]
+    return "\n".join(lines)
+
+# -----------------------------------------------------------
+# Per-agent size accounting
+# -----------------------------------------------------------
+class PayloadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_agent: Dict[str, Dict[str, int]] = {}
+
+    def record(self, agent: str, before_tokens: int, after_tokens: int) -> None:
+        with self._lock:
+            s = self._by_agent.setdefault(agent, {"calls": 0, "before_tokens": 0, "after_tokens": 0})
+            s["calls"] += 1
+            s["before_tokens"] += before_tokens
+            s["after_tokens"] += after_tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                agent: {**s, "saved_pct": round(100 * (1 - s["after_tokens"] / s["before_tokens"]), 1) if s["before_tokens"] else 0.0}
+                for agent, s in self._by_agent.items()
+            }
+
+_payload_stats = PayloadStats()
+
+def get_payload_stats() -> Dict[str, Dict[str, Any]]:
+    """ {agent: {calls, before_tokens, after_tokens, saved_pct}} since process start. """
+    return _payload_stats.snapshot()
+
+def encode_for_prompt(agent_config_name: str, rows: Iterable[Any], payload_cfg: Optional[Mapping[str, Any]] = None) -> str:
+    """
+    Encode rows as configured by the agent YAML's `payload:` section
+    (format, drop_fields, round_digits). With PROMPT_PAYLOAD_STATS=1, also record
+    the size saved against the old indent=2 JSON encoding.
+    """
+    if payload_cfg is None:
+        from mcp_server.llm.prompt_registry import get_prompt_registry
+
+        payload_cfg = get_prompt_registry().get(agent_config_name).raw.get("payload")
+    cfg = payload_cfg or {}
+    rows = [_as_dict(r) for r in rows]
+    text = encode_rows(
+        rows,
+        fmt=cfg.get("format", "json"),
+        drop_fields=cfg.get("drop_fields") or (),
+        round_digits=cfg.get("round_digits"),
+    )
+    if PROMPT_PAYLOAD_STATS:
+        before = json.dumps(rows, indent=2, default=str)
+        _payload_stats.record(agent_config_name, estimate_tokens(before), estimate_tokens(text))
+    return text
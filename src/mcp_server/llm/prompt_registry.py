@@ -0,0 +1,124 @@
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+from jinja2 import Environment, StrictUndefined, Template
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "agents" / "configs"
+
+# One shared Environment: templates compiled from it are reused across calls.
+_jinja_env = Environment(undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+
+def get_jinja_env() -> Environment:
+    """ Return the shared Jinja environment used for agent prompts. """
+    return _jinja_env
+
+def _with_defaults(template_vars: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    safe_vars = dict(template_vars or {})
+    safe_vars.setdefault("recent_turns", "")
+    safe_vars.setdefault("last_answer", "")
+    return safe_vars
+
+@dataclass
+class CompiledAgentConfig:
+    """ One agent YAML with its prompts compiled and generation settings resolved. """
+    name: str
+    path: Path
+    mtime_ns: int
+    raw: Dict[str, Any]
+    model_name: Optional[str]
+    temperature: Optional[float]
+    response_mime_type: Optional[str]
+    system_template: Optional[Template]
+    task_template: Optional[Template]
+
+    def render_system(self, template_vars: Optional[Dict[str, Any]]) -> str:
+        if self.system_template is None:
+            return ""
+        return self.system_template.render(**_with_defaults(template_vars))
+
+    def render_task(self, template_vars: Optional[Dict[str, Any]]) -> str:
+        if self.task_template is None:
+            return ""
+        return self.task_template.render(**_with_defaults(template_vars))
+
+class AgentConfigRegistry:
+    """ Cache of compiled agent configs under agents/configs/.
+        Entries are recompiled only when the file's mtime changes. """
+
+    def __init__(self, configs_dir: Path = CONFIGS_DIR):
+        self.configs_dir = Path(configs_dir)
+        self._entries: Dict[str, CompiledAgentConfig] = {}
+        self._lock = threading.Lock()
+
+    def load_all(self) -> None:
+        """ Compile every *.yml in the configs directory. """
+        for path in sorted(self.configs_dir.glob("*.yml")):
+            self.get(path.stem)
+
+    def get(self, agent_config_name: str) -> CompiledAgentConfig:
+        path = self.configs_dir / f"{agent_config_name}.yml"
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._entries.pop(agent_config_name, None)
+            raise FileNotFoundError(f"Agent config not found: {path}")
+
+        entry = self._entries.get(agent_config_name)
+        if entry is not None and entry.mtime_ns == mtime_ns:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(agent_config_name)
+            if entry is None or entry.mtime_ns != mtime_ns:
+                entry = self._compile(agent_config_name, path, mtime_ns)
+                self._entries[agent_config_name] = entry
+            return entry
+
+    def render(self, agent_config_name: str, template_vars: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        """ Return (system_prompt, task_prompt) rendered for one call. """
+        entry = self.get(agent_config_name)
+        return entry.render_system(template_vars), entry.render_task(template_vars)
+
+    def names(self) -> list[str]:
+        return sorted(self._entries)
+
+    @staticmethod
+    def _compile(agent_config_name: str, path: Path, mtime_ns: int) -> CompiledAgentConfig:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f) or {}
+
+        system_src = cfg.get("system_prompt") or ""
+        task_src = cfg.get("task_prompt") or ""
+        temperature = cfg.get("temperature")
+
+        return CompiledAgentConfig(
+            name=agent_config_name,
+            path=path,
+            mtime_ns=mtime_ns,
+            raw=cfg,
+            model_name=cfg.get("model_name"),
+            temperature=float(temperature) if temperature is not None else None,
+            response_mime_type=cfg.get("response_mime_type"),
+            system_template=_jinja_env.from_string(system_src) if system_src.strip() else None,
+            task_template=_jinja_env.from_string(task_src) if task_src.strip() else None,
+        )
+
+# -----------------------------------------------------------
+# Process-wide registry
+# -----------------------------------------------------------
+_registry: Optional[AgentConfigRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_prompt_registry() -> AgentConfigRegistry:
+    """ Return the shared registry, compiling all agent configs on first use. """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = AgentConfigRegistry()
+                registry.load_all()
+                _registry = registry
+    return _registry
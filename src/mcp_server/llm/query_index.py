@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from mcp_server.llm.query_log import QUERY_LOG_FILE, QueryLogWriter, iter_log_entries
+
+QUERY_INDEX_ENABLED = os.getenv("QUERY_INDEX_ENABLED", "1") == "1"
+QUERY_INDEX_DB = os.getenv("QUERY_INDEX_DB", "logs/query_index.db")
+# Log files indexed automatically the first time the index is opened
+QUERY_INDEX_BACKFILL_PATHS = [QUERY_LOG_FILE, "logs/query_logs.json"]
+
+class QueryLogIndex:
+    """ SQLite index of logged (user_query, generalized_response) pairs keyed by
+        (user_id, session_id, ts), so a session's history is an indexed range scan. """
+
+    def __init__(self, db_path: str = QUERY_INDEX_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_log_index ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " entry_hash TEXT NOT NULL UNIQUE,"
+                " user_id TEXT NOT NULL,"
+                " session_id TEXT NOT NULL,"
+                " ts TEXT NOT NULL,"
+                " user_query TEXT,"
+                " generalized_response TEXT)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_query_log_session ON query_log_index (user_id, session_id, ts)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS query_log_index_meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.commit()
+            row = self._conn.execute("SELECT value FROM query_log_index_meta WHERE key = 'backfilled'").fetchone()
+        # Whether every entry in the log files is indexed; failures counts batches that did not make it
+        self.backfilled = bool(row and row[0] == "1")
+        self.failures = 0
+
+    @staticmethod
+    def _row(entry: Dict[str, Any]) -> Optional[tuple]:
+        user_id = entry.get("user_id")
+        session_id = entry.get("session_id")
+        uq = entry.get("user_query", "") or ""
+        gr = entry.get("generalized_response", "") or ""
+        if not user_id or not session_id or not (uq or gr):
+            return None
+        ts = str(entry.get("ts", ""))
+        entry_hash = hashlib.sha1(
+            json.dumps([user_id, session_id, ts, uq, gr], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        return entry_hash, str(user_id), str(session_id), ts, str(uq), str(gr)
+
+    def add_entries(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """ Index log entries; entries without user/session or query text are skipped.
+            Re-adding an entry is a no-op, so backfills can be re-run safely. """
+        rows = [r for r in (self._row(e) for e in entries) if r is not None]
+        if not rows:
+            return 0
+        with self._lock:
+            cur = self._conn.executemany(
+                "INSERT OR IGNORE INTO query_log_index"
+                " (entry_hash, user_id, session_id, ts, user_query, generalized_response)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def index_batch(self, entries: List[Dict[str, Any]]) -> None:
+        """ Writer listener: a batch that fails to index leaves the index incomplete until the next backfill. """
+        try:
+            self.add_entries(entries)
+        except Exception:
+            self.set_backfilled(False)
+            raise
+
+    def set_backfilled(self, done: bool) -> None:
+        if not done:
+            self.failures += 1
+        self.backfilled = done
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_log_index_meta (key, value) VALUES ('backfilled', ?)", ("1" if done else "0",)
+            )
+            self._conn.commit()
+
+    def session_queries(
+            self,
+            user_id: str,
+            session_id: str,
+            since: Optional[str] = None,
+            limit: Optional[int] = None,
+    ) -> List[tuple[str, str]]:
+        """ Return (user_query, generalized_response) pairs for one session, oldest first. """
+        sql = ("SELECT user_query, generalized_response FROM query_log_index"
+               " WHERE user_id = ? AND session_id = ?")
+        params: List[Any] = [user_id, session_id]
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(since)
+        sql += " ORDER BY ts, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            return [(uq or "", gr or "") for uq, gr in self._conn.execute(sql, params)]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM query_log_index").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+# -----------------------------------------------------------
+# Backfill from existing log files
+# -----------------------------------------------------------
+def _iter_legacy_json(path: Path) -> Iterable[Dict[str, Any]]:
+    """ Old logs/query_logs.json: either a list of entries or {user_id: {session_id: {req_id: entry}}}. """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        yield from (e for e in data if isinstance(e, dict))
+        return
+    if isinstance(data, dict):
+        for user_id, sessions in data.items():
+            for session_id, requests in (sessions or {}).items():
+                for req_id, req in (requests or {}).items():
+                    if isinstance(req, dict):
+                        yield {"user_id": user_id, "session_id": session_id, "ts": req.get("ts", req_id), **req}
+
+def backfill(index: QueryLogIndex, paths: Iterable[str], batch_size: int = 5000) -> int:
+    """ Index entries from legacy .json files and JSONL logs (including rotated/gzipped segments). """
+    added = 0
+    for raw_path in paths:
+        path = Path(raw_path)
+        if path.suffix == ".json":
+            entries = _iter_legacy_json(path) if path.exists() else iter([])
+        else:
+            entries = iter_log_entries(str(path))
+
+        batch: List[Dict[str, Any]] = []
+        for entry in entries:
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                added += index.add_entries(batch)
+                batch = []
+        added += index.add_entries(batch)
+    return added
+
+def _backfill_in_background(index: QueryLogIndex, paths: List[str]) -> None:
+    failures = index.failures
+    try:
+        added = backfill(index, paths)
+    except Exception as e:
+        print(f"[QueryIndex] backfill failed: {e}")
+        return
+    # A batch that failed to index meanwhile may sit in a file we had already read
+    if index.failures == failures:
+        index.set_backfilled(True)
+    print(f"[QueryIndex] backfilled {added} entries from {', '.join(paths)}")
+
+# -----------------------------------------------------------
+# Process-wide index fed by the query log writer
+# -----------------------------------------------------------
+_query_index: Optional[QueryLogIndex] = None
+_query_index_lock = threading.Lock()
+_attached: "weakref.WeakSet[QueryLogWriter]" = weakref.WeakSet()
+_backfill_thread: Optional[threading.Thread] = None
+
+def get_query_index() -> Optional[QueryLogIndex]:
+    """ Return the shared index, or None when QUERY_INDEX_ENABLED is off. """
+    global _query_index
+    if not QUERY_INDEX_ENABLED:
+        return None
+    if _query_index is None:
+        with _query_index_lock:
+            if _query_index is None:
+                _query_index = QueryLogIndex(QUERY_INDEX_DB)
+        ensure_backfilled(_query_index)
+    return _query_index
+
+def ensure_backfilled(index: QueryLogIndex) -> bool:
+    """ True once the index holds every logged entry. Otherwise starts a background backfill
+        from QUERY_INDEX_BACKFILL_PATHS (if one is not already running) and returns False. """
+    global _backfill_thread
+    if index.backfilled:
+        return True
+    with _query_index_lock:
+        if _backfill_thread is None or not _backfill_thread.is_alive():
+            _backfill_thread = threading.Thread(
+                target=_backfill_in_background,
+                args=(index, list(QUERY_INDEX_BACKFILL_PATHS)),
+                name="query-index-backfill",
+                daemon=True,
+            )
+            _backfill_thread.start()
+    return False
+
+def attach_query_index(writer: QueryLogWriter) -> None:
+    """ Index every batch the writer puts on disk. Idempotent; the index is opened on first call. """
+    if writer in _attached:
+        return
+    index = get_query_index()
+    if index is None:
+        return
+    with _query_index_lock:
+        if writer not in _attached:
+            writer.add_listener(index.index_batch)
+            _attached.add(writer)
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the SQLite index over LLM query logs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bf = sub.add_parser("backfill", help="Index existing query log files.")
+    bf.add_argument("paths", nargs="*", default=QUERY_INDEX_BACKFILL_PATHS,
+                    help="JSONL logs (rotated segments are included) and/or legacy .json files.")
+    bf.add_argument("--db", default=QUERY_INDEX_DB)
+    args = parser.parse_args()
+
+    index = QueryLogIndex(args.db)
+    added = backfill(index, args.paths)
+    if set(QUERY_INDEX_BACKFILL_PATHS) <= set(args.paths):
+        index.set_backfilled(True)
+    print(f"Indexed {added} new entries into {args.db} ({index.count()} total).")
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,233 @@
+import atexit
+import contextvars
+import datetime
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+QUERY_LOG_FILE = os.getenv("QUERY_LOG_FILE", "logs/query_logs.jsonl")
+QUERY_LOG_MAX_BYTES = int(os.getenv("QUERY_LOG_MAX_BYTES", str(64 * 1024 * 1024)))
+QUERY_LOG_ROTATE_SECONDS = float(os.getenv("QUERY_LOG_ROTATE_SECONDS", str(24 * 3600)))  # 0 disables time-based rotation
+QUERY_LOG_GZIP = os.getenv("QUERY_LOG_GZIP", "1") == "1"
+QUERY_LOG_FLUSH_INTERVAL = float(os.getenv("QUERY_LOG_FLUSH_INTERVAL", "0.5"))
+QUERY_LOG_MAX_QUEUE = int(os.getenv("QUERY_LOG_MAX_QUEUE", "10000"))
+
+# user_id / session_id of the request being served; stamped onto every entry logged within it
+_log_context: contextvars.ContextVar[Dict[str, str]] = contextvars.ContextVar("query_log_context", default={})
+
+def set_log_context(**fields: str) -> contextvars.Token:
+    """ Attach fields (e.g. user_id, session_id) to entries logged in the current context. """
+    return _log_context.set({k: v for k, v in fields.items() if v is not None})
+
+def reset_log_context(token: contextvars.Token) -> None:
+    _log_context.reset(token)
+
+class QueryLogWriter:
+    """ Append-only, line-delimited JSON log.
+        Callers only enqueue; a background thread batches writes, rotates by size/age
+        and optionally gzips rotated segments. """
+
+    def __init__(
+            self,
+            path: str = QUERY_LOG_FILE,
+            max_bytes: int = QUERY_LOG_MAX_BYTES,
+            rotate_seconds: float = QUERY_LOG_ROTATE_SECONDS,
+            gzip_rotated: bool = QUERY_LOG_GZIP,
+            flush_interval: float = QUERY_LOG_FLUSH_INTERVAL,
+            max_queue: int = QUERY_LOG_MAX_QUEUE,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.gzip_rotated = gzip_rotated
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._opened_at = time.time()
+        self._listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    def add_listener(self, listener: Callable[[List[Dict[str, Any]]], None]) -> None:
+        """ Call listener(batch) from the writer thread after each batch is on disk. """
+        self._listeners.append(listener)
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """ Enqueue one entry. Never blocks the caller; drops (and counts) when the queue is full. """
+        record = {"ts": datetime.datetime.now().isoformat(), **_log_context.get(), **entry}
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """ Block until everything enqueued so far is written. """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def segments(self) -> List[Path]:
+        """ Rotated segments (oldest first) followed by the active file. """
+        rotated: Dict[str, Path] = {}
+        for p in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}*"):
+            if p.name.endswith(".tmp"):
+                continue
+            # While a segment is being gzipped both copies exist briefly; list it once.
+            rotated.setdefault(p.name[:-3] if p.name.endswith(".gz") else p.name, p)
+        active = [self.path] if self.path.exists() else []
+        return [rotated[name] for name in sorted(rotated)] + active
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "queued": self._queue.qsize(),
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.path.exists():
+                    self._opened_at = self.path.stat().st_mtime
+                self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch: List[Optional[Dict[str, Any]]] = [first]
+            while len(batch) < 1000:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [r for r in batch if r is not None]
+            stop = len(records) != len(batch)
+            try:
+                if records:
+                    self._append(records)
+                    for listener in self._listeners:
+                        try:
+                            listener(records)
+                        except Exception as e:
+                            print(f"[QueryLog] listener failed: {e}")
+            except Exception as e:
+                print(f"[QueryLog] failed to write {len(records)} entries: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        self._maybe_rotate()
+        lines = "".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self.written += len(records)
+
+    def _maybe_rotate(self) -> None:
+        if not self.path.exists():
+            self._opened_at = time.time()
+            return
+        too_big = self.path.stat().st_size >= self.max_bytes
+        too_old = self.rotate_seconds > 0 and time.time() - self._opened_at >= self.rotate_seconds
+        if not (too_big or too_old):
+            return
+
+        stamp = datetime.datetime.now().strftime("%Y%m%dT%H%M%S%f")
+        rotated = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        os.replace(self.path, rotated)
+        self._opened_at = time.time()
+        self.rotations += 1
+        if self.gzip_rotated:
+            threading.Thread(target=_gzip_segment, args=(rotated,), daemon=True).start()
+
+def _gzip_segment(path: Path) -> None:
+    gz_path = path.with_name(path.name + ".gz")
+    tmp_path = path.with_name(path.name + ".gz.tmp")
+    try:
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, gz_path)
+        os.remove(path)
+    except Exception as e:
+        print(f"[QueryLog] failed to gzip {path}: {e}")
+
+# -----------------------------------------------------------
+# Reader
+# -----------------------------------------------------------
+def _open_segment(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def iter_log_entries(
+        path: str = QUERY_LOG_FILE,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        include_rotated: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """ Stream entries oldest-first, optionally filtered by user_id / session_id.
+        Only matching lines are parsed; the file is never materialised. """
+    log_path = Path(path)
+    if include_rotated:
+        segments = QueryLogWriter(path).segments()
+    else:
+        segments = [log_path] if log_path.exists() else []
+
+    # Cheap substring pre-filter before json.loads (entries are written with default separators)
+    needles = [f'"{k}": {json.dumps(v, ensure_ascii=False)}' for k, v in
+               (("user_id", user_id), ("session_id", session_id)) if v is not None]
+
+    for segment in segments:
+        try:
+            with _open_segment(segment) as f:
+                for line in f:
+                    if not line.strip() or any(n not in line for n in needles):
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if user_id is not None and entry.get("user_id") != user_id:
+                        continue
+                    if session_id is not None and entry.get("session_id") != session_id:
+                        continue
+                    yield entry
+        except FileNotFoundError:
+            # Segment was gzipped/rotated away mid-scan
+            continue
+
+# -----------------------------------------------------------
+# Process-wide writer
+# -----------------------------------------------------------
+_query_log = QueryLogWriter()
+atexit.register(_query_log.close)
+
+def get_query_log() -> QueryLogWriter:
+    return _query_log
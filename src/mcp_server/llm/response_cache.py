@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", "")  # e.g. logs/llm_cache.db; empty disables the disk tier
+
+# (value, expires_at); expires_at is None for entries that never expire
+CacheEntry = Tuple[str, Optional[float]]
+
+def _is_expired(expires_at: Optional[float], now: float) -> bool:
+    return expires_at is not None and expires_at <= now
+
+class CacheTier(ABC):
+    """ Storage tier for cached LLM responses. Subclass to plug in another store. """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+class MemoryLRUTier(CacheTier):
+    """ In-process LRU tier bounded by entry count. """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _is_expired(entry[1], time.time()):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class SqliteTier(CacheTier):
+    """ On-disk tier so cached answers survive restarts and are shared between workers. """
+
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if _is_expired(row[1], time.time()):
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0], row[1]
+
+    def set(self, key: str, value: str, expires_at: Optional[float]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_response_cache")
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+class ResponseCache:
+    """ Content-addressed cache of LLM response text.
+        Tiers are checked in order; a hit in a slower tier is promoted to the faster ones. """
+
+    def __init__(self, tiers: List[CacheTier], default_ttl: float = LLM_CACHE_TTL_SECONDS):
+        self.tiers = tiers
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def make_key(
+            agent_name: str,
+            model_name: str,
+            temperature: float,
+            seed: Optional[int],
+            system_prompt: str,
+            input_prompt: str,
+            json_mode: bool = False,
+    ) -> str:
+        material = json.dumps(
+            [agent_name, model_name, float(temperature), seed, bool(json_mode), system_prompt, input_prompt],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, agent_name: str = "") -> Optional[str]:
+        for idx, tier in enumerate(self.tiers):
+            entry = tier.get(key)
+            if entry is None:
+                continue
+            for faster in self.tiers[:idx]:
+                faster.set(key, entry[0], entry[1])
+            with self._lock:
+                self._hits[agent_name] += 1
+            return entry[0]
+
+        with self._lock:
+            self._misses[agent_name] += 1
+        return None
+
+    def set(self, key: str, value: str, agent_name: str = "", ttl: Optional[float] = None) -> None:
+        """ Store a response. ttl <= 0 skips caching; ttl of None uses the default. """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        expires_at = None if ttl == float("inf") else time.time() + ttl
+        for tier in self.tiers:
+            tier.set(key, value, expires_at)
+
+    def clear(self) -> None:
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agents = sorted(set(self._hits) | set(self._misses))
+            per_agent = {a: {"hits": self._hits[a], "misses": self._misses[a]} for a in agents}
+            hits = sum(self._hits.values())
+            misses = sum(self._misses.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / (hits + misses)) if (hits + misses) else 0.0,
+            "per_agent": per_agent,
+            "tiers": [type(t).__name__ for t in self.tiers],
+        }
+
+# -----------------------------------------------------------
+# Process-wide cache used by VertexGenAI
+# -----------------------------------------------------------
+_response_cache: Optional[ResponseCache] = None
+_response_cache_initialised = False
+_response_cache_lock = threading.Lock()
+
+def build_default_response_cache() -> Optional[ResponseCache]:
+    if not LLM_CACHE_ENABLED:
+        return None
+    tiers: List[CacheTier] = [MemoryLRUTier(LLM_CACHE_MAX_ENTRIES)]
+    if LLM_CACHE_SQLITE_PATH:
+        tiers.append(SqliteTier(LLM_CACHE_SQLITE_PATH))
+    return ResponseCache(tiers)
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """ Return the shared response cache, or None when caching is disabled. """
+    global _response_cache, _response_cache_initialised
+    if not _response_cache_initialised:
+        with _response_cache_lock:
+            if not _response_cache_initialised:
+                _response_cache = build_default_response_cache()
+                _response_cache_initialised = True
+    return _response_cache
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """ Replace the shared cache (None disables response caching). """
+    global _response_cache, _response_cache_initialised
+    with _response_cache_lock:
+        _response_cache = cache
+        _response_cache_initialised = True
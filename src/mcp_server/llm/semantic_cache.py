@@ -0,0 +1,213 @@
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(8 * 3600)))
+SEMANTIC_CACHE_MAX_PER_PARTITION = int(os.getenv("SEMANTIC_CACHE_MAX_PER_PARTITION", "256"))
+SEMANTIC_CACHE_MAX_PARTITIONS = int(os.getenv("SEMANTIC_CACHE_MAX_PARTITIONS", "64"))
+SEMANTIC_CACHE_DIM = 1024
+
+# Answers to these tools depend only on the question and the feed/date data. get_top_breaks
+# is left out: its SQL reads no feed or date, so the turn's partition does not describe it.
+CACHEABLE_TOOLS = {"get_lineage"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9_*~]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "can", "could", "do", "does", "for", "give", "i", "is", "it", "me",
+    "of", "on", "please", "show", "tell", "that", "the", "these", "this", "to", "us", "we",
+    "what", "which", "with", "would", "you",
+}
+
+Partition = Tuple[str, str]  # (feed_name, recon_run_date)
+
+def tokenize(text: str) -> List[str]:
+    words = [w for w in _TOKEN_RE.findall((text or "").lower()) if w not in _STOPWORDS]
+    # Plural-insensitive: "breaks"/"break", "paths"/"path"
+    words = [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return words + bigrams
+
+def hashed_tf(text: str, dim: int = SEMANTIC_CACHE_DIM) -> np.ndarray:
+    """ Sub-linear term frequencies hashed into a fixed number of buckets. """
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in tokenize(text):
+        vec[zlib.crc32(token.encode("utf-8")) % dim] += 1.0
+    np.log1p(vec, out=vec)
+    return vec
+
+@dataclass
+class SemanticHit:
+    question: str
+    answer: str
+    selected_tool: str
+    similarity: float
+    age_seconds: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+class _PartitionIndex:
+    """ Vectors for one (feed, date) partition, kept as a dense NumPy matrix. """
+
+    def __init__(self, dim: int):
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.entries: List[Dict[str, Any]] = []
+
+    def add(self, vector: np.ndarray, entry: Dict[str, Any], max_entries: int) -> None:
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+        self.entries.append(entry)
+        if len(self.entries) > max_entries:
+            drop = len(self.entries) - max_entries
+            self.vectors = self.vectors[drop:]
+            self.entries = self.entries[drop:]
+
+    def expire(self, now: float, ttl: float) -> None:
+        keep = [i for i, e in enumerate(self.entries) if now - e["created_at"] <= ttl]
+        if len(keep) != len(self.entries):
+            self.vectors = self.vectors[keep]
+            self.entries = [self.entries[i] for i in keep]
+
+class SemanticAnswerCache:
+    """ Near-duplicate question cache over recent answers, partitioned by feed and recon date.
+        Questions are embedded offline with hashed TF-IDF; similarity is cosine. """
+
+    def __init__(
+            self,
+            threshold: float = SEMANTIC_CACHE_THRESHOLD,
+            ttl_seconds: float = SEMANTIC_CACHE_TTL_SECONDS,
+            max_per_partition: int = SEMANTIC_CACHE_MAX_PER_PARTITION,
+            max_partitions: int = SEMANTIC_CACHE_MAX_PARTITIONS,
+            tool_thresholds: Optional[Dict[str, float]] = None,
+            cacheable_tools: Iterable[str] = CACHEABLE_TOOLS,
+            dim: int = SEMANTIC_CACHE_DIM,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_per_partition = max_per_partition
+        self.max_partitions = max_partitions
+        self.tool_thresholds = dict(tool_thresholds or {})
+        self.cacheable_tools = set(cacheable_tools)
+        self.dim = dim
+        self._partitions: "OrderedDict[Partition, _PartitionIndex]" = OrderedDict()
+        self._doc_freq = np.zeros(dim, dtype=np.float32)
+        self._doc_count = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _idf(self) -> np.ndarray:
+        return np.log((self._doc_count + 1.0) / (self._doc_freq + 1.0)) + 1.0
+
+    def lookup(self, question: str, partition: Partition) -> Optional[SemanticHit]:
+        query = hashed_tf(question, self.dim)
+        if not query.any():
+            return None
+
+        now = time.time()
+        with self._lock:
+            index = self._partitions.get(partition)
+            if index is not None:
+                index.expire(now, self.ttl_seconds)
+            if index is None or not index.entries:
+                self.misses += 1
+                return None
+            self._partitions.move_to_end(partition)
+
+            idf = self._idf()
+            q = query * idf
+            docs = index.vectors * idf
+            norms = np.linalg.norm(docs, axis=1) * (np.linalg.norm(q) or 1.0)
+            sims = (docs @ q) / np.where(norms == 0, 1.0, norms)
+
+            best = int(np.argmax(sims))
+            entry = index.entries[best]
+            similarity = float(sims[best])
+            if similarity < self.tool_thresholds.get(entry["selected_tool"], self.threshold):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return SemanticHit(
+                question=entry["question"],
+                answer=entry["answer"],
+                selected_tool=entry["selected_tool"],
+                similarity=similarity,
+                age_seconds=now - entry["created_at"],
+                extra=entry["extra"],
+            )
+
+    def store(
+            self,
+            question: str,
+            answer: str,
+            selected_tool: str,
+            partition: Partition,
+            extra: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """ Remember an answer. Returns False when the tool or answer is not cacheable. """
+        if selected_tool not in self.cacheable_tools or not (answer or "").strip():
+            return False
+        vector = hashed_tf(question, self.dim)
+        if not vector.any():
+            return False
+
+        entry = {
+            "question": question,
+            "answer": answer,
+            "selected_tool": selected_tool,
+            "created_at": time.time(),
+            "extra": dict(extra or {}),
+        }
+        with self._lock:
+            index = self._partitions.get(partition)
+            if index is None:
+                index = _PartitionIndex(self.dim)
+                self._partitions[partition] = index
+            self._partitions.move_to_end(partition)
+            index.add(vector, entry, self.max_per_partition)
+            while len(self._partitions) > self.max_partitions:
+                self._partitions.popitem(last=False)
+
+            self._doc_freq += (vector > 0)
+            self._doc_count += 1
+        return True
+
+    def invalidate(self, partition: Optional[Partition] = None) -> None:
+        with self._lock:
+            if partition is None:
+                self._partitions.clear()
+            else:
+                self._partitions.pop(partition, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "partitions": len(self._partitions),
+                "entries": sum(len(p.entries) for p in self._partitions.values()),
+                "threshold": self.threshold,
+                "idf_docs": self._doc_count,
+            }
+
+# -----------------------------------------------------------
+# Process-wide cache used by handle_user_turn
+# -----------------------------------------------------------
+_semantic_cache: Optional[SemanticAnswerCache] = SemanticAnswerCache() if SEMANTIC_CACHE_ENABLED else None
+
+def get_semantic_cache() -> Optional[SemanticAnswerCache]:
+    """ Return the shared semantic cache, or None when it is disabled. """
+    return _semantic_cache
+
+def set_semantic_cache(cache: Optional[SemanticAnswerCache]) -> None:
+    global _semantic_cache
+    _semantic_cache = cache
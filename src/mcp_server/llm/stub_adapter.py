@@ -0,0 +1,71 @@
+import asyncio
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from mcp_server.llm.adapter import VertexGenAI
+
+_LINEAGE_RE = re.compile(r"\b(lineage|dag|paths?|upstream|downstream|convergen\w*)\b", re.IGNORECASE)
+_BREAKS_RE = re.compile(r"\bbreaks?\b", re.IGNORECASE)
+_TRANSACTIONS_RE = re.compile(r"\btransactions?\b", re.IGNORECASE)
+
+class _StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+class _StubModel:
+    """ Offline stand-in for GenerativeModel with deterministic output. """
+
+    def __init__(self, response_mime_type: Optional[str]):
+        self.response_mime_type = response_mime_type
+
+    def _respond(self, prompt: str) -> _StubResponse:
+        if self.response_mime_type == "application/json":
+            if _TRANSACTIONS_RE.search(prompt):
+                tool_name = "get_transactions"
+            elif _LINEAGE_RE.search(prompt):
+                tool_name = "get_lineage"
+            elif _BREAKS_RE.search(prompt):
+                tool_name = "get_top_breaks"
+            else:
+                tool_name = "general_qa"
+            return _StubResponse(json.dumps({"tool_name": tool_name, "reason": "Stub adapter keyword routing."}))
+        return _StubResponse(f"[stub response] {prompt.strip()[:200]}")
+
+    def generate_content(self, prompt, stream: bool = False):
+        return self._respond(str(prompt))
+
+    async def generate_content_async(self, prompt, stream: bool = False):
+        await asyncio.sleep(0)
+        response = self._respond(str(prompt))
+        return self._chunks(response.text) if stream else response
+
+    @staticmethod
+    async def _chunks(text: str):
+        for word in re.findall(r"\S+\s*", text):
+            await asyncio.sleep(0)
+            yield _StubResponse(word)
+
+class StubVertexGenAI(VertexGenAI):
+    """ VertexGenAI that never touches the network or imports vertexai.
+        Prompt rendering, caching and logging still run. Select with VERTEX_ADAPTER=stub. """
+
+    def apply_access_token(self, token: str) -> None:
+        pass
+
+    def _build_model(
+            self,
+            system_prompt: Optional[str] = None,
+            gemini_model: Optional[str] = None,
+            response_mime_type: Optional[str] = None,
+            temperature: Optional[float] = None,
+            seed: Optional[int] = None,
+            tools: Optional[List] = None,
+    ) -> Any:
+        return _StubModel(response_mime_type)
+
+    def generate_content_json(self, input_prompt, *args, **kwargs) -> Dict[str, Any]:
+        return json.loads(_StubModel("application/json")._respond(str(input_prompt)).text)
+
+    async def agenerate_content_json(self, input_prompt, *args, **kwargs) -> Dict[str, Any]:
+        return self.generate_content_json(input_prompt)
@@ -0,0 +1,141 @@
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.logconfig import step_log
+
+VERTEX_TOKEN_TTL_SECONDS = float(os.getenv("VERTEX_TOKEN_TTL_SECONDS", str(30 * 60)))
+VERTEX_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("VERTEX_TOKEN_REFRESH_MARGIN_SECONDS", "120"))
+VERTEX_TOKEN_REFRESH_JITTER_SECONDS = float(os.getenv("VERTEX_TOKEN_REFRESH_JITTER_SECONDS", "60"))
+VERTEX_TOKEN_RETRY_SECONDS = float(os.getenv("VERTEX_TOKEN_RETRY_SECONDS", "15"))
+
+class TokenManager:
+    """ Keeps an access token fresh from a background thread.
+
+        fetch_token() returns the new token (anything else is treated as a failure);
+        on_refresh(token) installs it, e.g. re-initialises vertexai with new credentials.
+        Concurrent refresh requests are coalesced into a single fetch. """
+
+    def __init__(
+            self,
+            fetch_token: Callable[[], Any],
+            on_refresh: Callable[[str], None],
+            ttl_seconds: float = VERTEX_TOKEN_TTL_SECONDS,
+            margin_seconds: float = VERTEX_TOKEN_REFRESH_MARGIN_SECONDS,
+            jitter_seconds: float = VERTEX_TOKEN_REFRESH_JITTER_SECONDS,
+            retry_seconds: float = VERTEX_TOKEN_RETRY_SECONDS,
+    ):
+        self._fetch_token = fetch_token
+        self._on_refresh = on_refresh
+        self.ttl_seconds = ttl_seconds
+        self.margin_seconds = margin_seconds
+        self.jitter_seconds = jitter_seconds
+        self.retry_seconds = retry_seconds
+
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.refresh_count = 0
+        self.failure_count = 0
+        self.last_latency_s: Optional[float] = None
+        self.max_latency_s = 0.0
+        self.total_latency_s = 0.0
+        self.last_refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def token(self) -> Optional[str]:
+        return self._token
+
+    def has_valid_token(self) -> bool:
+        return self._token is not None and time.time() < self._expires_at
+
+    def refresh(self, force: bool = False) -> str:
+        """ Fetch and install a new token. Callers that arrive while a refresh is
+            in flight wait for it and reuse its result instead of fetching again. """
+        seen_generation = self._generation
+        with self._refresh_lock:
+            if not force and self._generation != seen_generation and self._token is not None:
+                return self._token
+
+            start = time.perf_counter()
+            try:
+                token = self._fetch_token()
+                if not isinstance(token, str) or not token:
+                    raise RuntimeError(f"token endpoint returned {token!r}")
+                self._on_refresh(token)
+            except Exception as e:
+                self.failure_count += 1
+                self.last_error = str(e)
+                step_log(f"AgenticAI - token refresh failed: {e}", time.perf_counter() - start)
+                raise
+
+            latency = time.perf_counter() - start
+            # Swap only after the new credentials are installed
+            self._token = token
+            self._expires_at = time.time() + self.ttl_seconds
+            self._generation += 1
+
+            self.refresh_count += 1
+            self.last_latency_s = latency
+            self.max_latency_s = max(self.max_latency_s, latency)
+            self.total_latency_s += latency
+            self.last_refreshed_at = time.time()
+            self.last_error = None
+            step_log("AgenticAI - token refreshed", latency)
+            return token
+
+    def ensure_token(self) -> str:
+        """ Return a valid token, fetching one only if none has been installed yet. """
+        if self._token is None:
+            return self.refresh()
+        return self._token
+
+    def start(self) -> None:
+        """ Start proactive background refreshes (idempotent). """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vertex-token-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _next_delay(self) -> float:
+        if self._token is None:
+            return 0.0
+        refresh_at = self._expires_at - self.margin_seconds - random.uniform(0, self.jitter_seconds)
+        return max(0.0, refresh_at - time.time())
+
+    def _run(self) -> None:
+        delay = self._next_delay()
+        while not self._stop.wait(delay):
+            try:
+                self.refresh(force=True)
+                delay = self._next_delay()
+            except Exception:
+                # Keep serving the current token while it is still valid and retry soon
+                delay = self.retry_seconds
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "refresh_count": self.refresh_count,
+            "failure_count": self.failure_count,
+            "last_latency_s": self.last_latency_s,
+            "avg_latency_s": (self.total_latency_s / self.refresh_count) if self.refresh_count else None,
+            "max_latency_s": self.max_latency_s,
+            "last_refreshed_at": self.last_refreshed_at,
+            "seconds_to_expiry": (self._expires_at - time.time()) if self._token else None,
+            "last_error": self.last_error,
+            "background_running": self._thread is not None and self._thread.is_alive(),
+        }
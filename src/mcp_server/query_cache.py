@@ -0,0 +1,255 @@
+import asyncio
+import datetime as dt
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "1") == "1"
+# Budget for cached results, measured as their JSON size
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# TTL for queries that may still change (open recon dates, no date filter, relative dates)
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "300"))
+# TTL for queries that only touch closed recon dates; "inf" never expires
+QUERY_CACHE_CLOSED_TTL_SECONDS = float(os.getenv("QUERY_CACHE_CLOSED_TTL_SECONDS", "inf"))
+# A recon date older than this many days is closed: its data no longer changes
+QUERY_CACHE_OPEN_DAYS = int(os.getenv("QUERY_CACHE_OPEN_DAYS", "1"))
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_LINE_COMMENT = re.compile(r"--[^\n]*")
+_BLOCK_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_DATE = re.compile(r"^'?(\d{4})-?(\d{2})-?(\d{2})'?$")
+_RELATIVE_DATE = re.compile(r"\b(current_date|current_timestamp|now|localtimestamp|today)\b")
+# Predicates on a date literal, once each literal is replaced by a @d<n> placeholder
+_COLUMN = r"([a-z_][\w.]*)"
+_COMPARISON = re.compile(_COLUMN + r"\s*(<=|>=|=|<|>)\s*@d(\d+)\b")
+_IN_LIST = re.compile(_COLUMN + r"\s+in\s*\(([^()]*)\)")
+_BETWEEN = re.compile(_COLUMN + r"\s+between\s+@d(\d+)\s+and\s+@d(\d+)\b")
+_PLACEHOLDER = re.compile(r"@d(\d+)\b")
+
+def normalize_sql(sql: str) -> str:
+    """ Comments removed, whitespace collapsed, lower-cased and trailing ';' dropped, outside string literals. """
+    parts = _STRING_LITERAL.split(sql or "")
+    out: List[str] = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            out.append(part)
+        else:
+            part = _BLOCK_COMMENT.sub(" ", _LINE_COMMENT.sub(" ", part))
+            out.append(re.sub(r"\s+", " ", part).lower())
+    return "".join(out).strip().rstrip(";").strip()
+
+def _parse_date(literal: str) -> Optional[dt.date]:
+    m = _DATE.match(literal)
+    if not m:
+        return None
+    try:
+        return dt.date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+def recon_dates(normalized_sql: str) -> List[dt.date]:
+    """ Dates written as string literals ('2025-10-15' or '20251015') in the query. """
+    return [d for d in (_parse_date(lit) for lit in _STRING_LITERAL.findall(normalized_sql)) if d is not None]
+
+def _bounded_dates(normalized_sql: str) -> Optional[List[dt.date]]:
+    """
+    The query's date literals if every one of them pins its column to a bounded set of dates
+    (=, IN, BETWEEN, or a range with an upper bound); None if any leaves the range open.
+    """
+    dates: List[dt.date] = []
+    parts = _STRING_LITERAL.split(normalized_sql)
+    for i in range(1, len(parts), 2):
+        date = _parse_date(parts[i])
+        if date is not None:
+            parts[i] = f"@d{len(dates)}"
+            dates.append(date)
+    code = "".join(parts)
+
+    bounded, upper, lower = set(), set(), set()   # literal indexes; columns with an upper / lower bound
+    for col, op, idx in _COMPARISON.findall(code):
+        bounded.add(int(idx))
+        if op in ("=", "<", "<="):
+            upper.add(col)
+        else:
+            lower.add(col)
+    for col, items in _IN_LIST.findall(code):
+        values = [v.strip() for v in items.split(",")]
+        if col != "not" and all(_PLACEHOLDER.fullmatch(v) for v in values):
+            bounded.update(int(v[2:]) for v in values)
+            upper.add(col)
+    for col, first, last in _BETWEEN.findall(code):
+        if col != "not":
+            bounded.update((int(first), int(last)))
+            upper.add(col)
+    if len(bounded) != len(dates) or not lower <= upper:
+        return None
+    return dates
+
+def ttl_for(normalized_sql: str, today: Optional[dt.date] = None) -> float:
+    """
+    Closed-date TTL when the query's date predicates are all bounded and end on closed recon
+    dates; the default TTL for open ranges (e.g. recon_run_date >= '2024-01-01') and otherwise.
+    """
+    code = "".join(_STRING_LITERAL.split(normalized_sql)[::2])
+    if _RELATIVE_DATE.search(code):
+        return QUERY_CACHE_TTL_SECONDS
+    dates = _bounded_dates(normalized_sql)
+    if not dates:
+        return QUERY_CACHE_TTL_SECONDS
+    cutoff = (today or dt.date.today()) - dt.timedelta(days=QUERY_CACHE_OPEN_DAYS)
+    return QUERY_CACHE_CLOSED_TTL_SECONDS if max(dates) < cutoff else QUERY_CACHE_TTL_SECONDS
+
+def _is_cacheable(result: Any) -> bool:
+    if result in (None, [], {}):
+        return False
+    return not (isinstance(result, dict) and (result.get("isError") or result.get("IsError")))
+
+class _Flight:
+    """ An upstream fetch in progress and the number of callers awaiting it. """
+
+    def __init__(self):
+        self.task: "Optional[asyncio.Task[Any]]" = None
+        self.waiters = 0
+
+class QueryResultCache:
+    """
+    Results of run_query keyed by catalog, schema and normalised SQL. LRU within a byte
+    budget; concurrent identical queries share one upstream call (singleflight).
+    Cached results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int = QUERY_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # key -> (result, size_bytes, expires_at or None)
+        self._entries: "OrderedDict[str, Tuple[Any, int, Optional[float]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.upstream_seconds = 0.0
+
+    @staticmethod
+    def make_key(normalized_sql: str, catalog: str = "", schema: str = "") -> str:
+        material = json.dumps([catalog.lower(), schema.lower(), normalized_sql], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[2] is not None and entry[2] <= time.time():
+                self._remove(key)
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[0]
+
+    def set(self, key: str, result: Any, ttl: float) -> bool:
+        if ttl <= 0:
+            return False
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return False
+        expires_at = None if ttl == float("inf") else time.time() + ttl
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    async def get_or_fetch(
+            self,
+            sql: str,
+            fetch: Callable[[], Awaitable[Any]],
+            catalog: str = "",
+            schema: str = "",
+    ) -> Any:
+        """
+        Cached result for sql, else the result of fetch(). While a fetch for the same
+        query is running, other callers await it instead of calling upstream themselves.
+        """
+        normalized = normalize_sql(sql)
+        key = self.make_key(normalized, catalog, schema)
+        found, result = self.get(key)
+        if found:
+            self.hits += 1
+            return result
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._inflight.clear()
+            self._loop = loop
+        flight = self._inflight.get(key)
+        if flight is None:
+            self.misses += 1
+            flight = _Flight()
+            flight.task = loop.create_task(self._fetch(key, normalized, fetch, flight))
+            self._inflight[key] = flight
+        else:
+            self.coalesced += 1
+
+        # The fetch runs in its own task: cancelling one caller leaves the others waiting on it.
+        # It is cancelled only once no caller is left to take its result.
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+
+    async def _fetch(self, key: str, normalized: str, fetch: Callable[[], Awaitable[Any]], flight: "_Flight") -> Any:
+        start = time.perf_counter()
+        try:
+            result = await fetch()
+        finally:
+            self.upstream_seconds += time.perf_counter() - start
+            if self._inflight.get(key) is flight:
+                del self._inflight[key]
+        if _is_cacheable(result):
+            self.set(key, result, ttl_for(normalized))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": ((self.hits + self.coalesced) / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "inflight": len(self._inflight),
+            "upstream_seconds": round(self.upstream_seconds, 3),
+        }
+
+_query_cache = QueryResultCache()
+
+def get_query_cache() -> QueryResultCache:
+    return _query_cache
@@ -0,0 +1,81 @@
+import base64
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from mcp_server.query_cache import normalize_sql
+
+# Rows per run_query_paged page; a request may ask for fewer, never more than the max
+QUERY_PAGE_SIZE = int(os.getenv("QUERY_PAGE_SIZE", "1000"))
+QUERY_MAX_PAGE_SIZE = int(os.getenv("QUERY_MAX_PAGE_SIZE", "10000"))
+
+_ROW_KEYS = ("rows", "data", "records", "results")
+_HAS_ROW_LIMIT = re.compile(r"\b(limit|offset|fetch\s+(first|next))\b")
+
+class PageTokenError(ValueError):
+    pass
+
+def _query_fingerprint(query: str) -> str:
+    return hashlib.sha256(normalize_sql(query).encode("utf-8")).hexdigest()[:16]
+
+def encode_page_token(query: str, offset: int, page_size: int) -> str:
+    """ Opaque, stateless cursor: the server keeps nothing between pages. """
+    raw = json.dumps({"q": _query_fingerprint(query), "o": offset, "n": page_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_page_token(query: str, token: str) -> Tuple[int, int]:
+    """ (offset, page_size) from a token issued for the same query; page_size is clamped like a request's. """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        offset, page_size = int(data["o"]), int(data["n"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise PageTokenError(f"Malformed page token: {e}") from e
+    if data.get("q") != _query_fingerprint(query):
+        raise PageTokenError("Page token was issued for a different query")
+    if offset < 0:
+        raise PageTokenError("Page token has a negative offset")
+    return offset, clamp_page_size(page_size)
+
+def clamp_page_size(page_size: Optional[int]) -> int:
+    return max(1, min(int(page_size or QUERY_PAGE_SIZE), QUERY_MAX_PAGE_SIZE))
+
+def paged_sql(query: str, offset: int, limit: int) -> str:
+    """
+    The query restricted to rows [offset, offset + limit). OFFSET/FETCH is appended to the
+    query itself so its ORDER BY still applies; a query that already limits its rows is
+    wrapped as a subquery instead. Pages are only stable for queries with a total ORDER BY.
+    """
+    base = (query or "").strip().rstrip(";").strip()
+    if _HAS_ROW_LIMIT.search(normalize_sql(base)):
+        base = f"SELECT * FROM ({base}) AS paged"
+    offset_clause = f" OFFSET {offset} ROWS" if offset else ""
+    return f"{base}{offset_clause} FETCH NEXT {limit} ROWS ONLY"
+
+def extract_rows(data: Any) -> Optional[List[Any]]:
+    """ The row list of an upstream response (a list, or a dict holding one under a usual key). """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in _ROW_KEYS:
+            if isinstance(data.get(key), list):
+                return data[key]
+    return None
+
+def build_page(query: str, data: Any, offset: int, page_size: int) -> Dict[str, Any]:
+    """
+    Page payload for run_query_paged. data was fetched with limit page_size + 1; the extra
+    row only tells whether another page exists and is not returned.
+    """
+    rows = extract_rows(data)
+    if rows is None:
+        # Unknown response shape: hand it back whole, without a cursor
+        return {"rows": [], "raw": data, "next_page_token": None, "offset": offset, "isError": False}
+    has_more = len(rows) > page_size
+    return {
+        "rows": rows[:page_size],
+        "next_page_token": encode_page_token(query, offset + page_size, page_size) if has_more else None,
+        "offset": offset,
+        "isError": False,
+    }
@@ -1,75 +1,113 @@
 import logging
 import json
+import os
 import httpx
+from contextlib import asynccontextmanager
 from typing import Any
 from mcp.server.fastmcp import FastMCP
 from fastapi import FastAPI
+from mcp_server.query_cache import QUERY_CACHE_ENABLED, get_query_cache
+from mcp_server.query_paging import PageTokenError, build_page, clamp_page_size, decode_page_token, paged_sql
+from mcp_server.starburst_client import get_starburst_client
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("starburst.log"),
-        logging.StreamHandler()
-    ]
-)
+STARBURST_API_URL = os.getenv("STARBURST_API_URL", "https://abc/flow/api/starburst")
 
-app = FastAPI()
+def configure_logging() -> None:
+    """ starburst.log + console for the server process. Not done on import, so a process that
+        hosts these tools in-process (MCP_INPROCESS_SERVERS) keeps its own logging setup. """
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler("starburst.log"),
+            logging.StreamHandler()
+        ]
+    )
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    # Open the shared upstream connection pool with the server and close it on shutdown
+    get_starburst_client().start()
+    yield
+    await get_starburst_client().aclose()
+
+app = FastAPI(lifespan=lifespan)
 mcp = FastMCP("starburst")
+
+@app.get("/query_cache/stats")
+async def query_cache_stats():
+    return get_query_cache().stats()
+
+# Mounted last: "/" would otherwise shadow the routes above
 app.mount("/", mcp.sse_app())
 
 async def invoke_api(url: str, payload: dict[str, Any]) -> dict[str, Any]:
     """ Make a request to the NWS API with proper error handling. """
     # "sqlQuery": "select • from tolvesa_managed.stream where active_flag-'y'".
-    headers = {"Content-Type", "application/json"}
     logging.info("calling API tool..")
     logging.info("url: %s", url)
-    logging.info("headers: %s", headers)
     logging.info("payload: %s",json.dumps(payload, indent=2))
 
-    async with httpx.AsyncClient(verify=False) as client:   # Disable SSL verification
-        try:
-            response = await client.post(url, headers=headers, json=payload, timeout=90.0)
-            # This will raise 4xx/5xx error
-            response.raise_for_status()
-            json_response = response.json()
-            logging.info("Response JSON: %s", json.dumps(json_response, indent=2))
+    # Shared keep-alive client (SSL verification disabled as before, JSON content type set on the client)
+    try:
+        # This will raise 4xx/5xx error
+        response = await get_starburst_client().post_json(url, payload)
+        json_response = response.json()
+        logging.info("Response: %d bytes", len(response.content))
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            # Pretty-printing a large result costs more than fetching it; only at DEBUG
+            logging.debug("Response JSON: %s", json.dumps(json_response, indent=2))
 
-            return json_response
-        except httpx.HTTPStatusError as e:
-            logging.error("HTTP error from API: status-%s, response.body=%s", e.response.status_code, e.response.text)
-            raise
+        return json_response
+    except httpx.HTTPStatusError as e:
+        logging.error("HTTP error from API: status-%s, response.body=%s", e.response.status_code, e.response.text)
+        raise
 
-        except Exception as e:
-            logging.info("Unexpected exception: %s",e)
-            return None
+    except Exception as e:
+        logging.info("Unexpected exception: %s",e)
+        return None
 
-@mcp.tool()
-async def run_query(query: str) -> dict[str, Any]:
-    url = f"https://abc/flow/api/starburst"
-    payload = {
+def _starburst_payload(query: str, fetch_size: int) -> dict[str, Any]:
+    return {
         "environment": "PROD",
-        "databaseFetchSize": "50000",
+        "databaseFetchSize": str(fetch_size),
         "dataSource": "starburst",
         "catalog": "openpus",
         "schema": "managed",
         "sqlQuery": query,
     }
 
-    try:
-        data = await invoke_api(url, payload)
-    except httpx.HTTPStatusError as e:
+async def _fetch(query: str, fetch_size: int) -> Any:
+    url = STARBURST_API_URL
+    payload = _starburst_payload(query, fetch_size)
+    if QUERY_CACHE_ENABLED:
+        # Identical queries (after SQL normalisation) share one upstream call and its cached result
+        return await get_query_cache().get_or_fetch(
+            query, lambda: invoke_api(url, payload), catalog=payload["catalog"], schema=payload["schema"]
+        )
+    return await invoke_api(url, payload)
+
+def _error_result(e: Exception, tool_name: str) -> dict[str, Any]:
+    if isinstance(e, httpx.HTTPStatusError):
         status = e.response.status_code
         body = e.response.text or ""
         snippet = body[:500]
 
         logging.error("API call failed with status %s and body: %s",status, body)
         return {"structuredContent": {"result": {"error": f"API call failed with status: {status}", "details": snippet}}, "meta": None, "IsError": True}
+    logging.error("Unexpected error in %s: %s", tool_name, e)
+    return {"structuredContent": {"result": {"error": "Unexpected error in MCP Tool.", "details": repr(e)}}, "meta": None, "isError": True}
+
+@mcp.tool()
+async def run_query(query: str) -> dict[str, Any]:
+    try:
+        data = await _fetch(query, 50000)
     except Exception as e:
-        logging.error("Unexpected error in run_query: %s", e)
-        return {"structuredContent": {"result": {"error": "Unexpected error in MCP Tool.", "details": repr(e)}}, "meta": None, "isError": True}
+        return _error_result(e, "run_query")
 
-    logging.info("Data from tool: %s", data)
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Data from tool: %s", data)
 
     if data in (None, [], {}):
         logging.error("No data returned from API.")
@@ -78,13 +116,41 @@ async def run_query(query: str) -> dict[str, Any]:
     try:
         # Serialize the data to ensure its valid JSON
         valid_json = json.dumps(data)
-        logging.info("Valid JSON: %s", (json.dumps(data, indent=4)))
         return json.loads(valid_json) # Convert back to a dictionary
     except (TypeError, ValueError) as e:
         logging.error("Failed to serialize data: %s",e)
         return {"structuredContent": {"result": {"error": "Data is not JSON serializable."}}, "meta": None, "isError": True}
 
+@mcp.tool()
+async def run_query_paged(query: str, page_size: int = 0, page_token: str = "") -> dict[str, Any]:
+    """
+    One page of the query's rows: {"rows", "next_page_token", "offset", "isError"}. Pass
+    next_page_token back (with the same query) for the following page; it is None after the
+    last one. Each page is its own bounded upstream query, so the server holds at most one
+    page per call. Use a query with a total ORDER BY for stable pages.
+    """
+    try:
+        offset, size = decode_page_token(query, page_token) if page_token else (0, clamp_page_size(page_size))
+    except PageTokenError as e:
+        return {"structuredContent": {"result": {"error": str(e)}}, "meta": None, "isError": True}
+
+    try:
+        # One extra row tells whether another page exists
+        data = await _fetch(paged_sql(query, offset, size + 1), size + 1)
+    except Exception as e:
+        return _error_result(e, "run_query_paged")
+
+    if data is None:
+        # invoke_api returns None on transport/decoding failures; an empty page would read as the end
+        logging.error("run_query_paged: no response from API for offset %d", offset)
+        return {"structuredContent": {"result": {"error": "No response from API."}}, "meta": None, "isError": True}
+
+    page = build_page(query, data, offset, size)
+    logging.info("run_query_paged: %d rows from offset %d, more=%s", len(page["rows"]), offset, bool(page["next_page_token"]))
+    return page
+
 
 if __name__ == "__main__":
     # uvicorn. run ("mcp_server.server:mcp.app", host="127.0.0.1", port=7000, reload-True)
+    configure_logging()
     mcp.run(transport='sse')
\ No newline at end of file
@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import os
+import time
+from typing import Any, Dict, Optional, Set
+import httpx
+from utils.logconfig import step_log
+
+# One keep-alive connection pool toward the Starburst flow API, shared by every run_query call
+STARBURST_MAX_CONNECTIONS = int(os.getenv("STARBURST_MAX_CONNECTIONS", "20"))
+STARBURST_MAX_KEEPALIVE = int(os.getenv("STARBURST_MAX_KEEPALIVE", "10"))
+STARBURST_KEEPALIVE_EXPIRY = float(os.getenv("STARBURST_KEEPALIVE_EXPIRY", "30"))
+# HTTP/2 is only used when the optional h2 package is installed
+STARBURST_HTTP2 = os.getenv("STARBURST_HTTP2", "1") == "1"
+STARBURST_CONNECT_TIMEOUT = float(os.getenv("STARBURST_CONNECT_TIMEOUT", "10"))
+STARBURST_READ_TIMEOUT = float(os.getenv("STARBURST_READ_TIMEOUT", "90"))
+# Queries in flight toward the upstream API at once; the rest wait their turn
+STARBURST_MAX_CONCURRENCY = int(os.getenv("STARBURST_MAX_CONCURRENCY", "8"))
+STARBURST_VERIFY_SSL = os.getenv("STARBURST_VERIFY_SSL", "0") == "1"
+
+class StarburstClient:
+    """
+    Lifecycle-managed httpx.AsyncClient. start() on server startup, aclose() on shutdown;
+    post_json() also starts it lazily (e.g. when the tool runs in-process or via mcp.run()).
+    """
+
+    def __init__(
+            self,
+            max_connections: int = STARBURST_MAX_CONNECTIONS,
+            max_keepalive: int = STARBURST_MAX_KEEPALIVE,
+            max_concurrency: int = STARBURST_MAX_CONCURRENCY,
+            http2: bool = STARBURST_HTTP2,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=STARBURST_KEEPALIVE_EXPIRY,
+        )
+        self.timeout = httpx.Timeout(STARBURST_READ_TIMEOUT, connect=STARBURST_CONNECT_TIMEOUT)
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.max_concurrency = max(1, max_concurrency)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiter: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Set["asyncio.Future[None]"] = set()
+        self.requests = 0
+        self.in_flight = 0
+        self.wait_seconds = 0.0
+
+    def start(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Connections belong to the loop that opened them
+            if self._client is not None:
+                self._close_stale(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                verify=STARBURST_VERIFY_SSL,
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers={"Content-Type": "application/json"},
+                transport=self._transport,
+            )
+            self._limiter = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            step_log(f"Starburst client started (http2={self.http2}, max_connections={self.limits.max_connections})", 0)
+        return self._client
+
+    def _close_stale(self, client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """ Close a client left behind by another event loop, on that loop while it still runs. """
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            future = asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            # Its loop is gone (e.g. a second asyncio.run): close what can be closed from here
+            future = asyncio.ensure_future(client.aclose())
+        self._closing.add(future)
+        future.add_done_callback(self._stale_closed)
+
+    def _stale_closed(self, future: "asyncio.Future[None]") -> None:
+        self._closing.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            step_log(f"Starburst client: stale client closed with {future.exception()!r}", 0)
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        self._loop = None
+        self._limiter = None
+        if client is not None:
+            await client.aclose()
+
+    async def post_json(self, url: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> httpx.Response:
+        """ POST payload as JSON; raises for 4xx/5xx. timeout overrides the read timeout for this request. """
+        client = self.start()
+        queued_at = time.perf_counter()
+        async with self._limiter:
+            self.wait_seconds += time.perf_counter() - queued_at
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                response = await client.post(
+                    url,
+                    json=payload,
+                    timeout=httpx.Timeout(timeout, connect=STARBURST_CONNECT_TIMEOUT) if timeout else httpx.USE_CLIENT_DEFAULT,
+                )
+            finally:
+                self.in_flight -= 1
+        response.raise_for_status()
+        return response
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_concurrency": self.max_concurrency,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "avg_wait_ms": round(1000 * self.wait_seconds / self.requests, 1) if self.requests else None,
+        }
+
+_client = StarburstClient()
+
+def get_starburst_client() -> StarburstClient:
+    return _client
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import time
+import traceback
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from utils.logconfig import step_log
+
+# Long-lived, initialised MCP sessions per server URL, shared by every tool call in the process
+MCP_POOL_ENABLED = os.getenv("MCP_POOL_ENABLED", "1") == "1"
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+# A connection idle for longer than this is pinged before it is reused
+MCP_POOL_HEALTHCHECK_SECONDS = float(os.getenv("MCP_POOL_HEALTHCHECK_SECONDS", "30"))
+MCP_POOL_CONNECT_TIMEOUT = float(os.getenv("MCP_POOL_CONNECT_TIMEOUT", "10"))
+MCP_POOL_PING_TIMEOUT = float(os.getenv("MCP_POOL_PING_TIMEOUT", "2"))
+
+# connect(url) -> async context manager yielding an initialised ClientSession
+Connector = Callable[[str], Any]
+
+@asynccontextmanager
+async def sse_session(url: str) -> AsyncIterator[Any]:
+    """ Default connector: SSE transport + MCP initialize handshake. """
+    from mcp.client.session import ClientSession
+    from mcp.client.sse import sse_client
+
+    async with sse_client(url) as (reader, writer):
+        async with ClientSession(reader, writer) as session:
+            await session.initialize()
+            yield session
+
+class _Connection:
+    """
+    One pooled session. The sse_client / ClientSession contexts are entered and exited by a
+    dedicated task (anyio cancel scopes must close in the task that opened them); callers
+    only borrow the session object.
+    """
+
+    def __init__(self, url: str, connect: Connector):
+        self.url = url
+        self.session: Any = None
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self._connect = connect
+        self._ready = asyncio.Event()
+        self._close = asyncio.Event()
+        self._error: Optional[BaseException] = None
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            async with self._connect(self.url) as session:
+                self.session = session
+                self._ready.set()
+                await self._close.wait()
+        except BaseException as e:  # noqa: BLE001 - includes cancellation of a broken transport
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def wait_ready(self, timeout: float) -> None:
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        if self.session is None:
+            raise ConnectionError(f"MCP connection to {self.url} failed: {self._error!r}")
+
+    @property
+    def alive(self) -> bool:
+        # Still connecting counts as alive: callers wait on wait_ready()
+        return not self._task.done() and (self.session is not None or not self._ready.is_set())
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        self._close.set()
+
+    async def aclose(self) -> None:
+        self.close()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), MCP_POOL_PING_TIMEOUT)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+class _Stats:
+    def __init__(self):
+        self.connects = 0
+        self.connect_seconds = 0.0
+        self.reconnects = 0
+        self.health_checks = 0
+        self.calls = 0
+        self.call_seconds = 0.0
+        self.failures = 0
+
+class McpConnectionPool:
+    """
+    Up to `size` initialised MCP sessions per server URL. Calls are multiplexed: each goes
+    to the least busy live session (ClientSession matches responses to requests by id), and a
+    new session is opened only while every existing one is busy. Dead or unhealthy sessions
+    are replaced transparently and a call that fails on a broken transport is retried once.
+    """
+
+    def __init__(
+            self,
+            size: int = MCP_POOL_SIZE,
+            connect: Connector = sse_session,
+            healthcheck_seconds: float = MCP_POOL_HEALTHCHECK_SECONDS,
+            connect_timeout: float = MCP_POOL_CONNECT_TIMEOUT,
+    ):
+        self.size = max(1, size)
+        self.healthcheck_seconds = healthcheck_seconds
+        self.connect_timeout = connect_timeout
+        self._connect = connect
+        self._conns: Dict[str, List[_Connection]] = {}
+        self._stats: Dict[str, _Stats] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        # Sessions belong to the loop that opened them (e.g. a CLI calling asyncio.run twice)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._conns.clear()
+            self._locks.clear()
+            self._loop = loop
+
+    async def _wait_ready(self, conn: _Connection, stats: _Stats, opened: bool) -> None:
+        start = time.perf_counter()
+        try:
+            await conn.wait_ready(self.connect_timeout)
+        except BaseException:
+            conn.in_flight -= 1
+            conns = self._conns.get(conn.url, [])
+            if conn in conns:
+                conns.remove(conn)
+            await conn.aclose()
+            raise
+        if opened:
+            stats.connects += 1
+            stats.connect_seconds += time.perf_counter() - start
+            step_log(f"MCP pool: connected to {conn.url}", time.perf_counter() - start)
+
+    async def _acquire(self, url: str) -> _Connection:
+        self._bind_loop()
+        stats = self._stats.setdefault(url, _Stats())
+        opened = False
+        async with self._locks.setdefault(url, asyncio.Lock()):
+            conns = self._conns.setdefault(url, [])
+            for conn in [c for c in conns if not c.alive]:
+                conns.remove(conn)
+                stats.reconnects += 1
+
+            idle = [c for c in conns if c.in_flight == 0]
+            if not idle and len(conns) < self.size:
+                # Registered before the handshake finishes so concurrent callers can share it
+                conn = _Connection(url, self._connect)
+                conns.append(conn)
+                opened = True
+            else:
+                conn = min(idle or conns, key=lambda c: c.in_flight)
+                if conn.in_flight == 0 and conn.session is not None and time.monotonic() - conn.last_used > self.healthcheck_seconds:
+                    stats.health_checks += 1
+                    if not await conn.ping(MCP_POOL_PING_TIMEOUT):
+                        conns.remove(conn)
+                        conn.close()
+                        stats.reconnects += 1
+                        conn = _Connection(url, self._connect)
+                        conns.append(conn)
+                        opened = True
+            conn.in_flight += 1
+        # Outside the lock: other calls keep using the ready sessions meanwhile
+        await self._wait_ready(conn, stats, opened)
+        return conn
+
+    def _release(self, conn: _Connection) -> None:
+        conn.in_flight -= 1
+        conn.last_used = time.monotonic()
+
+    def _discard(self, conn: _Connection) -> None:
+        conns = self._conns.get(conn.url, [])
+        if conn in conns:
+            conns.remove(conn)
+            self._stats[conn.url].reconnects += 1
+        conn.close()
+
+    async def call_tool(self, url: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """ session.call_tool on a pooled session for url. """
+        if not MCP_POOL_ENABLED:
+            async with self._connect(url) as session:
+                return await session.call_tool(tool_name, arguments)
+
+        stats = self._stats.setdefault(url, _Stats())
+        for attempt in (1, 2):
+            conn = await self._acquire(url)
+            start = time.perf_counter()
+            try:
+                result = await conn.session.call_tool(tool_name, arguments)
+                stats.calls += 1
+                stats.call_seconds += time.perf_counter() - start
+                return result
+            except Exception:
+                stats.failures += 1
+                broken = not conn.alive or not await conn.ping(MCP_POOL_PING_TIMEOUT)
+                if broken:
+                    self._discard(conn)
+                if not broken or attempt == 2:
+                    raise
+                step_log(f"MCP pool: retrying {tool_name} on a new connection to {url}", 0)
+            finally:
+                self._release(conn)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        out: Dict[str, Dict[str, Any]] = {}
+        for url, s in self._stats.items():
+            conns = self._conns.get(url, [])
+            out[url] = {
+                "size": self.size,
+                "open": sum(1 for c in conns if c.alive),
+                "in_flight": sum(c.in_flight for c in conns),
+                "connects": s.connects,
+                "reconnects": s.reconnects,
+                "health_checks": s.health_checks,
+                "calls": s.calls,
+                "failures": s.failures,
+                "avg_connect_ms": round(1000 * s.connect_seconds / s.connects, 1) if s.connects else None,
+                "avg_call_ms": round(1000 * s.call_seconds / s.calls, 1) if s.calls else None,
+            }
+        return out
+
+    async def aclose(self) -> None:
+        conns = [c for cs in self._conns.values() for c in cs]
+        self._conns.clear()
+        if conns and self._loop is asyncio.get_running_loop():
+            await asyncio.gather(*(c.aclose() for c in conns), return_exceptions=True)
+
+_pool: Optional[McpConnectionPool] = None
+
+def get_mcp_pool() -> McpConnectionPool:
+    global _pool
+    if _pool is None:
+        _pool = McpConnectionPool()
+    return _pool
+
+async def close_mcp_pool() -> None:
+    """ Close every pooled session (app shutdown). """
+    global _pool
+    if _pool is not None:
+        try:
+            await _pool.aclose()
+        except Exception:
+            print("=== MCP POOL CLOSE ERROR ===")
+            print(traceback.format_exc())
+        _pool = None
@@ -0,0 +1,102 @@
+import importlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from mcp_server.tools.mcp_pool import get_mcp_pool
+
+# Tool servers that live in this process, as "url=module:attr" pairs separated by commas, e.g.
+#   MCP_INPROCESS_SERVERS="http://localhost:7000/query=mcp_server.server:mcp"
+# Calls to those URLs skip the SSE round trip and go through the server's own call_tool.
+MCP_INPROCESS_SERVERS = os.getenv("MCP_INPROCESS_SERVERS", "")
+
+class McpTransport(ABC):
+    """ How call_mcp_tool reaches a tool server. """
+
+    @abstractmethod
+    async def call_tool(self, url: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        ...
+
+class SseTransport(McpTransport):
+    """ Remote server over SSE, through the pooled sessions of mcp_pool. Returns a CallToolResult. """
+
+    async def call_tool(self, url: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        return await get_mcp_pool().call_tool(url, tool_name, arguments)
+
+class InProcessTransport(McpTransport):
+    """
+    Co-located FastMCP server: calls its public call_tool, so arguments are validated and
+    coerced exactly as for a remote call, but without the SSE round trip. Returns the tool's
+    JSON result (its structured content, else the JSON in its text content).
+    """
+
+    def __init__(self, server: Any):
+        self.server = server
+
+    async def call_tool(self, url: str, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        return _unwrap_tool_result(await self.server.call_tool(tool_name, arguments))
+
+def _unwrap_tool_result(result: Any) -> Any:
+    """ FastMCP 1.x returns content blocks or (content, structured_content); 2.x a CallToolResult. """
+    if isinstance(result, tuple) and len(result) == 2:
+        content, structured = result
+        return structured if structured is not None else _unwrap_tool_result(content)
+    structured = getattr(result, "structured_content", None)
+    if structured is None:
+        structured = getattr(result, "structuredContent", None)
+    if structured is not None:
+        return structured
+    if isinstance(result, dict):
+        return result
+
+    blocks = result if isinstance(result, list) else getattr(result, "content", None) or []
+    texts = [getattr(block, "text", None) for block in blocks]
+    texts = [t for t in texts if isinstance(t, str)]
+    if len(texts) == 1:
+        try:
+            return json.loads(texts[0])
+        except ValueError:
+            return texts[0]
+    return texts
+
+def _parse_inprocess_servers(spec: str) -> Dict[str, str]:
+    servers: Dict[str, str] = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        url, _, target = item.rpartition("=")
+        if url and target:
+            servers[url.strip()] = target.strip()
+    return servers
+
+_inprocess_targets = _parse_inprocess_servers(MCP_INPROCESS_SERVERS)
+_transports: Dict[str, McpTransport] = {}
+_sse_transport = SseTransport()
+_lock = threading.Lock()
+
+def register_inprocess_server(url: str, server: Any) -> None:
+    """ Route calls for url to a server object living in this process. """
+    with _lock:
+        _transports[url] = InProcessTransport(server)
+
+def unregister_inprocess_server(url: str) -> None:
+    with _lock:
+        _transports.pop(url, None)
+        _inprocess_targets.pop(url, None)
+
+def get_mcp_transport(url: str) -> McpTransport:
+    transport = _transports.get(url)
+    if transport is not None:
+        return transport
+    target = _inprocess_targets.get(url)
+    if target is None:
+        return _sse_transport
+
+    # Deferred: importing the server module pulls in its dependencies only when configured
+    module_name, _, attr = target.partition(":")
+    server = getattr(importlib.import_module(module_name), attr or "mcp")
+    register_inprocess_server(url, server)
+    return _transports[url]
+
+async def call_mcp_tool(url: str, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Any:
+    """ Call an MCP tool over whichever transport is configured for url. """
+    return await get_mcp_transport(url).call_tool(url, tool_name, arguments or {})
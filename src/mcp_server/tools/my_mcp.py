@@ -1,7 +1,11 @@
-from mcp import ClientSession
-from mcp.client.sse import sse_client
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+from mcp_server.tools.mcp_transport import call_mcp_tool
 from utils.logconfig import step_log
 
+MCP_QUERY_URL = os.getenv("MCP_QUERY_URL", "http://localhost:7000/query")
+QUERY_PAGE_SIZE = int(os.getenv("QUERY_PAGE_SIZE", "1000"))
+
 class McpProcessor:
     def __init__(self):
         pass
@@ -9,15 +13,53 @@ class McpProcessor:
     @staticmethod
     async def run_query(query):
         try:
-            async with sse_client(url="http://localhost:7000/query") as streams:
-                try:
-                    async with ClientSession(*streams) as session:
-                        await session.initialize()
-                        result = await session.call_tool("run_query", {"query": str(query)})
-                        return result
-                except Exception as e:
-                    step_log(f"Error running query: {e}")
-                    return {"error": str(e)}
-        except Exception as e:
+            # In-process dispatch when the server is co-located, else a pooled SSE session
+            return await call_mcp_tool(MCP_QUERY_URL, "run_query", {"query": str(query)})
+        except ConnectionError as e:
             step_log("Mcp server not reachable.  Please start the MCP server or check network issue.")
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
+        except Exception as e:
+            step_log(f"Error running query: {e}")
+            return {"error": str(e)}
+
+    @staticmethod
+    async def iter_query_rows(
+            query: str,
+            page_size: int = QUERY_PAGE_SIZE,
+            max_rows: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield result rows page by page through run_query_paged, holding one page at a time.
+        Stops after max_rows rows (no further pages are requested) or after the last page.
+        Raises RuntimeError if the tool reports an error or returns a response it could not page.
+        """
+        from mcp_server.tools.txn_mcp_client import extract_json_from_mcp_result
+
+        if max_rows is not None:
+            page_size = max(1, min(page_size, max_rows))
+        token = ""
+        returned = 0
+        while True:
+            result = await call_mcp_tool(
+                MCP_QUERY_URL, "run_query_paged", {"query": str(query), "page_size": page_size, "page_token": token}
+            )
+            page = extract_json_from_mcp_result(result)
+            if page.get("isError") or page.get("IsError"):
+                raise RuntimeError(f"run_query_paged failed: {page.get('structuredContent') or page.get('meta')}")
+            if "raw" in page:
+                # Upstream answered without a row list; treating it as an empty page would end the scan early
+                raise RuntimeError(f"run_query_paged returned an unrecognised response: {str(page['raw'])[:200]}")
+
+            for row in page.get("rows", []):
+                yield row
+                returned += 1
+                if max_rows is not None and returned >= max_rows:
+                    return
+            token = page.get("next_page_token") or ""
+            if not token:
+                return
+
+    @staticmethod
+    async def fetch_rows(query: str, max_rows: int, page_size: int = QUERY_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """ The first max_rows rows of the query. """
+        return [row async for row in McpProcessor.iter_query_rows(query, page_size=page_size, max_rows=max_rows)]
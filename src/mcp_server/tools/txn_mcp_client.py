@@ -1,8 +1,7 @@
 import asyncio, json
 from typing import Any, Dict, Optional
 
-from mcp.client.session import ClientSession
-from mcp.client.sse import sse_client
+from mcp_server.tools.mcp_transport import call_mcp_tool
 
 # Use your working SSE endpoint
 MCP_SSE_URL = "http://127.0.0.1:7000/sse/sse"
@@ -25,21 +24,20 @@ async def fetch_transactions(
         "limit_return": int(limit_return),
     })
 
-    async with sse_client(MCP_SSE_URL) as (reader, writer):
-        async with ClientSession(reader, writer) as session:
-            await session.initialize()
-            result = await session.call_tool("get_transactions", params)
-
-            payload = extract_json_from_mcp_result(result)
-            return payload
+    result = await call_mcp_tool(MCP_SSE_URL, "get_transactions", params)
+    return extract_json_from_mcp_result(result)
 
 def extract_json_from_mcp_result(result) -> Dict[str, Any]:
     """
     Handles multiple MCP client versions:
     - JSON blocks: block.type == "json" and block.json exists
     - Text blocks: block.type == "text" with JSON string in block.text
+    - In-process transport: the tool's own dict is returned unchanged
     - Fallback: stringification
     """
+    if isinstance(result, dict):
+        return result
+
     for block in getattr(result, "content", []) or []:
         btype = getattr(block, "type", None)
 
@@ -0,0 +1,23 @@
+import contextvars
+from typing import Any, Callable, Dict, Optional
+
+# Receives {"event": <type>, "data": <payload>} dicts for the request currently being streamed
+EventSink = Callable[[Dict[str, Any]], None]
+
+_event_sink: contextvars.ContextVar[Optional[EventSink]] = contextvars.ContextVar("event_sink", default=None)
+
+def set_event_sink(sink: Optional[EventSink]) -> contextvars.Token:
+    """ Route emit() calls in the current context (and tasks spawned from it) to sink. """
+    return _event_sink.set(sink)
+
+def reset_event_sink(token: contextvars.Token) -> None:
+    _event_sink.reset(token)
+
+def streaming_enabled() -> bool:
+    return _event_sink.get() is not None
+
+def emit(event: str, data: Any) -> None:
+    """ Push an event to the active sink; a no-op when nothing is streaming. """
+    sink = _event_sink.get()
+    if sink is not None:
+        sink({"event": event, "data": data})
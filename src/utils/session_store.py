@@ -1,16 +1,30 @@
+import argparse
+import asyncio
+import atexit
 import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from mcp_server.agents.session_types import SessionMemory
 
-SESS_DIR = Path("logs/sessions")
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")  # "sqlite" or "json"
+SESS_DIR = Path(os.getenv("SESSION_DIR", "logs/sessions"))
+SESSION_DB = os.getenv("SESSION_DB", "logs/sessions.db")
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "256"))
+# 0 = write-through; otherwise dirty sessions are flushed by a background thread at this interval
+SESSION_FLUSH_INTERVAL_SECONDS = float(os.getenv("SESSION_FLUSH_INTERVAL_SECONDS", "0.5"))
 
-def load_session(user_id: str, session_id: str) -> dict[str, Any]:
-    SESS_DIR.mkdir(parents=True, exist_ok=True)
-    path = SESS_DIR / f"{user_id}__{session_id}.json"
+_STRUCTURED_KEYS = {"user_id", "session_id", "turns", "last_tool_outputs"}
 
-    # Default fresh session
-    fresh_session = {
+def _fresh_session(user_id: str, session_id: str) -> Dict[str, Any]:
+    return {
         "user_id": user_id,
         "session_id": session_id,
         "turns": [],
@@ -19,30 +33,539 @@ def load_session(user_id: str, session_id: str) -> dict[str, Any]:
         "last_agent": "",
     }
 
-    if not path.exists():
-        return fresh_session
+def _with_defaults(data: Dict[str, Any]) -> Dict[str, Any]:
+    # Ensure required keys always exist
+    data.setdefault("turns", [])
+    data.setdefault("last_tool_outputs", {})
+    data.setdefault("last_answer", "")
+    data.setdefault("last_agent", "")
+    return data
 
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+def _scalar_fields(mem: Dict[str, Any]) -> Dict[str, Any]:
+    """ Everything except the transcript and tool outputs (last_answer, last_agent, feed_name, ...). """
+    return {k: v for k, v in mem.items() if k not in _STRUCTURED_KEYS}
+
+@dataclass
+class SessionDelta:
+    """ What changed in one session since it was last persisted. """
+    user_id: str
+    session_id: str
+    snapshot: Dict[str, Any]                       # full session, for document-style backends
+    new_turns: List[Dict[str, Any]] = field(default_factory=list)
+    replace_turns: bool = False                    # transcript was rewritten (e.g. trimmed), not appended to
+    fields: Optional[Dict[str, Any]] = None        # None = unchanged
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    removed_outputs: List[str] = field(default_factory=list)
+    expected_version: Optional[int] = None         # replace_turns only if the stored version still matches (0 = absent)
+
+class SessionConflictError(RuntimeError):
+    """ A transcript rewrite was based on a version of the session that is no longer current. """
+
+# -----------------------------------------------------------
+# Backends
+# -----------------------------------------------------------
+class SessionBackend(ABC):
+    """ Durable storage for sessions. load/version return None for unknown sessions;
+        apply persists a delta and returns the session's new version. """
+
+    @abstractmethod
+    def load(self, user_id: str, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        ...
+
+    @abstractmethod
+    def version(self, user_id: str, session_id: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def apply(self, delta: SessionDelta) -> int:
+        ...
+
+    def close(self) -> None:
+        pass
+
+class JsonFileSessionBackend(SessionBackend):
+    """ One pretty-printed JSON document per session; every save rewrites the whole file. """
+
+    def __init__(self, sess_dir: Path = SESS_DIR):
+        self.sess_dir = Path(sess_dir)
+
+    def _path(self, user_id: str, session_id: str) -> Path:
+        return self.sess_dir / f"{user_id}__{session_id}.json"
+
+    def load(self, user_id: str, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        path = self._path(user_id, session_id)
+        if not path.exists():
+            return None
+        try:
+            version = path.stat().st_mtime_ns
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
             if not isinstance(data, dict):
-                return fresh_session
-            # Ensure required keys always exist
-            data.setdefault("turns", [])
-            data.setdefault("last_tool_outputs", {})
-            data.setdefault("last_answer", "")
-            data.setdefault("last_agent", "")
-            return data
-
-    except json.JSONDecodeError:
-        print(f"[SessionStore] Corrupted session file detected: {path}. Resetting session.")
-        return fresh_session
+                return None
+            return _with_defaults(data), version
+        except json.JSONDecodeError:
+            print(f"[SessionStore] Corrupted session file detected: {path}. Resetting session.")
+            return None
+        except Exception as e:
+            print(f"[SessionStore] Failed to load session {path}: {e}")
+            return None
+
+    def version(self, user_id: str, session_id: str) -> Optional[int]:
+        try:
+            return self._path(user_id, session_id).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def apply(self, delta: SessionDelta) -> int:
+        self.sess_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(delta.user_id, delta.session_id)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(delta.snapshot, f, indent=2, ensure_ascii=False)
+        return path.stat().st_mtime_ns
+
+class SqliteSessionBackend(SessionBackend):
+    """ Sessions in SQLite (WAL): turns are rows and last_tool_outputs are keyed blobs,
+        so appending a turn costs the same however long the conversation is.
+        Safe to share between processes (e.g. several uvicorn workers).
+        With legacy_dir, a session missing from the database is imported from its
+        JSON file there the first time it is loaded. """
+
+    def __init__(self, db_path: str = SESSION_DB, legacy_dir: Optional[Path] = None):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._legacy = JsonFileSessionBackend(legacy_dir) if legacy_dir is not None else None
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " user_id TEXT NOT NULL,"
+                " session_id TEXT NOT NULL,"
+                " fields TEXT NOT NULL DEFAULT '{}',"
+                " version INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL,"
+                " PRIMARY KEY (user_id, session_id));"
+                "CREATE TABLE IF NOT EXISTS session_turns ("
+                " user_id TEXT NOT NULL,"
+                " session_id TEXT NOT NULL,"
+                " seq INTEGER NOT NULL,"
+                " role TEXT,"
+                " content TEXT,"
+                " meta TEXT,"
+                " PRIMARY KEY (user_id, session_id, seq));"
+                "CREATE TABLE IF NOT EXISTS session_tool_outputs ("
+                " user_id TEXT NOT NULL,"
+                " session_id TEXT NOT NULL,"
+                " name TEXT NOT NULL,"
+                " value TEXT,"
+                " PRIMARY KEY (user_id, session_id, name));"
+            )
+
+    def load(self, user_id: str, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        loaded = self._load(user_id, session_id)
+        if loaded is None and self._legacy is not None and self._import_legacy(user_id, session_id):
+            loaded = self._load(user_id, session_id)
+        return loaded
+
+    def _import_legacy(self, user_id: str, session_id: str) -> bool:
+        legacy = self._legacy.load(user_id, session_id)
+        if legacy is None:
+            return False
+        mem = legacy[0]
+        mem["user_id"], mem["session_id"] = user_id, session_id
+        try:
+            self.apply(_import_delta(mem, expected_version=0))
+        except SessionConflictError:
+            pass  # another worker imported (and maybe extended) it first
+        return True
+
+    def _load(self, user_id: str, session_id: str) -> Optional[Tuple[Dict[str, Any], int]]:
+        key = (user_id, session_id)
+        with self._lock:
+            # One read transaction so all three tables come from the same snapshot
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT fields, version FROM sessions WHERE user_id = ? AND session_id = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                turns = self._conn.execute(
+                    "SELECT role, content, meta FROM session_turns WHERE user_id = ? AND session_id = ? ORDER BY seq", key
+                ).fetchall()
+                outputs = self._conn.execute(
+                    "SELECT name, value FROM session_tool_outputs WHERE user_id = ? AND session_id = ?", key
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+
+        mem = {"user_id": user_id, "session_id": session_id, **json.loads(row[0])}
+        mem["turns"] = [{"role": r, "content": c, "meta": json.loads(m) if m else {}} for r, c, m in turns]
+        mem["last_tool_outputs"] = {name: json.loads(value) for name, value in outputs}
+        return _with_defaults(mem), row[1]
+
+    def version(self, user_id: str, session_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM sessions WHERE user_id = ? AND session_id = ?", (user_id, session_id)
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply(self, delta: SessionDelta) -> int:
+        key = (delta.user_id, delta.session_id)
+        fields_json = json.dumps(delta.fields, ensure_ascii=False) if delta.fields is not None else None
+        with self._lock:
+            conn = self._conn
+            # IMMEDIATE takes the write lock up front so concurrent writers queue instead of racing on seq
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if delta.replace_turns and delta.expected_version is not None:
+                    row = conn.execute(
+                        "SELECT version FROM sessions WHERE user_id = ? AND session_id = ?", key
+                    ).fetchone()
+                    if (row[0] if row else 0) != delta.expected_version:
+                        raise SessionConflictError(f"Session {key} changed since version {delta.expected_version}")
+                conn.execute(
+                    "INSERT INTO sessions (user_id, session_id, fields, version, updated_at) VALUES (?, ?, ?, 1, ?)"
+                    " ON CONFLICT (user_id, session_id) DO UPDATE SET"
+                    " fields = COALESCE(?, fields), version = version + 1, updated_at = excluded.updated_at",
+                    (*key, fields_json or "{}", time.time(), fields_json),
+                )
+                if delta.replace_turns:
+                    conn.execute("DELETE FROM session_turns WHERE user_id = ? AND session_id = ?", key)
+                if delta.new_turns:
+                    next_seq = conn.execute(
+                        "SELECT COALESCE(MAX(seq), -1) + 1 FROM session_turns WHERE user_id = ? AND session_id = ?", key
+                    ).fetchone()[0]
+                    conn.executemany(
+                        "INSERT INTO session_turns (user_id, session_id, seq, role, content, meta) VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (*key, next_seq + i, t.get("role"), t.get("content"),
+                             json.dumps(t.get("meta") or {}, ensure_ascii=False))
+                            for i, t in enumerate(delta.new_turns)
+                        ],
+                    )
+                if delta.outputs:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO session_tool_outputs (user_id, session_id, name, value) VALUES (?, ?, ?, ?)",
+                        [(*key, name, json.dumps(value, ensure_ascii=False)) for name, value in delta.outputs.items()],
+                    )
+                if delta.removed_outputs:
+                    conn.executemany(
+                        "DELETE FROM session_tool_outputs WHERE user_id = ? AND session_id = ? AND name = ?",
+                        [(*key, name) for name in delta.removed_outputs],
+                    )
+                version = conn.execute(
+                    "SELECT version FROM sessions WHERE user_id = ? AND session_id = ?", key
+                ).fetchone()[0]
+                conn.execute("COMMIT")
+                return version
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+# -----------------------------------------------------------
+# Hot-session cache with write-behind
+# -----------------------------------------------------------
+@dataclass
+class _CachedSession:
+    mem: Dict[str, Any]
+    version: int
+    persisted_turns: int
+    persisted_archived: int                        # mem["archived_turns"] as last persisted
+    persisted_fields: Dict[str, Any]
+    persisted_outputs: Dict[str, Any]
+    dirty: bool = False
+
+def _copy_session(mem: Dict[str, Any]) -> Dict[str, Any]:
+    # Turns and outputs are replaced, never mutated in place, so copying the containers is enough
+    return {**mem, "turns": list(mem.get("turns") or []), "last_tool_outputs": dict(mem.get("last_tool_outputs") or {})}
+
+class SessionStore:
+    """ LRU of hot sessions in front of a SessionBackend.
+
+        save() only updates memory and marks the session dirty; a background thread
+        persists what changed (new turns, changed fields and tool outputs) every
+        flush_interval seconds. A clean cached session is revalidated against the
+        backend version on load, so writes from other workers are picked up. """
+
+    def __init__(
+            self,
+            backend: SessionBackend,
+            max_sessions: int = SESSION_CACHE_SIZE,
+            flush_interval: float = SESSION_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.backend = backend
+        self.max_sessions = max_sessions
+        self.flush_interval = flush_interval
+        self._cache: "OrderedDict[Tuple[str, str], _CachedSession]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_reloads = 0
+        self.flushes = 0
+
+        if flush_interval > 0:
+            self._thread = threading.Thread(target=self._run, name="session-store-flusher", daemon=True)
+            self._thread.start()
+
+    def load(self, user_id: str, session_id: str) -> Dict[str, Any]:
+        key = (user_id, session_id)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and not entry.dirty and self.backend.version(*key) not in (None, entry.version):
+                self.stale_reloads += 1
+                entry = None
+            if entry is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return _copy_session(entry.mem)
+
+            self.misses += 1
+            loaded = self.backend.load(*key)
+            mem, version = loaded if loaded is not None else (_fresh_session(*key), 0)
+            entry = _CachedSession(
+                mem=mem,
+                version=version,
+                persisted_turns=len(mem["turns"]),
+                persisted_archived=int(mem.get("archived_turns", 0)),
+                persisted_fields=_scalar_fields(mem),
+                persisted_outputs=dict(mem["last_tool_outputs"]),
+            )
+            self._put(key, entry)
+            return _copy_session(mem)
+
+    def save(self, mem: SessionMemory) -> None:
+        key = (mem["user_id"], mem["session_id"])
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                # Saved without a prior load (e.g. evicted mid-turn): diff against the backend copy
+                self.load(*key)
+                entry = self._cache[key]
+            entry.mem = _copy_session(dict(mem))
+            entry.dirty = True
+            self._cache.move_to_end(key)
+            if self.flush_interval <= 0:
+                self._flush_entry(key, entry)
+
+    def _put(self, key: Tuple[str, str], entry: _CachedSession) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_sessions:
+            old_key, old_entry = self._cache.popitem(last=False)
+            if old_entry.dirty:
+                self._flush_entry(old_key, old_entry)
+
+    def _flush_entry(self, key: Tuple[str, str], entry: _CachedSession) -> None:
+        for attempt in range(3):
+            try:
+                self._write_entry(key, entry)
+                return
+            except SessionConflictError:
+                if attempt == 2:
+                    raise
+                # Our rewrite would drop turns another worker appended since we loaded: merge them in
+                rebased = self._rebase(key, entry)
+                if self._cache.get(key) is entry:
+                    self._cache[key] = rebased
+                entry = rebased
+
+    def _write_entry(self, key: Tuple[str, str], entry: _CachedSession) -> None:
+        mem = entry.mem
+        turns = mem["turns"]
+        outputs = mem["last_tool_outputs"]
+        fields = _scalar_fields(mem)
+
+        # A fold moved turns to the archive: the window was rewritten even if it is no shorter
+        archived = int(mem.get("archived_turns", 0))
+        replace = archived != entry.persisted_archived or len(turns) < entry.persisted_turns
+        delta = SessionDelta(
+            user_id=key[0],
+            session_id=key[1],
+            snapshot=mem,
+            new_turns=turns if replace else turns[entry.persisted_turns:],
+            replace_turns=replace,
+            fields=fields if fields != entry.persisted_fields else None,
+            outputs={k: v for k, v in outputs.items() if entry.persisted_outputs.get(k, object()) != v},
+            removed_outputs=[k for k in entry.persisted_outputs if k not in outputs],
+            expected_version=entry.version if replace else None,
+        )
+        # Another worker wrote this session since we loaded it: its turns are in the backend, not in our copy
+        concurrent = (self.backend.version(*key) or 0) != entry.version
+        entry.version = self.backend.apply(delta)
+        entry.persisted_turns = len(turns)
+        entry.persisted_archived = archived
+        entry.persisted_fields = fields
+        entry.persisted_outputs = dict(outputs)
+        entry.dirty = False
+        self.flushes += 1
+        if concurrent:
+            self._cache.pop(key, None)
+
+    def _rebase(self, key: Tuple[str, str], entry: _CachedSession) -> _CachedSession:
+        """ Our unpersisted changes replayed on the backend's current copy of the session. """
+        loaded = self.backend.load(*key)
+        if loaded is None:
+            return entry
+        base, version = loaded
+        mem = entry.mem
+        archived = int(mem.get("archived_turns", 0))
+        base_archived = int(base.get("archived_turns", 0))
+        # Turns added since the last flush, and the base turns our fold already sent to the archive
+        new_turns = mem["turns"][max(0, entry.persisted_turns - (archived - entry.persisted_archived)):]
+        skip = max(0, archived - base_archived)
+        changed_outputs = {k: v for k, v in mem["last_tool_outputs"].items() if entry.persisted_outputs.get(k, object()) != v}
+
+        merged = {**base, **_scalar_fields(mem), "archived_turns": max(archived, base_archived)}
+        merged["turns"] = base["turns"][skip:] + new_turns
+        merged["last_tool_outputs"] = {**base["last_tool_outputs"], **changed_outputs}
+        for name in entry.persisted_outputs:
+            if name not in mem["last_tool_outputs"]:
+                merged["last_tool_outputs"].pop(name, None)
+        return _CachedSession(
+            mem=merged,
+            version=version,
+            persisted_turns=len(base["turns"]),
+            persisted_archived=base_archived,
+            persisted_fields=_scalar_fields(base),
+            persisted_outputs=dict(base["last_tool_outputs"]),
+            dirty=True,
+        )
+
+    def flush(self) -> None:
+        """ Persist every dirty session now. """
+        with self._lock:
+            for key, entry in list(self._cache.items()):
+                if entry.dirty:
+                    try:
+                        self._flush_entry(key, entry)
+                    except Exception as e:
+                        print(f"[SessionStore] Failed to persist session {key}: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cached_sessions": len(self._cache),
+                "dirty_sessions": sum(1 for e in self._cache.values() if e.dirty),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_reloads": self.stale_reloads,
+                "flushes": self.flushes,
+            }
+
+# -----------------------------------------------------------
+# Process-wide store
+# -----------------------------------------------------------
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+def make_backend(kind: str = SESSION_BACKEND) -> SessionBackend:
+    if kind == "json":
+        return JsonFileSessionBackend(SESS_DIR)
+    if kind == "sqlite":
+        # Sessions saved by the JSON backend stay visible: each is imported on its first load
+        return SqliteSessionBackend(SESSION_DB, legacy_dir=SESS_DIR)
+    raise ValueError(f"Unknown SESSION_BACKEND: {kind!r} (expected 'sqlite' or 'json')")
+
+def get_session_store() -> SessionStore:
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = SessionStore(make_backend())
+                atexit.register(_session_store.close)
+    return _session_store
+
+def set_session_store(store: Optional[SessionStore]) -> None:
+    global _session_store
+    _session_store = store
+
+def load_session(user_id: str, session_id: str) -> dict[str, Any]:
+    try:
+        return get_session_store().load(user_id, session_id)
     except Exception as e:
-        print(f"[SessionStor] Failed to load session {path}: {e}")
-        return fresh_session
+        print(f"[SessionStore] Failed to load session {user_id}/{session_id}: {e}")
+        return _fresh_session(user_id, session_id)
 
 def save_session(mem: SessionMemory) -> None:
-    SESS_DIR.mkdir(parents=True, exist_ok=True)
-    path = SESS_DIR / f"{mem['user_id']}__{mem['session_id']}.json"
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(mem, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+    get_session_store().save(mem)
+
+_session_locks: "weakref.WeakValueDictionary[Tuple[str, str], asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def session_lock(user_id: str, session_id: str) -> asyncio.Lock:
+    """ Per-session lock so two concurrent turns on one session run one after the other. """
+    key = (user_id, session_id)
+    lock = _session_locks.get(key)
+    if lock is None:
+        lock = asyncio.Lock()
+        _session_locks[key] = lock
+    return lock
+
+# -----------------------------------------------------------
+# Migration from JSON session files
+# -----------------------------------------------------------
+def _import_delta(mem: Dict[str, Any], expected_version: Optional[int] = None) -> SessionDelta:
+    return SessionDelta(
+        user_id=mem["user_id"],
+        session_id=mem["session_id"],
+        snapshot=mem,
+        new_turns=mem["turns"],
+        replace_turns=True,
+        fields=_scalar_fields(mem),
+        outputs=mem["last_tool_outputs"],
+        expected_version=expected_version,
+    )
+
+def migrate(src_dir: Path, backend: SessionBackend, overwrite: bool = False) -> Iterable[Tuple[str, str, int]]:
+    """ Copy <user>__<session>.json files into backend; yields (user_id, session_id, turns). """
+    source = JsonFileSessionBackend(src_dir)
+    for path in sorted(Path(src_dir).glob("*__*.json")):
+        user_id, _, session_id = path.stem.partition("__")
+        if not overwrite and backend.version(user_id, session_id) is not None:
+            continue
+        loaded = source.load(user_id, session_id)
+        if loaded is None:
+            continue
+        mem = loaded[0]
+        mem["user_id"], mem["session_id"] = user_id, session_id
+        backend.apply(_import_delta(mem))
+        yield user_id, session_id, len(mem["turns"])
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the session store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mg = sub.add_parser("migrate", help="Import JSON session files into the SQLite store.")
+    mg.add_argument("--src", default=str(SESS_DIR))
+    mg.add_argument("--db", default=SESSION_DB)
+    mg.add_argument("--overwrite", action="store_true", help="Replace sessions already in the database.")
+    args = parser.parse_args()
+
+    backend = SqliteSessionBackend(args.db)
+    migrated = list(migrate(Path(args.src), backend, overwrite=args.overwrite))
+    backend.close()
+    print(f"Migrated {len(migrated)} sessions ({sum(n for _, _, n in migrated)} turns) into {args.db}.")
+
+if __name__ == "__main__":
+    _cli()
@@ -5,15 +5,15 @@ The drop-down sits above the text area, aligned to the right, and selecting a
 question populates the text area automatically.
 """
 
-import threading
+import json
 import time
-from typing import Dict, Optional
+from typing import Dict, Iterator, Tuple
 
 import pandas as pd
 import requests
 import streamlit as st
 
-API_URL = "http://localhost:8000/chat"
+STREAM_URL = "http://localhost:8000/chat/stream"
 
 st.set_page_config(page_title="Breaks Analysis - Agentic POC", layout="wide")
 st.markdown(
@@ -51,14 +51,20 @@ if "user_question" not in st.session_state:
     st.session_state["user_question"] = CANNED_QUESTIONS[0]
 
 
-def _run_request(api_url: str, payload: Dict, result_holder: Dict) -> None:
-    """Execute the API request and store the response or error."""
-    try:
-        resp = requests.post(api_url, json=payload, timeout=120)
+def _iter_sse(api_url: str, payload: Dict) -> Iterator[Tuple[str, Dict]]:
+    """POST to the streaming endpoint and yield (event, data) pairs as they arrive."""
+    # (connect, read) timeouts: the read timeout applies between events, not to the whole answer
+    with requests.post(api_url, json=payload, stream=True, timeout=(10, 120)) as resp:
         resp.raise_for_status()
-        result_holder["response"] = resp.json()
-    except Exception as exc:  # noqa: BLE001
-        result_holder["error"] = str(exc)
+        event, data_lines = "message", []
+        for line in resp.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data:"):].strip())
+            elif not line and data_lines:
+                yield event, json.loads("\n".join(data_lines))
+                event, data_lines = "message", []
 
 
 def handle_canned_question_selection() -> None:
@@ -104,26 +110,34 @@ if st.button("Run analysis"):
             "user_question": user_question,
         }
 
-        result_holder: Dict[str, Optional[Dict]] = {}
-        t = threading.Thread(
-            target=_run_request, args=(API_URL, payload, result_holder), daemon=True
-        )
-
-        elapsed_ph = st.empty()
+        status_ph = st.empty()
+        answer_ph = st.empty()
+        steps: list[str] = []
+        answer = ""
         start = time.perf_counter()
-        t.start()
-
-        while t.is_alive():
-            elapsed = time.perf_counter() - start
-            elapsed_ph.markdown(f"⏱️ Elapsed time: {elapsed:.1f}s")
-            time.sleep(0.5)
 
-        elapsed_ph.empty()
-
-        if "error" in result_holder:
-            st.error(f"Request failed: {result_holder['error']}")
-        else:
-            st.session_state["analysis_result"] = result_holder.get("response")
+        try:
+            for event, data in _iter_sse(STREAM_URL, payload):
+                elapsed = time.perf_counter() - start
+                if event == "trace":
+                    steps.append(f"{data.get('node', '')}: {data.get('message') or data.get('stage', '')}")
+                    status_ph.markdown(f"⏱️ {elapsed:.1f}s — " + "  \n".join(steps[-3:]))
+                elif event == "progress":
+                    status_ph.markdown(
+                        f"⏱️ {elapsed:.1f}s — explaining breaks: {data.get('completed', 0)}/{data.get('total', 0)} groups done"
+                    )
+                elif event == "token":
+                    answer += data.get("text", "")
+                    answer_ph.markdown(answer + " ▌")
+                elif event == "final":
+                    st.session_state["analysis_result"] = data
+                elif event == "error":
+                    st.error(f"Request failed: {data.get('detail')}")
+        except Exception as exc:  # noqa: BLE001
+            st.error(f"Request failed: {exc}")
+
+        status_ph.empty()
+        answer_ph.empty()
 
 # --- Output ---
 if st.session_state.get("analysis_result"):
@@ -132,12 +146,20 @@ if st.session_state.get("analysis_result"):
     with col_main:
         st.subheader("Analysis Result")
         result = st.session_state["analysis_result"]
+        transactions = None
+        if isinstance(result, dict):
+            # Top level in the full response, under tool_outputs in the delta one
+            transactions = result.get("transactions") or (result.get("tool_outputs") or {}).get("transactions")
         if isinstance(result, dict) and "data" in result:
             try:
                 df = pd.DataFrame(result["data"])
                 st.dataframe(df, use_container_width=True)
             except Exception:
                 st.json(result)
+        elif transactions:
+            # Structured rows from the investigator, no need to parse the Markdown table back
+            st.dataframe(pd.DataFrame(transactions), use_container_width=True, hide_index=True)
+            st.json(result)
         else:
             st.json(result)
 
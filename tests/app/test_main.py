@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+pytest.importorskip("langgraph")
+os.environ.setdefault("VERTEX_ADAPTER", "stub")
+os.environ.setdefault("AGENT_WARMUP", "0")
+
+from fastapi.testclient import TestClient
+
+from app import main
+from mcp_server.agents import graph_breaks_poc as poc
+from utils.session_store import SessionStore, SqliteSessionBackend, set_session_store
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = SessionStore(SqliteSessionBackend(str(tmp_path / "sessions.db")), flush_interval=0)
+    set_session_store(store)
+    monkeypatch.setattr(main, "WARMUP_ON_STARTUP", False)
+    monkeypatch.setattr(poc, "_get_semantic_cache", lambda: None)
+    with TestClient(main.app) as c:
+        yield c
+    set_session_store(None)
+    store.close()
+
+
+def _ask(client, question, **extra):
+    return client.post("/chat", json={"user_id": "u1", "session_id": "s1", "user_question": question, **extra})
+
+
+def test_chat_returns_the_full_state_by_default(client):
+    body = _ask(client, "show the lineage").json()
+    assert body["selected_tool"] == "get_lineage"
+    assert [t["role"] for t in body["session"]["turns"]] == ["user", "assistant"]
+
+
+def test_chat_delta_returns_only_the_turn(client):
+    _ask(client, "show the lineage")
+    body = _ask(client, "show the lineage paths again", response_mode="delta").json()
+
+    assert "session" not in body
+    assert body["session_version"] == 2
+    assert body["user_question"] == "show the lineage paths again"
+    assert body["analysis"]
+    assert body["trace"][0]["node"] == "Router Agent"
+
+
+def test_session_endpoint_returns_the_stored_session(client):
+    _ask(client, "show the lineage", response_mode="delta")
+    _ask(client, "show the lineage paths again", response_mode="delta")
+
+    session = client.get("/sessions/u1/s1").json()
+    assert session["version"] == 2
+    assert [t["content"] for t in session["turns"] if t["role"] == "user"] == ["show the lineage", "show the lineage paths again"]
+    assert client.get("/sessions/u1/s1", params={"include_archive": True}).json()["archived_turns_history"] == []
+
+
+def test_chat_stream_sends_trace_then_final(client):
+    events = []
+    with client.stream("POST", "/chat/stream", json={"user_id": "u1", "session_id": "s1",
+                                                     "user_question": "show the lineage", "response_mode": "delta"}) as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        event = None
+        for line in r.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: "):])))
+
+    names = [name for name, _ in events]
+    assert names[0] == "trace" and names[-1] == "final"
+    assert "token" in names
+    final = events[-1][1]
+    assert final["selected_tool"] == "get_lineage" and "session" not in final
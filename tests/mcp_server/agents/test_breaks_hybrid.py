@@ -0,0 +1,71 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents import breaks_agent
+
+
+def _breaks(n, paths=3):
+    return [{"hierarchy_path": f"P{i % paths}", "hop_id": f"HOP_{i}", "hop_description": f"hop {i}",
+             "exposure_amt": 1000 * i, "total_anchor_count": 1000, "break_anchor_count": 50, "break_anchor_pct": 5.0,
+             "break_valid_count": 45, "break_null_count": 5, "break_empty_count": 0, "required_cde": 4}
+            for i in range(n)]
+
+
+class _FakeVertex:
+    """ Records which prompts were called and how many breaks each highlights prompt carried. """
+
+    def __init__(self):
+        self.calls = []
+        self.highlight_sizes = []
+
+    async def agenerate_from_config(self, agent_config_name, template_vars, json_mode=False):
+        self.calls.append(agent_config_name)
+        await asyncio.sleep(0.01)
+        if agent_config_name == "breaks_agent_highlights":
+            self.highlight_sizes.append(template_vars["break_count"])
+            return f"Highlights:\n{template_vars['break_count']} breaks\n\nSuggested Next Questions:\n- why?"
+        assert agent_config_name == "breaks_agent_reduce"
+        return f"Highlights:\n{template_vars['chunk_highlights']}\n\nAgent Commentary:\ndone"
+
+
+def _serve(fake):
+    async def aget_vertex_object():
+        return fake
+    return aget_vertex_object
+
+
+def test_hybrid_renders_hop_sections_locally_and_asks_llm_for_closing_only(monkeypatch):
+    fake = _FakeVertex()
+    monkeypatch.setattr(breaks_agent, "aget_vertex_object", _serve(fake))
+
+    text = asyncio.run(breaks_agent.aexplain_breaks("top breaks?", _breaks(10), mode="hybrid"))
+
+    assert fake.calls == ["breaks_agent_highlights"]
+    assert text.startswith("Explanation:\n**P0 - hop 0 (HOP_0) - $0**")
+    assert text.count("-----") == 10
+    assert "- 5.0% of anchor records are broken at this hop (50 of 1,000 records)." in text
+    assert "45 of 50 broken records (90.0%)" in text
+    assert text.endswith("Highlights:\n10 breaks\n\nSuggested Next Questions:\n- why?")
+    assert breaks_agent.short_amount(1_530_000_000) == "$1.53B"
+
+
+def test_hybrid_chunks_highlights_for_large_break_sets(monkeypatch):
+    fake = _FakeVertex()
+    monkeypatch.setattr(breaks_agent, "aget_vertex_object", _serve(fake))
+    monkeypatch.setattr(breaks_agent, "BREAKS_MAP_REDUCE_THRESHOLD", 16)
+
+    text = asyncio.run(breaks_agent.aexplain_breaks_hybrid("top breaks?", _breaks(30), chunk_size=6))
+
+    # Every hop section is still rendered locally; no highlights prompt sees more than one chunk
+    assert text.count("-----") == 30
+    assert sum(fake.highlight_sizes) == 30 and max(fake.highlight_sizes) == 6
+    assert fake.calls[-1] == "breaks_agent_reduce"
+    assert "Group 1: 6 breaks" in text
+    assert text.endswith("Agent Commentary:\ndone")
@@ -0,0 +1,61 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents import breaks_agent
+
+
+def _breaks(n, paths=3):
+    return [{"hierarchy_path": f"P{i % paths}", "hop_id": f"HOP_{i}", "hop_description": f"hop {i}",
+             "exposure_amt": 1000 * i} for i in range(n)]
+
+
+def test_chunks_keep_hierarchy_paths_together():
+    chunks = breaks_agent.chunk_breaks(_breaks(12), size=4, by="hierarchy_path")
+    assert [len(c) for c in chunks] == [4, 4, 4]
+    assert all(len({b["hierarchy_path"] for b in c}) == 1 for c in chunks)
+    assert [len(c) for c in breaks_agent.chunk_breaks(_breaks(10), size=4, by="count")] == [4, 4, 2]
+
+
+class _FakeVertex:
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def agenerate_from_config(self, agent_config_name, template_vars, json_mode=False):
+        self.calls.append(agent_config_name)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if agent_config_name == "breaks_agent_reduce":
+            return "Highlights:\nall good\n\nAgent Commentary:\ndone"
+        return f"Explanation:\n{template_vars['breaks_json'].count('HOP_')} hops\n-----\n\nHighlights:\nchunk ok"
+
+
+def _serve(fake):
+    async def aget_vertex_object():
+        return fake
+    return aget_vertex_object
+
+
+def test_map_reduce_explains_chunks_concurrently_and_merges(monkeypatch):
+    fake = _FakeVertex()
+    monkeypatch.setattr(breaks_agent, "aget_vertex_object", _serve(fake))
+
+    text = asyncio.run(breaks_agent.aexplain_breaks_map_reduce("top breaks?", _breaks(20), chunk_size=5, concurrency=3))
+
+    assert fake.calls.count("breaks_agent") == 4
+    assert fake.calls[-1] == "breaks_agent_reduce"
+    assert fake.max_in_flight == 3
+    assert text.startswith("Explanation:\n5 hops")
+    assert text.count("-----") == 4
+    assert text.endswith("Agent Commentary:\ndone")
+
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+pytest.importorskip("langgraph")
+os.environ.setdefault("VERTEX_ADAPTER", "stub")
+
+from mcp_server.agents import graph_breaks_poc as poc
+
+
+def test_compiled_graph_is_shared_until_nodes_change(monkeypatch):
+    poc.reset_compiled_graph()
+    first = poc.get_compiled_graph()
+    assert poc.get_compiled_graph() is first
+
+    async def router(state):
+        return state
+
+    monkeypatch.setattr(poc, "router_node", router)
+    rebuilt = poc.get_compiled_graph()
+    assert rebuilt is not first
+    assert poc.get_compiled_graph() is rebuilt
+    poc.reset_compiled_graph()
+
+
+def test_transaction_questions_reach_the_investigator(monkeypatch):
+    from mcp_server.tools import txn_mcp_client
+
+    requested = []
+
+    async def fetch_transactions(hop_id=None, recon_run_date=None, limit_return=50):
+        requested.append(hop_id)
+        rows = [{"entity_name": "2052a~Loans", "hop_id": hop_id, "anchor_value": f"A{i}", "notional": 1000.0 * i}
+                for i in range(3)]
+        return {"rows": rows, "meta": {}, "isError": False}
+
+    monkeypatch.setattr(txn_mcp_client, "fetch_transactions", fetch_transactions)
+    monkeypatch.setattr(poc, "INVESTIGATOR_NARRATIVE_ENABLED", False)
+    poc.reset_compiled_graph()
+    session = {"user_id": "u1", "session_id": "s1", "turns": [], "last_tool_outputs": {},
+               "last_answer": "", "last_agent": ""}
+
+    state = asyncio.run(poc.get_compiled_graph().ainvoke(
+        {"user_question": "show transactions for HOP_16", "trace": [], "session": session}))
+
+    assert state["selected_tool"] == "get_transactions"
+    assert requested == ["HOP_16"]
+    assert len(state["transactions"]) == 3
+    assert "A2" in state["analysis"]
+    assert state["trace"][-1]["node"] == "Investigator Agent"
+
+    # Without a hop id in the question, the previous turn's top break is used
+    session["last_tool_outputs"]["breaks"] = [{"hop_id": "HOP_7"}]
+    asyncio.run(poc.get_compiled_graph().ainvoke(
+        {"user_question": "show me its transactions", "trace": [], "session": session}))
+    assert requested == ["HOP_16", "HOP_7"]
+    poc.reset_compiled_graph()
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents.fast_router import FastRouter
+
+RULES = {
+    "min_confidence": 0.75,
+    "min_margin": 1.0,
+    "smoothing": 0.5,
+    "tools": {
+        "get_top_breaks": {"reason": "breaks", "patterns": [{"pattern": r"\btop\s+breaks?\b", "weight": 2.5},
+                                                             {"pattern": r"\bbreaks?\b", "weight": 1.0}]},
+        "get_lineage": {"reason": "lineage", "patterns": [{"pattern": r"\blineage\b", "weight": 2.5},
+                                                          {"pattern": r"\bupstream\b", "weight": 2.0}]},
+    },
+}
+
+
+def test_clear_questions_are_routed_confidently():
+    router = FastRouter(RULES)
+
+    route = router.route("Show me the top breaks for today")
+    assert route.tool_name == "get_top_breaks"
+    assert route.confident and route.confidence > 0.85
+    assert route.reason == "breaks"
+
+    assert router.route("Show the lineage for HOP_16").tool_name == "get_lineage"
+
+
+def test_ambiguous_or_unmatched_questions_fall_back():
+    router = FastRouter(RULES)
+
+    mixed = router.route("which breaks are upstream of the convergence hop?")
+    assert mixed.tool_name == "get_lineage"
+    assert not mixed.confident
+
+    assert router.route("why?") is None
@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents.investigator_agent import format_transactions_markdown_table, render_transactions_table
+
+
+def _txn(i: int, **overrides):
+    row = {
+        "entity_name": "2052a~Loans", "hierarchy_path": "Loans/North America/Commercial Real Estate/Secured Term",
+        "recon_run_date": "2025-10-15", "hop_id": "HOP_16", "hop_desc": "GL|feed", "anchor_value": f"A{i}",
+        "eval_asof_date": "2025-10-15", "notional": 1234567.5, "internal_id": i,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_table_follows_investigator_config_rules():
+    rows = [_txn(i) for i in range(7)] + [_txn(7, notional="n/a")]
+    table = render_transactions_table("HOP_16", rows)
+
+    assert table["rows_returned"] == 8 and table["rows_shown"] == 5
+    assert table["columns"][0] == "entity_name" and "internal_id" not in table["columns"]
+    first = table["rows"][0]
+    assert first["notional"] == "1,234,567.50"
+    assert len(first["hierarchy_path"]) == 40 and first["hierarchy_path"].endswith("…")
+
+    lines = table["markdown"].splitlines()
+    assert lines[0] == "### Transaction details for HOP_16"
+    assert lines[2].startswith("| entity_name | hierarchy_path |")
+    assert len(lines) == 3 + 1 + 5
+    assert "\\|" in lines[4]  # pipes inside cells are escaped
+
+
+def test_notional_that_is_not_a_number_is_left_as_is():
+    table = render_transactions_table("HOP_1", [_txn(0, notional="n/a"), _txn(1, notional=2000)], max_rows=10)
+
+    assert [r["notional"] for r in table["rows"]] == ["n/a", "2,000"]
+
+
+def test_markdown_wrapper_and_empty_result():
+    assert "No transactions were returned." in format_transactions_markdown_table("q", "HOP_9", [])
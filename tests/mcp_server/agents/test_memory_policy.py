@@ -0,0 +1,91 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents import memory_policy
+from utils.session_store import SessionStore, SqliteSessionBackend, set_session_store
+
+
+def _session(n):
+    return {"user_id": "u1", "session_id": "s1", "last_answer": "", "last_agent": "", "last_tool_outputs": {},
+            "turns": [{"role": "user", "content": f"t{i}", "meta": {}} for i in range(n)]}
+
+
+def test_window_is_kept_and_overflow_archived(tmp_path):
+    mem = _session(10)
+    assert memory_policy.apply_memory_policy(mem, window=4, batch=6, archive_dir=tmp_path) == 0
+
+    mem["turns"].append({"role": "assistant", "content": "t10", "meta": {}})
+    assert memory_policy.apply_memory_policy(mem, window=4, batch=6, archive_dir=tmp_path) == 7
+    assert [t["content"] for t in mem["turns"]] == ["t7", "t8", "t9", "t10"]
+    assert mem["archived_turns"] == 7
+    archived = memory_policy.read_archived_turns("u1", "s1", archive_dir=tmp_path)
+    assert [t["content"] for t in archived] == [f"t{i}" for i in range(7)]
+
+    mem["summary"] = "Looked at 2052a~Loans breaks."
+    assert memory_policy.recent_context(mem, max_turns=2) == (
+        "summary of earlier conversation: Looked at 2052a~Loans breaks.\nuser: t9\nassistant: t10"
+    )
+
+
+def _fold_turns_through_store(tmp_path, batch):
+    """ Two turns (q, a) per request, folded with window=2 and the given batch, saved write-through. """
+    db = str(tmp_path / f"sessions_{batch}.db")
+    store = SessionStore(SqliteSessionBackend(db), flush_interval=0)
+    for i in range(5):
+        mem = store.load("u1", "s1")
+        mem["turns"] += [{"role": "user", "content": f"q{i}", "meta": {}},
+                         {"role": "assistant", "content": f"a{i}", "meta": {}}]
+        memory_policy.apply_memory_policy(mem, window=2, batch=batch, archive_dir=tmp_path / f"archive_{batch}")
+        store.save(mem)
+    cached = [t["content"] for t in store.load("u1", "s1")["turns"]]
+    store.close()
+    persisted = SqliteSessionBackend(db).load("u1", "s1")[0]
+    return cached, [t["content"] for t in persisted["turns"]], persisted["archived_turns"]
+
+
+def test_fold_keeps_persisted_window_in_sync_with_batch_0(tmp_path):
+    cached, persisted, archived = _fold_turns_through_store(tmp_path, batch=0)
+    assert cached == persisted == ["q4", "a4"]
+    assert archived == 8
+
+
+def test_fold_keeps_persisted_window_in_sync_with_batch_1(tmp_path):
+    cached, persisted, archived = _fold_turns_through_store(tmp_path, batch=1)
+    assert cached == persisted == ["q4", "a4"]
+    assert archived == 8
+
+
+def test_summary_is_folded_in_background(tmp_path, monkeypatch):
+    store = SessionStore(SqliteSessionBackend(str(tmp_path / "sessions.db")), flush_interval=0)
+    set_session_store(store)
+    folded = []
+
+    async def fake_summarize(previous_summary, turns):
+        folded.append(turns)
+        return f"{previous_summary} +{len(turns.splitlines())}".strip()
+
+    import mcp_server.agents.memory_agent as memory_agent
+    monkeypatch.setattr(memory_agent, "asummarize_turns", fake_summarize)
+
+    async def run():
+        mem = _session(20)
+        memory_policy.apply_memory_policy(mem, window=4, batch=2, archive_dir=tmp_path)
+        store.save(mem)
+        await memory_policy.schedule_summary("u1", "s1", archive_dir=tmp_path)
+
+    try:
+        asyncio.run(run())
+        mem = store.load("u1", "s1")
+        assert mem["summary"] == "+16"
+        assert mem["summary_upto"] == 16
+        assert len(mem["turns"]) == 4
+    finally:
+        set_session_store(None)
+        store.close()
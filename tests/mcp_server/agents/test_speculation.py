@@ -0,0 +1,105 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents import speculation
+from mcp_server.agents.fast_router import FastRoute
+from mcp_server.agents.speculation import Prefetch, SpeculationStats, predict_tool
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    stats = SpeculationStats()
+    monkeypatch.setattr(speculation, "_stats", stats)
+    return stats
+
+
+def _route(tool_name, confidence):
+    return FastRoute(tool_name=tool_name, confidence=confidence, margin=0.0, confident=False, reason="")
+
+
+def test_predict_tool_uses_fast_guess_or_previous_agent():
+    assert predict_tool(_route("get_lineage", 0.6)) == "get_lineage"
+    assert predict_tool(_route("get_lineage", 0.1)) is None
+    assert predict_tool(_route("general_qa", 0.9)) is None
+    assert predict_tool(None, last_agent="get_top_breaks") == "get_top_breaks"
+    assert predict_tool(None, last_agent="general_qa") is None
+
+
+def test_hit_returns_the_prefetched_result(fresh_stats):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": [1, 2]}
+
+    async def run():
+        prefetch = Prefetch("get_top_breaks", fetch)
+        return await prefetch.resolve()
+
+    assert asyncio.run(run()) == {"rows": [1, 2]}
+    assert calls == [1]
+    stats = fresh_stats.snapshot()
+    assert stats["started"] == 1 and stats["used"] == 1 and stats["discarded"] == 0
+    assert stats["hit_rate"] == 1.0 and stats["wasted_work_ratio"] == 0.0
+
+
+def test_miss_discards_a_finished_fetch(fresh_stats):
+    async def fetch():
+        return {"rows": []}
+
+    async def run():
+        prefetch = Prefetch("get_lineage", fetch)
+        await asyncio.sleep(0)
+        prefetch.discard()
+
+    asyncio.run(run())
+    stats = fresh_stats.snapshot()
+    assert stats["started"] == 1 and stats["used"] == 0 and stats["discarded"] == 1
+    assert stats["hit_rate"] == 0.0
+
+
+def test_discard_cancels_a_running_fetch(fresh_stats):
+    async def run():
+        state = {"cancelled": False}
+
+        async def fetch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        prefetch = Prefetch("get_top_breaks", fetch)
+        await asyncio.sleep(0)
+        prefetch.discard()
+        with pytest.raises(asyncio.CancelledError):
+            await prefetch.resolve()
+        return state["cancelled"]
+
+    assert asyncio.run(run()) is True
+    stats = fresh_stats.snapshot()
+    assert stats["discarded"] == 1 and stats["used"] == 0
+
+
+def test_failed_fetch_is_counted_and_raised(fresh_stats):
+    async def fetch():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        prefetch = Prefetch("get_lineage", fetch)
+        with pytest.raises(RuntimeError):
+            await prefetch.resolve()
+
+    asyncio.run(run())
+    stats = fresh_stats.snapshot()
+    assert stats["failed"] == 1 and stats["used"] == 0
@@ -0,0 +1,28 @@
+import asyncio
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm import adapter
+
+
+def test_llm_semaphore_is_bound_per_event_loop(monkeypatch):
+    monkeypatch.setattr(adapter, "MAX_CONCURRENT_LLM_CALLS", 1)
+    adapter.set_llm_concurrency(1)
+
+    async def contended():
+        # The second caller has to wait, which binds the semaphore to this loop
+        async def call():
+            async with adapter.get_llm_semaphore():
+                await asyncio.sleep(0.01)
+        await asyncio.gather(call(), call())
+        return adapter.get_llm_semaphore()
+
+    first = asyncio.run(contended())
+    second = asyncio.run(contended())
+    assert first is not second
@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.model_pool import GenerativeModelPool
+
+BASE = ("gemini-2.0-flash-001", "You explain breaks.", "application/json", 0.0, 42)
+
+
+def _get(pool, key):
+    return pool.get_or_create(key, object)
+
+
+def test_same_key_reuses_the_model():
+    pool = GenerativeModelPool(max_size=4)
+    key = pool.make_key(*BASE)
+
+    first = _get(pool, key)
+    assert _get(pool, pool.make_key(*BASE)) is first
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 1
+
+
+def test_every_key_field_separates_models():
+    pool = GenerativeModelPool(max_size=16)
+    variants = [
+        ("gemini-1.5-pro", *BASE[1:]),
+        (BASE[0], "You explain lineage.", *BASE[2:]),
+        (*BASE[:2], "text/plain", *BASE[3:]),
+        (*BASE[:3], 0.7, BASE[4]),
+        (*BASE[:4], 7),
+    ]
+    keys = {pool.make_key(*BASE)} | {pool.make_key(*v) for v in variants}
+    assert len(keys) == len(variants) + 1
+    # The system prompt is hashed, not kept verbatim in the key
+    assert "You explain breaks." not in pool.make_key(*BASE)
+    assert pool.make_key(*BASE[:3], 0, BASE[4]) == pool.make_key(*BASE[:3], 0.0, BASE[4])
+
+
+def test_least_recently_used_model_is_evicted():
+    pool = GenerativeModelPool(max_size=2)
+    a, b, c = (pool.make_key(*BASE[:4], seed) for seed in (1, 2, 3))
+    model_a = _get(pool, a)
+    _get(pool, b)
+    assert _get(pool, a) is model_a   # b is now least recently used
+    _get(pool, c)
+
+    assert pool.stats()["evictions"] == 1
+    assert _get(pool, a) is model_a
+    misses = pool.stats()["misses"]
+    _get(pool, b)
+    assert pool.stats()["misses"] == misses + 1
+
+
+def test_invalidate_drops_every_model():
+    pool = GenerativeModelPool()
+    key = pool.make_key(*BASE)
+    first = _get(pool, key)
+
+    pool.invalidate()
+
+    assert pool.stats()["size"] == 0 and pool.stats()["invalidations"] == 1
+    assert _get(pool, key) is not first
+
+
+def test_token_refresh_clears_the_pool(monkeypatch):
+    vertexai = pytest.importorskip("vertexai")
+    pytest.importorskip("google.oauth2.credentials")
+    from mcp_server.llm.adapter import VertexGenAI
+
+    pool = GenerativeModelPool()
+    monkeypatch.setattr("mcp_server.llm.adapter.get_model_pool", lambda: pool)
+    monkeypatch.setattr(vertexai, "init", lambda **kwargs: None)
+    key = pool.make_key(*BASE)
+    first = _get(pool, key)
+
+    VertexGenAI().apply_access_token("token-2")
+
+    assert pool.stats()["size"] == 0 and pool.stats()["invalidations"] == 1
+    assert _get(pool, key) is not first
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.agents.schemas import HopBreak
+from mcp_server.llm import payload_encoder
+from mcp_server.llm.payload_encoder import encode_for_prompt, encode_rows, estimate_tokens, get_payload_stats
+
+
+def _break(i: int) -> HopBreak:
+    return HopBreak(
+        entity_name="2052a~Loans", recon_run_date="2025-10-15", hierarchy_path="Loans/US, Inc", hop_id=f"HOP_{i}",
+        hop_description=f"hop {i}", eval_asof_date="2025-10-15", required_cde=4, total_anchor_count=1000,
+        break_anchor_count=10 * i, break_anchor_pct=1.234567 * i, break_null_count=i, break_empty_count=0,
+        break_valid_count=990, break_valid_pct=99.0, break_distinct_count=3, exposure_amt=1500000.0,
+    )
+
+
+def test_csv_round_trips_dropped_and_rounded_fields():
+    text = encode_rows([_break(1), _break(2)], "csv", drop_fields=["break_distinct_count", "extra"], round_digits=2)
+    rows = list(csv.DictReader(io.StringIO(text)))
+
+    assert len(rows) == 2
+    assert "break_distinct_count" not in rows[0] and "extra" not in rows[0]
+    assert rows[0]["hierarchy_path"] == "Loans/US, Inc"  # comma is quoted, not split
+    assert rows[1]["break_anchor_pct"] == "2.47"
+    assert rows[0]["exposure_amt"] == "1500000"
+
+
+def test_formats_are_smaller_than_indented_json_and_lossless():
+    rows = [_break(i) for i in range(20)]
+    before = estimate_tokens(json.dumps([vars(r) for r in rows], indent=2))
+    for fmt in ("json", "columnar", "csv", "tsv", "markdown"):
+        assert estimate_tokens(encode_rows(rows, fmt)) < before
+
+    columnar = json.loads(encode_rows(rows, "columnar"))
+    assert [dict(zip(columnar["columns"], v)) for v in columnar["rows"]] == [vars(r) for r in rows]
+
+
+def test_encode_for_prompt_records_savings(monkeypatch):
+    monkeypatch.setattr(payload_encoder, "PROMPT_PAYLOAD_STATS", True)
+    text = encode_for_prompt("test_agent", [_break(i) for i in range(5)], {"format": "tsv"})
+
+    assert text.count("\n") == 5 and "\t" in text
+    stats = get_payload_stats()["test_agent"]
+    assert stats["calls"] == 1 and stats["after_tokens"] < stats["before_tokens"]
+    assert stats["saved_pct"] > 0
+
+
+def test_encode_for_prompt_skips_stats_by_default():
+    encode_for_prompt("untracked_agent", [_break(i) for i in range(3)], {"format": "csv"})
+    assert "untracked_agent" not in get_payload_stats()
@@ -0,0 +1,75 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.prompt_registry import AgentConfigRegistry
+
+
+def _write(path: Path, greeting: str, mtime_ns: int) -> None:
+    path.write_text(
+        "model_name: gemini-test\n"
+        "temperature: 0.2\n"
+        "system_prompt: You explain breaks.\n"
+        f"task_prompt: \"{greeting} {{{{ user_question }}}}\"\n",
+        encoding="utf-8",
+    )
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def compiles(monkeypatch):
+    calls = []
+    compile_config = AgentConfigRegistry._compile
+
+    def counting(name, path, mtime_ns):
+        calls.append(name)
+        return compile_config(name, path, mtime_ns)
+
+    monkeypatch.setattr(AgentConfigRegistry, "_compile", staticmethod(counting))
+    return calls
+
+
+def test_unchanged_config_is_compiled_once(tmp_path, compiles):
+    _write(tmp_path / "breaks_agent.yml", "Answer:", 1_000_000_000)
+    registry = AgentConfigRegistry(tmp_path)
+
+    first = registry.get("breaks_agent")
+    assert registry.get("breaks_agent") is first
+    assert registry.render("breaks_agent", {"user_question": "why?"}) == ("You explain breaks.", "Answer: why?")
+    assert first.model_name == "gemini-test" and first.temperature == 0.2
+    assert compiles == ["breaks_agent"]
+
+
+def test_edited_config_is_recompiled(tmp_path, compiles):
+    path = tmp_path / "breaks_agent.yml"
+    _write(path, "Answer:", 1_000_000_000)
+    registry = AgentConfigRegistry(tmp_path)
+    first = registry.get("breaks_agent")
+
+    _write(path, "Explain:", 2_000_000_000)
+    second = registry.get("breaks_agent")
+
+    assert second is not first
+    assert second.render_task({"user_question": "why?"}) == "Explain: why?"
+    assert compiles == ["breaks_agent", "breaks_agent"]
+
+
+def test_deleted_config_is_dropped(tmp_path):
+    path = tmp_path / "breaks_agent.yml"
+    _write(path, "Answer:", 1_000_000_000)
+    registry = AgentConfigRegistry(tmp_path)
+    registry.load_all()
+    assert registry.names() == ["breaks_agent"]
+
+    path.unlink()
+    with pytest.raises(FileNotFoundError):
+        registry.get("breaks_agent")
+    assert registry.names() == []
@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm import query_index
+from mcp_server.llm.query_index import QueryLogIndex, attach_query_index, backfill, ensure_backfilled
+from mcp_server.llm.query_log import QueryLogWriter
+
+
+def _entry(user_id, session_id, ts, uq, gr="answer"):
+    return {"user_id": user_id, "session_id": session_id, "ts": ts, "user_query": uq, "generalized_response": gr}
+
+
+def test_index_returns_session_queries_in_order_and_skips_duplicates(tmp_path):
+    index = QueryLogIndex(str(tmp_path / "index.db"))
+    entries = [
+        _entry("u1", "s1", "2025-10-15T10:00:02", "lineage"),
+        _entry("u1", "s1", "2025-10-15T10:00:01", "top breaks"),
+        _entry("u1", "s2", "2025-10-15T10:00:03", "other session"),
+        {"user_id": "u1", "ts": "2025-10-15T10:00:04", "user_query": "no session"},
+        _entry("u1", "s1", "2025-10-15T10:00:05", "", ""),
+    ]
+    assert index.add_entries(entries) == 3
+    assert index.add_entries(entries[:2]) == 0
+
+    assert index.session_queries("u1", "s1") == [("top breaks", "answer"), ("lineage", "answer")]
+    assert index.session_queries("u1", "s1", since="2025-10-15T10:00:02") == [("lineage", "answer")]
+    assert index.session_queries("u1", "s1", limit=1) == [("top breaks", "answer")]
+    assert index.count() == 3
+    index.close()
+
+
+def test_backfill_reads_jsonl_and_legacy_json(tmp_path):
+    jsonl = tmp_path / "query_logs.jsonl"
+    jsonl.write_text(json.dumps(_entry("u1", "s1", "2025-10-15T10:00:01", "top breaks")) + "\n", encoding="utf-8")
+    legacy = tmp_path / "query_logs.json"
+    legacy.write_text(json.dumps({"u1": {"s1": {"req1": {"ts": "2025-10-14T09:00:00", "user_query": "old question",
+                                                           "generalized_response": "old answer"}}}}), encoding="utf-8")
+
+    index = QueryLogIndex(str(tmp_path / "index.db"))
+    assert backfill(index, [str(jsonl), str(legacy)]) == 2
+    assert backfill(index, [str(jsonl), str(legacy)]) == 0
+    assert index.session_queries("u1", "s1") == [("old question", "old answer"), ("top breaks", "answer")]
+    index.close()
+
+
+def test_attach_indexes_written_batches_once_and_opens_lazily(tmp_path, monkeypatch):
+    db = tmp_path / "index.db"
+    monkeypatch.setattr(query_index, "QUERY_INDEX_ENABLED", True)
+    monkeypatch.setattr(query_index, "QUERY_INDEX_DB", str(db))
+    monkeypatch.setattr(query_index, "_query_index", None)
+    monkeypatch.setattr(query_index, "QUERY_INDEX_BACKFILL_PATHS", [])
+    writer = QueryLogWriter(str(tmp_path / "query_logs.jsonl"), rotate_seconds=0)
+    assert not db.exists()
+
+    attach_query_index(writer)
+    attach_query_index(writer)
+    writer.write(_entry("u1", "s1", "2025-10-15T10:00:01", "top breaks"))
+    writer.flush()
+    writer.close()
+
+    index = query_index.get_query_index()
+    assert db.exists()
+    assert index.session_queries("u1", "s1") == [("top breaks", "answer")]
+    assert index.count() == 1
+    index.close()
+
+
+def test_new_index_backfills_existing_logs_in_background(tmp_path, monkeypatch):
+    jsonl = tmp_path / "query_logs.jsonl"
+    jsonl.write_text(json.dumps(_entry("u1", "s1", "2025-10-15T10:00:01", "logged before the index")) + "\n",
+                     encoding="utf-8")
+    monkeypatch.setattr(query_index, "QUERY_INDEX_BACKFILL_PATHS", [str(jsonl)])
+    index = QueryLogIndex(str(tmp_path / "index.db"))
+
+    assert not ensure_backfilled(index)
+    query_index._backfill_thread.join(timeout=5)
+    assert ensure_backfilled(index)
+    assert index.session_queries("u1", "s1") == [("logged before the index", "answer")]
+    index.close()
+
+    # Remembered across restarts
+    assert QueryLogIndex(str(tmp_path / "index.db")).backfilled
+
+
+def test_failed_batch_is_recovered_by_a_backfill(tmp_path, monkeypatch):
+    entry = _entry("u1", "s1", "2025-10-15T10:00:01", "missed by the listener")
+    jsonl = tmp_path / "query_logs.jsonl"
+    jsonl.write_text(json.dumps(entry) + "\n", encoding="utf-8")
+    monkeypatch.setattr(query_index, "QUERY_INDEX_BACKFILL_PATHS", [str(jsonl)])
+    index = QueryLogIndex(str(tmp_path / "index.db"))
+    index.set_backfilled(True)
+
+    def fail(entries):
+        raise sqlite3.OperationalError("database is locked")
+
+    with monkeypatch.context() as m:
+        m.setattr(index, "add_entries", fail)
+        with pytest.raises(sqlite3.OperationalError):
+            index.index_batch([entry])
+    assert not index.backfilled
+
+    # Readers fall back to the log files while the backfill catches up
+    assert not ensure_backfilled(index)
+    query_index._backfill_thread.join(timeout=5)
+    assert ensure_backfilled(index)
+    assert index.session_queries("u1", "s1") == [("missed by the listener", "answer")]
+    index.close()
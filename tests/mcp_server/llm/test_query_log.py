@@ -0,0 +1,46 @@
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.query_log import QueryLogWriter, iter_log_entries, reset_log_context, set_log_context
+
+
+def test_entries_are_appended_and_filtered_by_session(tmp_path):
+    log_file = str(tmp_path / "query_logs.jsonl")
+    writer = QueryLogWriter(log_file, rotate_seconds=0)
+
+    token = set_log_context(user_id="u1", session_id="s1")
+    writer.write({"user_query": "top breaks", "generalized_response": "A"})
+    reset_log_context(token)
+    writer.write({"user_query": "lineage", "generalized_response": "B", "user_id": "u2", "session_id": "s9"})
+    writer.flush()
+
+    entries = list(iter_log_entries(log_file, user_id="u1", session_id="s1"))
+    assert [e["user_query"] for e in entries] == ["top breaks"]
+    assert "ts" in entries[0]
+    assert len(Path(log_file).read_text(encoding="utf-8").splitlines()) == 2
+    writer.close()
+
+
+def test_size_rotation_gzips_segments_and_reader_spans_them(tmp_path):
+    log_file = str(tmp_path / "query_logs.jsonl")
+    writer = QueryLogWriter(log_file, max_bytes=1, rotate_seconds=0, gzip_rotated=True)
+
+    for i in range(3):
+        writer.write({"user_id": "u1", "session_id": "s1", "user_query": f"q{i}"})
+        writer.flush()
+    writer.close()
+
+    deadline = time.time() + 5
+    while time.time() < deadline and list(tmp_path.glob("query_logs.*.jsonl")):
+        time.sleep(0.01)
+
+    assert writer.rotations == 2
+    assert len(list(tmp_path.glob("query_logs.*.jsonl.gz"))) == 2
+    assert [e["user_query"] for e in iter_log_entries(log_file, user_id="u1")] == ["q0", "q1", "q2"]
@@ -0,0 +1,54 @@
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.response_cache import MemoryLRUTier, ResponseCache, SqliteTier
+
+
+def _key(input_prompt: str = "Show me the top breaks", temperature: float = 0.2) -> str:
+    return ResponseCache.make_key("breaks_agent", "gemini-2.0-flash-001", temperature, 42, "system", input_prompt)
+
+
+def test_key_depends_on_prompt_and_generation_settings():
+    assert _key() == _key()
+    assert _key() != _key(input_prompt="Show me the lineage")
+    assert _key() != _key(temperature=0.0)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache([MemoryLRUTier(max_entries=2)])
+    cache.set("a", "A", "router_agent")
+    cache.set("b", "B", "router_agent")
+    assert cache.get("a", "router_agent") == "A"
+    cache.set("c", "C", "router_agent")
+
+    assert cache.get("b", "router_agent") is None
+    assert cache.get("a", "router_agent") == "A"
+    assert cache.stats()["per_agent"]["router_agent"] == {"hits": 2, "misses": 1}
+
+
+def test_ttl_expiry_and_disabled_ttl():
+    cache = ResponseCache([MemoryLRUTier()])
+    cache.set("short", "value", "breaks_agent", ttl=0.01)
+    cache.set("off", "value", "breaks_agent", ttl=0)
+    time.sleep(0.02)
+
+    assert cache.get("short", "breaks_agent") is None
+    assert cache.get("off", "breaks_agent") is None
+
+
+def test_sqlite_hit_is_promoted_to_memory(tmp_path):
+    db_path = str(tmp_path / "llm_cache.db")
+    ResponseCache([SqliteTier(db_path)]).set(_key(), "cached answer", "breaks_agent")
+
+    memory = MemoryLRUTier()
+    cache = ResponseCache([memory, SqliteTier(db_path)])
+
+    assert cache.get(_key(), "breaks_agent") == "cached answer"
+    assert memory.get(_key())[0] == "cached answer"
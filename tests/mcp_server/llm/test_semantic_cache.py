@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm.semantic_cache import SemanticAnswerCache
+
+PARTITION = ("2052a~Loans", "20251015")
+
+
+def _cache() -> SemanticAnswerCache:
+    cache = SemanticAnswerCache(threshold=0.85, cacheable_tools={"get_top_breaks", "get_lineage"})
+    cache.store("Show me the top hop-level breaks and explain what they mean.", "breaks answer", "get_top_breaks", PARTITION)
+    cache.store("Show me the lineage for hop 16", "lineage answer", "get_lineage", PARTITION)
+    return cache
+
+
+def test_paraphrase_hits_within_partition():
+    hit = _cache().lookup("show the top hop level breaks, explain what they mean", PARTITION)
+
+    assert hit is not None
+    assert hit.answer == "breaks answer"
+    assert hit.selected_tool == "get_top_breaks"
+
+
+def test_different_hop_or_partition_misses():
+    cache = _cache()
+
+    assert cache.lookup("Show me the lineage for hop 21", PARTITION) is None
+    assert cache.lookup("Show me the lineage for hop 16", ("2052a~Loans", "20251016")) is None
+
+
+def test_uncacheable_tool_is_not_stored():
+    cache = SemanticAnswerCache()
+
+    assert not cache.store("what is a DAG?", "A directed acyclic graph.", "general_qa", PARTITION)
+    assert cache.lookup("what is a DAG?", PARTITION) is None
+    # Its SQL ignores the feed/date, so a breaks answer has no partition of its own
+    assert not cache.store("show the top breaks", "breaks answer", "get_top_breaks", PARTITION)
@@ -0,0 +1,101 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.llm import adapter
+from mcp_server.llm.token_manager import TokenManager
+
+
+class _Endpoint:
+    """ Token endpoint stand-in: each call sleeps, then returns token-1, token-2, ... """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.installed = []
+
+    def fetch(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"token-{self.calls}"
+
+
+def test_concurrent_refreshes_share_one_fetch():
+    endpoint = _Endpoint(delay=0.05)
+    manager = TokenManager(fetch_token=endpoint.fetch, on_refresh=endpoint.installed.append)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.refresh())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # The first caller fetches; the rest were queued behind it and reuse its token
+    assert endpoint.calls == 1
+    assert results == ["token-1"] * 8
+    assert endpoint.installed == ["token-1"]
+    assert manager.refresh_count == 1
+
+
+def test_generation_counter_only_skips_refreshes_that_raced_a_newer_token():
+    endpoint = _Endpoint()
+    manager = TokenManager(fetch_token=endpoint.fetch, on_refresh=endpoint.installed.append)
+
+    assert manager.ensure_token() == "token-1"
+    assert manager.ensure_token() == "token-1"
+    assert manager.refresh() == "token-2"             # no refresh landed meanwhile: fetches
+    assert manager.refresh(force=True) == "token-3"   # the background refresher always fetches
+    assert endpoint.calls == 3
+    assert manager.has_valid_token()
+
+
+def test_failed_refresh_keeps_the_current_token():
+    tokens = iter(["token-1", None])
+    manager = TokenManager(fetch_token=lambda: next(tokens), on_refresh=lambda token: None)
+
+    assert manager.refresh() == "token-1"
+    with pytest.raises(RuntimeError):
+        manager.refresh()
+    assert manager.token == "token-1"
+    assert manager.failure_count == 1
+    assert manager.metrics()["last_error"] == "token endpoint returned None"
+
+
+def test_cold_vertex_start_does_not_block_the_event_loop(monkeypatch):
+    sentinel = object()
+
+    def slow_get_vertex_object():
+        time.sleep(0.2)  # e.g. the synchronous token request
+        return sentinel
+
+    monkeypatch.setattr(adapter, "_vertex_object", None)
+    monkeypatch.setattr(adapter, "get_vertex_object", slow_get_vertex_object)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        vertex = await adapter.aget_vertex_object()
+        task.cancel()
+        return vertex, ticks
+
+    vertex, ticks = asyncio.run(run())
+    assert vertex is sentinel
+    assert ticks >= 5
@@ -0,0 +1,137 @@
+import asyncio
+import datetime as dt
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server import query_cache
+from mcp_server.query_cache import QueryResultCache, normalize_sql, ttl_for
+
+
+def test_normalisation_keeps_string_literals():
+    sql = "SELECT *\n  FROM t -- comment\n WHERE name = 'Loans  A' /* x */ ;"
+    assert normalize_sql(sql) == "select * from t where name = 'Loans  A'"
+    assert normalize_sql("select 1 from t where a = 'X'") != normalize_sql("select 1 from t where a = 'x'")
+
+
+def test_closed_recon_dates_never_expire():
+    today = dt.date(2025, 10, 20)
+    assert ttl_for(normalize_sql("select * from b where recon_run_date = '2025-10-15'"), today) == float("inf")
+    assert ttl_for(normalize_sql("select * from b where recon_run_date = '20251020'"), today) == query_cache.QUERY_CACHE_TTL_SECONDS
+    assert ttl_for(normalize_sql("select * from b where recon_run_date >= current_date - 3 and d > '2024-01-01'"), today) \
+        == query_cache.QUERY_CACHE_TTL_SECONDS
+    assert ttl_for(normalize_sql("select * from b"), today) == query_cache.QUERY_CACHE_TTL_SECONDS
+
+
+def test_open_date_ranges_use_the_default_ttl():
+    today = dt.date(2025, 10, 20)
+    closed, default = float("inf"), query_cache.QUERY_CACHE_TTL_SECONDS
+    cases = {
+        "select * from b where recon_run_date >= '2024-01-01'": default,
+        "select * from b where recon_run_date > '2024-01-01' and feed = 'x'": default,
+        "select * from b where recon_run_date <> '2024-01-01'": default,
+        "select * from b where recon_run_date not in ('2024-01-01')": default,
+        "select * from b where recon_run_date >= '2024-01-01' and recon_run_date < '2024-02-01'": closed,
+        "select * from b where recon_run_date between '2024-01-01' and '2024-01-31'": closed,
+        "select * from b where recon_run_date in ('2025-10-14', '2025-10-15')": closed,
+        "select * from b where recon_run_date in ('2025-10-15', '2025-10-20')": default,
+    }
+    for sql, ttl in cases.items():
+        assert ttl_for(normalize_sql(sql), today) == ttl, sql
+
+
+def test_concurrent_identical_queries_share_one_upstream_call():
+    cache = QueryResultCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": [{"hop_id": "HOP_1"}]}
+
+    async def run():
+        results = await asyncio.gather(*(
+            cache.get_or_fetch("select * from b " + " " * i, fetch, "openpus", "managed") for i in range(5)
+        ))
+        results.append(await cache.get_or_fetch("SELECT * FROM b", fetch, "OPENPUS", "managed"))
+        return results
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(r == {"rows": [{"hop_id": "HOP_1"}]} for r in results)
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+
+
+def test_cancelled_leader_does_not_cancel_waiting_callers():
+    cache = QueryResultCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"rows": [{"hop_id": "HOP_1"}]}
+
+    async def run():
+        leader = asyncio.ensure_future(cache.get_or_fetch("select * from b", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_or_fetch("select * from b", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await follower
+        return leader, result
+
+    leader, result = asyncio.run(run())
+    assert leader.cancelled()
+    assert result == {"rows": [{"hop_id": "HOP_1"}]}
+    assert len(calls) == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_fetch_is_cancelled_when_its_last_caller_is():
+    cache = QueryResultCache()
+    state = {"cancelled": False}
+
+    async def fetch():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    async def run():
+        caller = asyncio.ensure_future(cache.get_or_fetch("select * from b", fetch))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.sleep(0.01)
+        return caller
+
+    assert asyncio.run(run()).cancelled()
+    assert state["cancelled"]
+    assert cache.stats()["inflight"] == 0
+
+
+def test_errors_are_not_cached_and_budget_evicts_lru():
+    cache = QueryResultCache(max_bytes=60)
+
+    async def run():
+        await cache.get_or_fetch("q0", lambda: _value({"isError": True}))
+        for i in (1, 2):
+            await cache.get_or_fetch(f"q{i}", lambda i=i: _value({"rows": ["x" * 10, i]}))
+        await cache.get_or_fetch("q1", lambda: _value(None))  # hit: q2 becomes least recently used
+        await cache.get_or_fetch("q3", lambda: _value({"rows": ["x" * 10, 3]}))
+
+    async def _value(v):
+        return v
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] <= 60 and stats["evictions"] == 1
+    assert cache.get(cache.make_key("q0"))[0] is False
+    assert cache.get(cache.make_key("q2"))[0] is False
+    assert cache.get(cache.make_key("q1"))[0] and cache.get(cache.make_key("q3"))[0]
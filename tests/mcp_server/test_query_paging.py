@@ -0,0 +1,95 @@
+import asyncio
+import base64
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server import query_paging
+from mcp_server.query_paging import PageTokenError, build_page, decode_page_token, encode_page_token, paged_sql
+from mcp_server.tools import mcp_transport
+from mcp_server.tools.my_mcp import MCP_QUERY_URL, McpProcessor
+
+QUERY = "SELECT * FROM breaks ORDER BY exposure_amt DESC;"
+
+
+def test_page_tokens_are_bound_to_their_query():
+    token = encode_page_token(QUERY, 200, 100)
+    assert decode_page_token("select *  from breaks order by exposure_amt desc", token) == (200, 100)
+    with pytest.raises(PageTokenError):
+        decode_page_token("select * from other", token)
+    with pytest.raises(PageTokenError):
+        decode_page_token(QUERY, "not-a-token")
+
+
+def _crafted_token(query, offset, page_size):
+    raw = json.dumps({"q": query_paging._query_fingerprint(query), "o": offset, "n": page_size})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def test_crafted_page_tokens_cannot_bypass_limits():
+    assert decode_page_token(QUERY, _crafted_token(QUERY, 0, 1000000000)) == (0, query_paging.QUERY_MAX_PAGE_SIZE)
+    with pytest.raises(PageTokenError):
+        decode_page_token(QUERY, _crafted_token(QUERY, -5, 1000000000))
+
+
+def test_paged_sql_appends_or_wraps():
+    assert paged_sql(QUERY, 0, 11) == "SELECT * FROM breaks ORDER BY exposure_amt DESC FETCH NEXT 11 ROWS ONLY"
+    assert paged_sql(QUERY, 20, 11).endswith("DESC OFFSET 20 ROWS FETCH NEXT 11 ROWS ONLY")
+    assert paged_sql("select * from t limit 5", 0, 3) == "SELECT * FROM (select * from t limit 5) AS paged FETCH NEXT 3 ROWS ONLY"
+
+
+class _PagedServer:
+    """ In-process stand-in for the starburst server's run_query_paged over a fixed table. """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    async def call_tool(self, name, arguments):
+        assert name == "run_query_paged"
+        return await self.fn(**arguments)
+
+    async def fn(self, query, page_size=0, page_token=""):
+        offset, size = decode_page_token(query, page_token) if page_token else (0, query_paging.clamp_page_size(page_size))
+        self.requests.append((offset, size))
+        return build_page(query, {"rows": self.rows[offset:offset + size + 1]}, offset, size)
+
+
+def test_client_iterates_pages_and_stops_after_max_rows():
+    server = _PagedServer([{"n": i} for i in range(25)])
+    mcp_transport.register_inprocess_server(MCP_QUERY_URL, server)
+    try:
+        async def all_rows():
+            return [row async for row in McpProcessor.iter_query_rows(QUERY, page_size=10)]
+
+        rows = asyncio.run(all_rows())
+        assert [r["n"] for r in rows] == list(range(25))
+        assert server.requests == [(0, 10), (10, 10), (20, 10)]
+
+        server.requests.clear()
+        first = asyncio.run(McpProcessor.fetch_rows(QUERY, max_rows=3, page_size=10))
+        assert [r["n"] for r in first] == [0, 1, 2]
+        assert server.requests == [(0, 3)]
+    finally:
+        mcp_transport.unregister_inprocess_server(MCP_QUERY_URL)
+
+
+def test_client_raises_on_a_page_it_cannot_read():
+    class _RawServer(_PagedServer):
+        async def fn(self, query, page_size=0, page_token=""):
+            return build_page(query, {"unexpected": "shape"}, 0, page_size)
+
+    mcp_transport.register_inprocess_server(MCP_QUERY_URL, _RawServer([]))
+    try:
+        with pytest.raises(RuntimeError, match="unrecognised"):
+            asyncio.run(McpProcessor.fetch_rows(QUERY, max_rows=5))
+    finally:
+        mcp_transport.unregister_inprocess_server(MCP_QUERY_URL)
@@ -0,0 +1,70 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.starburst_client import StarburstClient
+
+
+def test_shared_client_caps_concurrency_and_reuses_one_pool():
+    seen = {"in_flight": 0, "max_in_flight": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["in_flight"] += 1
+        seen["max_in_flight"] = max(seen["max_in_flight"], seen["in_flight"])
+        await asyncio.sleep(0.01)
+        seen["in_flight"] -= 1
+        return httpx.Response(200, json={"rows": [request.read().decode()]})
+
+    async def run():
+        client = StarburstClient(max_concurrency=3, transport=httpx.MockTransport(handler))
+        first = client.start()
+        responses = await asyncio.gather(*(client.post_json("http://upstream/api", {"sqlQuery": i}) for i in range(10)))
+        same = client.start() is first
+        await client.aclose()
+        return responses, same, client.metrics()
+
+    responses, same, metrics = asyncio.run(run())
+    assert same
+    assert seen["max_in_flight"] == 3
+    assert responses[4].json() == {"rows": ['{"sqlQuery":4}']}
+    assert responses[0].request.headers["content-type"] == "application/json"
+    assert metrics["requests"] == 10 and metrics["in_flight"] == 0
+
+
+def test_error_status_is_raised():
+    client = StarburstClient(transport=httpx.MockTransport(lambda request: httpx.Response(503, text="down")))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(client.post_json("http://upstream/api", {}))
+
+
+def test_loop_change_closes_the_previous_client():
+    client = StarburstClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={})))
+
+    async def use():
+        await client.post_json("http://upstream/api", {})
+        return client.start()
+
+    first = asyncio.run(use())
+
+    async def use_again():
+        second = await use()
+        await asyncio.sleep(0)
+        return second
+
+    second = asyncio.run(use_again())
+    assert second is not first
+    assert first.is_closed and not second.is_closed
+
+    asyncio.run(client.aclose())
+    assert second.is_closed
+    assert client._loop is None and client._limiter is None
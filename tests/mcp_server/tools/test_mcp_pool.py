@@ -0,0 +1,95 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from mcp_server.tools.mcp_pool import McpConnectionPool
+
+
+class _FakeSession:
+    def __init__(self, server):
+        self.server = server
+        self.broken = False
+
+    async def send_ping(self):
+        if self.broken:
+            raise ConnectionError("transport closed")
+
+    async def call_tool(self, name, arguments):
+        if self.broken:
+            raise ConnectionError("transport closed")
+        self.server.in_flight += 1
+        self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        await asyncio.sleep(0.01)
+        self.server.in_flight -= 1
+        return {"tool": name, **arguments}
+
+
+class _FakeServer:
+    def __init__(self):
+        self.sessions = []
+        self.closed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @asynccontextmanager
+    async def connect(self, url):
+        await asyncio.sleep(0.005)  # SSE handshake + initialize
+        session = _FakeSession(self)
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            self.closed += 1
+
+
+def test_sequential_calls_reuse_one_initialised_session():
+    server = _FakeServer()
+
+    async def run():
+        pool = McpConnectionPool(size=4, connect=server.connect)
+        results = [await pool.call_tool("http://mcp/sse", "run_query", {"query": i}) for i in range(10)]
+        metrics = pool.metrics()["http://mcp/sse"]
+        await pool.aclose()
+        return results, metrics
+
+    results, metrics = asyncio.run(run())
+    assert [r["query"] for r in results] == list(range(10))
+    assert len(server.sessions) == 1 and server.closed == 1
+    assert metrics["connects"] == 1 and metrics["calls"] == 10
+
+
+def test_concurrent_calls_are_multiplexed_within_pool_size():
+    server = _FakeServer()
+
+    async def run():
+        pool = McpConnectionPool(size=3, connect=server.connect)
+        await asyncio.gather(*(pool.call_tool("u", "run_query", {"query": i}) for i in range(12)))
+        return pool.metrics()["u"]
+
+    metrics = asyncio.run(run())
+    assert len(server.sessions) <= 3
+    assert server.max_in_flight > len(server.sessions)  # several calls shared a session
+    assert metrics["calls"] == 12 and metrics["in_flight"] == 0
+
+
+def test_broken_session_is_replaced_and_call_retried():
+    server = _FakeServer()
+
+    async def run():
+        pool = McpConnectionPool(size=1, connect=server.connect)
+        await pool.call_tool("u", "run_query", {"query": 1})
+        server.sessions[0].broken = True
+        result = await pool.call_tool("u", "run_query", {"query": 2})
+        return result, pool.metrics()["u"]
+
+    result, metrics = asyncio.run(run())
+    assert result["query"] == 2
+    assert len(server.sessions) == 2
+    assert metrics["reconnects"] == 1 and metrics["failures"] == 1
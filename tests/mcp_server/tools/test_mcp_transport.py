@@ -0,0 +1,66 @@
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+pytest.importorskip("mcp")
+try:
+    from mcp.server.fastmcp import FastMCP as McpServer
+except ImportError:  # mcp >= 2 renamed FastMCP
+    from mcp.server.mcpserver import MCPServer as McpServer
+
+from mcp_server.tools import mcp_transport
+from mcp_server.tools.txn_mcp_client import extract_json_from_mcp_result
+
+
+def _server():
+    server = McpServer("test_txn")
+    rows = [{"hop_id": "HOP_1", "notional": 10.5}, {"hop_id": "HOP_1", "notional": 3.0}]
+
+    @server.tool()
+    async def get_transactions(hop_id: str, limit_return: int = 50) -> dict[str, Any]:
+        return {"rows": rows[:limit_return], "meta": {"hop_id": hop_id}, "isError": False}
+
+    return server
+
+
+def test_inprocess_server_dispatches_through_call_tool():
+    mcp_transport.register_inprocess_server("http://local/sse", _server())
+    try:
+        # Arguments are validated and coerced like a remote call ("1" -> 1)
+        result = asyncio.run(mcp_transport.call_mcp_tool(
+            "http://local/sse", "get_transactions", {"hop_id": "HOP_1", "limit_return": "1"}))
+        with pytest.raises(Exception):
+            asyncio.run(mcp_transport.call_mcp_tool("http://local/sse", "get_transactions", {"limit_return": 1}))
+        with pytest.raises(Exception):
+            asyncio.run(mcp_transport.call_mcp_tool("http://local/sse", "other_tool"))
+    finally:
+        mcp_transport.unregister_inprocess_server("http://local/sse")
+
+    assert result == {"rows": [{"hop_id": "HOP_1", "notional": 10.5}], "meta": {"hop_id": "HOP_1"}, "isError": False}
+    assert extract_json_from_mcp_result(result) is result
+
+
+def test_call_tool_results_of_either_mcp_version_are_unwrapped():
+    text = SimpleNamespace(type="text", text='{"rows": [1]}')
+    assert mcp_transport._unwrap_tool_result(([text], {"rows": [2]})) == {"rows": [2]}
+    assert mcp_transport._unwrap_tool_result([text]) == {"rows": [1]}
+    assert mcp_transport._unwrap_tool_result(SimpleNamespace(content=[text], structured_content=None)) == {"rows": [1]}
+    assert mcp_transport._unwrap_tool_result(SimpleNamespace(content=[text], structured_content={"rows": [3]})) == {"rows": [3]}
+
+
+def test_unconfigured_urls_use_sse_and_spec_is_parsed():
+    assert isinstance(mcp_transport.get_mcp_transport("http://remote:7000/query"), mcp_transport.SseTransport)
+    assert mcp_transport._parse_inprocess_servers("http://a:1/q=pkg.mod:mcp, http://b/s=pkg.other") == {
+        "http://a:1/q": "pkg.mod:mcp",
+        "http://b/s": "pkg.other",
+    }
@@ -0,0 +1,112 @@
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SRC_PATH = PROJECT_ROOT / "src"
+
+if str(SRC_PATH) not in sys.path:
+    sys.path.insert(0, str(SRC_PATH))
+
+from utils.session_store import SessionStore, SqliteSessionBackend, migrate
+
+
+def _turn(role, content):
+    return {"role": role, "content": content, "meta": {}}
+
+
+def test_sqlite_store_round_trips_and_appends(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    store = SessionStore(SqliteSessionBackend(db), flush_interval=0)
+
+    mem = store.load("u1", "s1")
+    mem["turns"] += [_turn("user", "top breaks"), _turn("assistant", "A")]
+    mem["last_tool_outputs"]["breaks"] = [{"hop_id": "HOP_1"}]
+    mem["feed_name"] = "2052a~Loans"
+    store.save(mem)
+
+    mem = store.load("u1", "s1")
+    mem["turns"].append(_turn("user", "why?"))
+    store.save(mem)
+    store.close()
+
+    reloaded = SqliteSessionBackend(db).load("u1", "s1")[0]
+    assert [t["content"] for t in reloaded["turns"]] == ["top breaks", "A", "why?"]
+    assert reloaded["last_tool_outputs"] == {"breaks": [{"hop_id": "HOP_1"}]}
+    assert reloaded["feed_name"] == "2052a~Loans"
+
+
+def test_two_workers_do_not_lose_turns(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    worker_a = SessionStore(SqliteSessionBackend(db), flush_interval=0)
+    worker_b = SessionStore(SqliteSessionBackend(db), flush_interval=0)
+
+    mem_a = worker_a.load("u1", "s1")
+    mem_b = worker_b.load("u1", "s1")
+    mem_a["turns"].append(_turn("user", "from a"))
+    mem_b["turns"].append(_turn("user", "from b"))
+    worker_a.save(mem_a)
+    worker_b.save(mem_b)
+
+    assert sorted(t["content"] for t in worker_a.load("u1", "s1")["turns"]) == ["from a", "from b"]
+    worker_a.close()
+    worker_b.close()
+
+
+def test_fold_does_not_drop_turns_appended_by_another_worker(tmp_path):
+    db = str(tmp_path / "sessions.db")
+    worker_a = SessionStore(SqliteSessionBackend(db), flush_interval=0)
+    worker_b = SessionStore(SqliteSessionBackend(db), flush_interval=0)
+
+    mem = worker_a.load("u1", "s1")
+    mem["turns"] = [_turn("user", f"t{i}") for i in range(6)]
+    worker_a.save(mem)
+
+    mem_a = worker_a.load("u1", "s1")
+    mem_b = worker_b.load("u1", "s1")
+    mem_b["turns"].append(_turn("user", "from b"))
+    worker_b.save(mem_b)
+
+    # Worker A folds its stale copy: t0..t3 go to the archive, then it appends its own turn
+    mem_a["turns"] = mem_a["turns"][4:] + [_turn("user", "from a")]
+    mem_a["archived_turns"] = 4
+    worker_a.save(mem_a)
+
+    stored = SqliteSessionBackend(db).load("u1", "s1")[0]
+    assert [t["content"] for t in stored["turns"]] == ["t4", "t5", "from b", "from a"]
+    assert stored["archived_turns"] == 4
+    worker_a.close()
+    worker_b.close()
+
+
+def test_sqlite_backend_imports_legacy_json_on_first_load(tmp_path):
+    src = tmp_path / "sessions"
+    src.mkdir()
+    session = {"user_id": "u1", "session_id": "s1", "turns": [_turn("user", "hi")],
+               "last_tool_outputs": {}, "last_answer": "hello", "last_agent": ""}
+    (src / "u1__s1.json").write_text(json.dumps(session), encoding="utf-8")
+
+    store = SessionStore(SqliteSessionBackend(str(tmp_path / "sessions.db"), legacy_dir=src), flush_interval=0)
+    mem = store.load("u1", "s1")
+    assert [t["content"] for t in mem["turns"]] == ["hi"] and mem["last_answer"] == "hello"
+    mem["turns"].append(_turn("assistant", "again"))
+    store.save(mem)
+    store.close()
+
+    # Imported once: the database copy now wins over the JSON file
+    reloaded = SqliteSessionBackend(str(tmp_path / "sessions.db"), legacy_dir=src).load("u1", "s1")[0]
+    assert [t["content"] for t in reloaded["turns"]] == ["hi", "again"]
+    assert SqliteSessionBackend(str(tmp_path / "other.db"), legacy_dir=src).load("u2", "s1") is None
+
+
+def test_migrate_imports_json_sessions(tmp_path):
+    src = tmp_path / "sessions"
+    src.mkdir()
+    session = {"user_id": "u1", "session_id": "s1", "turns": [_turn("user", "hi")],
+               "last_tool_outputs": {"lineage_summary": "x"}, "last_answer": "", "last_agent": ""}
+    (src / "u1__s1.json").write_text(json.dumps(session), encoding="utf-8")
+
+    backend = SqliteSessionBackend(str(tmp_path / "sessions.db"))
+    assert list(migrate(src, backend)) == [("u1", "s1", 1)]
+    assert list(migrate(src, backend)) == []
+    assert backend.load("u1", "s1")[0]["last_tool_outputs"] == {"lineage_summary": "x"}